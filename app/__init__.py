@@ -13,6 +13,41 @@ def create_application(config_name):
 
     db.init_app(app)
 
+    # registered first so its after_request hook runs after the commit
+    from . import query_stats
+    query_stats.init_app(app)
+
+    # registered before the unit of work so compressing a response does
+    # not keep its transaction open
+    from . import compression
+    compression.init_app(app)
+
+    from . import unit_of_work
+    unit_of_work.init_app(app)
+
+    from . import serializers
+    serializers.init_app(app)
+
+    # keeps the sales rollups in step with every flushed order
+    from . import rollups  # noqa
+
+    from . import admission
+    admission.init_app(app)
+
+    from . import hashing
+    hashing.init_app(app)
+
+    from . import order_intake
+    order_intake.init_app(app)
+
+    from . import order_expiry
+    order_expiry.init_app(app)
+
+    from .api import principal, menu_snapshots, prep_sheets
+    principal.init_app(app)
+    menu_snapshots.init_app(app)
+    prep_sheets.init_app(app)
+
     from .api import api_bp
     app.register_blueprint(api_bp, url_prefix='/api/v1')
     return app
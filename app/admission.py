@@ -0,0 +1,144 @@
+"""
+Module contains admission control for the API.
+
+Endpoints belong to a class such as read, write or bulk. Each class
+admits at most a fixed number of concurrent requests and lets a bounded
+number wait for a slot. Requests beyond that, or waiting longer than
+ADMISSION_QUEUE_TIMEOUT, are shed at once with Overloaded instead of
+blocking on an exhausted database pool until the worker times out.
+A class may yield to other classes: it is shed while they have requests
+waiting, so bulk admin calls give way to customer reads and writes.
+"""
+import threading
+import time
+from flask import current_app, request
+from werkzeug.exceptions import ServiceUnavailable
+from .metrics import get_counters
+
+ENVIRON_KEY = 'meal_app.admission'
+
+
+class Overloaded(ServiceUnavailable):
+    """
+    Overloaded. raised when a request is shed by admission control
+    """
+    pass
+
+
+class AdmissionClass:
+    """
+    AdmissionClass. concurrency limit and wait queue of a class of endpoints
+    """
+
+    def __init__(self, name, limit, max_queue, yield_to=()):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.yield_to = yield_to
+        self.active = 0
+        self.waiting = 0
+
+
+class AdmissionController:
+    """
+    AdmissionController. admits or sheds requests per endpoint class
+    """
+
+    def __init__(self, classes, queue_timeout, counters=None):
+        self.classes = {cls.name: cls for cls in classes}
+        self.queue_timeout = queue_timeout
+        self.counters = counters
+        self._condition = threading.Condition()
+
+    def acquire(self, name):
+        """
+        acquire. takes a slot of a class, waiting for one if the queue has
+        room, raises Overloaded when the request is shed
+        """
+        cls = self.classes[name]
+        with self._condition:
+            if self._yields(cls):
+                self._shed(cls)
+            if cls.active < cls.limit:
+                cls.active += 1
+                self._incr(cls, 'admitted')
+                return
+            if cls.waiting >= cls.max_queue:
+                self._shed(cls)
+            self._incr(cls, 'queued')
+            cls.waiting += 1
+            deadline = time.time() + self.queue_timeout
+            try:
+                while cls.active >= cls.limit:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self._shed(cls)
+                    self._condition.wait(remaining)
+            finally:
+                cls.waiting -= 1
+            cls.active += 1
+            self._incr(cls, 'admitted')
+
+    def release(self, name):
+        """
+        release. frees a slot of a class
+        """
+        with self._condition:
+            self.classes[name].active -= 1
+            self._condition.notify_all()
+
+    def _yields(self, cls):
+        return any(self.classes[other].waiting for other in cls.yield_to
+                   if other in self.classes)
+
+    def _shed(self, cls):
+        self._incr(cls, 'shed')
+        raise Overloaded()
+
+    def _incr(self, cls, event):
+        if self.counters is not None:
+            self.counters.incr('{}_{}'.format(cls.name, event))
+
+
+def admit(name):
+    """
+    admit. admits the current request as a request of class name. the
+    slot is held until the request is torn down, after its commit
+    """
+    controller = get_controller()
+    if controller is None:
+        return
+    controller.acquire(name)
+    request.environ.setdefault(ENVIRON_KEY, []).append(name)
+
+
+def release_request(exc):
+    """
+    release_request. frees the slots taken by the current request
+    """
+    controller = get_controller()
+    for name in request.environ.pop(ENVIRON_KEY, ()):
+        controller.release(name)
+
+
+def init_app(app):
+    """
+    init_app. attaches an admission controller to the application
+    """
+    if not app.config['ADMISSION_CONTROL']:
+        return
+    classes = [AdmissionClass(name, limit, max_queue, yield_to)
+               for name, (limit, max_queue, yield_to)
+               in app.config['ADMISSION_CLASSES'].items()]
+    app.extensions['admission'] = AdmissionController(
+        classes, app.config['ADMISSION_QUEUE_TIMEOUT'],
+        counters=get_counters('admission', app))
+    app.teardown_request(release_request)
+
+
+def get_controller():
+    """
+    get_controller. returns the admission controller of the current
+    application, None when admission control is off
+    """
+    return current_app.extensions.get('admission')
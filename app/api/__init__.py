@@ -1,18 +1,80 @@
-from flask import Blueprint
+from flask import Blueprint, make_response
 from flask_restplus import Api
+from ..admission import Overloaded
+from ..capacity import SoldOut
+from ..hashing import HashingPoolSaturated
+from ..order_intake import OrderIntakeFull
+from ..serializers import dumps
 
 
 api_bp = Blueprint('api', __name__)
 api = Api(api_bp)
 
+
+@api.representation('application/json')
+def output_json(data, code, headers=None):
+    """
+    encodes responses with the configured JSON backend
+    """
+    response = make_response(dumps(data) + '\n', code)
+    response.headers.extend(headers or {})
+    return response
+
+
+@api.errorhandler(HashingPoolSaturated)
+def handle_hashing_pool_saturated(error):
+    """
+    responds with 503 when password hashing is saturated
+    """
+    return {
+        'message': 'Server is busy, please try again shortly'
+    }, 503, {'Retry-After': '1'}
+
+
+@api.errorhandler(OrderIntakeFull)
+def handle_order_intake_full(error):
+    """
+    responds with 503 when the order intake queue is full or too slow
+    """
+    return {
+        'message': 'Too many orders, please try again shortly'
+    }, 503, {'Retry-After': '1'}
+
+
+@api.errorhandler(Overloaded)
+def handle_overloaded(error):
+    """
+    responds with 503 when admission control sheds a request
+    """
+    return {
+        'message': 'Server is busy, please try again shortly'
+    }, 503, {'Retry-After': '1'}
+
+
+@api.errorhandler(SoldOut)
+def handle_sold_out(error):
+    """
+    responds with 400 listing the meals without enough portions left
+    """
+    return {
+        'message': 'Not enough portions left of meal with id: {}'.format(
+            ', '.join(str(meal_id) for meal_id in error.meal_ids))
+    }, 400
+
+
 from .auth import Login, Register, RegisterBusiness  # noqa
 from .meals import MealResource, MealsResource  # noqa
-from .menus import MenuResource, SpecificMenuResource, MenusResource  # noqa
+from .menus import MenuResource, SpecificMenuResource, MenusResource, MenuCapacityResource  # noqa
 from .orders import OrderResource, CustomerOrderResource, MyOrderResource  # noqa
+from .metrics import MetricsResource  # noqa
+from .users import UsersImportResource  # noqa
+from .reports import OrderExportResource, PrepSheetResource, \
+    SalesReportResource  # noqa
 
 api.add_resource(Register, '/auth/signup')
 api.add_resource(RegisterBusiness, '/auth/business/signup')
 api.add_resource(Login, '/auth/login')
+api.add_resource(UsersImportResource, '/users/import')
 
 
 api.add_resource(MealsResource, '/meals')
@@ -23,6 +85,12 @@ api.add_resource(MenusResource, '/menus')
 
 api.add_resource(OrderResource, '/orders/<int:order_id>')
 api.add_resource(CustomerOrderResource, '/orders')
+api.add_resource(OrderExportResource, '/orders/export')
 
 api.add_resource(MyOrderResource, '/myorders')
 api.add_resource(SpecificMenuResource, '/menu/<int:menu_id>')
+api.add_resource(MenuCapacityResource, '/menu/<int:menu_id>/capacity')
+
+api.add_resource(MetricsResource, '/metrics')
+api.add_resource(PrepSheetResource, '/prep-sheet')
+api.add_resource(SalesReportResource, '/reports/sales')
@@ -1,10 +1,12 @@
 """
 Module contains API resources for authentication
 """
-from flask_restplus import Resource, reqparse, fields
-from flask import request
-from .common import email_type, str_type
+from flask_restplus import Resource, fields, abort
+from sqlalchemy.exc import IntegrityError
+from .decorators import admission
+from .schemas import Field, Schema
 from ..models import User, Catering, Role
+from .. import db
 from .import api
 
 
@@ -13,32 +15,53 @@ LOGIN_MODAL = api.model('login', {
     'password': fields.String(max_length=36)
 })
 
+LOGIN_SCHEMA = Schema(
+    Field('email', required=True),
+    Field('password', required=True, max_length=36,
+          help='Password field is required')
+)
+
 REGISTER_MODAL = api.model('register', {
     'name': fields.String(max_length=64),
     'email': fields.String(max_length=64),
     'password': fields.String(max_length=36)
 })
 
+REGISTER_SCHEMA = Schema(
+    Field('name', required=True, max_length=64,
+          help='Name field is required'),
+    Field('email', kind='email', required=True, max_length=64),
+    Field('password', required=True, max_length=36,
+          help='Password field is required')
+)
+
+
+def save_new_user(user):
+    """
+    saves a new user, relying on the unique email index to reject
+    emails that are already in use
+    """
+    try:
+        user.save()
+    except IntegrityError:
+        db.session.rollback()
+        abort(code=400, message='Input payload validation failed',
+              errors={'email': 'Email already in use'})
+
 
 class Register(Resource):
     """
     Register. resource for registering a user
     """
-    @api.expect(REGISTER_MODAL, validate=True)
+    @api.expect(REGISTER_MODAL)
     def post(self):
         """
         Signs up a new customer
         """
-        parser = reqparse.RequestParser()
-        parser.add_argument('name', type=str_type, required=True,
-                            help='Name field is required')
-        parser.add_argument('email', type=email_type, required=True)
-        parser.add_argument('password', type=str_type, required=True,
-                            help='Password field is required')
-        args = parser.parse_args()
+        args = REGISTER_SCHEMA.validate()
         user = User(name=args['name'], email=args['email'],
                     password=args['password'])
-        user.save()
+        save_new_user(user)
         return user.to_dict(), 201
 
 
@@ -50,31 +73,34 @@ SIGNUP_BUSINESS = api.model('business_signup', {
     'password': fields.String(max_length=36, pattern='[A-Za-z0-9@#$%^&+=]{8,}')
 })
 
+SIGNUP_BUSINESS_SCHEMA = Schema(
+    Field('businessAddress', max_length=64,
+          help='Business Address field is required'),
+    Field('businessName', max_length=64,
+          help='Business Name field is required'),
+    Field('name', required=True, max_length=64,
+          help='Name field is required'),
+    Field('email', kind='email', required=True, max_length=64),
+    Field('password', required=True, max_length=36,
+          pattern='[A-Za-z0-9@#$%^&+=]{8,}',
+          help='Password field is required')
+)
+
 
 class RegisterBusiness(Resource):
     """
     RegisterBusiness. resource for registering a business
     """
-    @api.expect(SIGNUP_BUSINESS, validate=True)
+    @api.expect(SIGNUP_BUSINESS)
     def post(self):
         """
         Signs up a new business
         """
-        parser = reqparse.RequestParser()
-        parser.add_argument('businessAddress', type=str_type,
-                            help='Business Address field is required')
-        parser.add_argument('businessName', type=str_type,
-                            help='Business Name field is required')
-        parser.add_argument('name', type=str_type, required=True,
-                            help='Name field is required')
-        parser.add_argument('email', type=email_type, required=True)
-        parser.add_argument('password', type=str_type, required=True,
-                            help='Password field is required')
-        args = parser.parse_args()
+        args = SIGNUP_BUSINESS_SCHEMA.validate()
         role = Role.query.filter_by(name='Admin').first()
         user = User(name=args['name'], email=args['email'],
                     password=args['password'], role=role)
-        user.save()
+        save_new_user(user)
         catering = Catering(name=args['businessName'],
                             address=args['businessAddress'], admin=user)
         catering.save()
@@ -88,18 +114,17 @@ class Login(Resource):
     """
     Class Login exposes login functionality in form of a resource
     """
-    @api.expect(LOGIN_MODAL, validate=True)
+    @admission('write')
+    @api.expect(LOGIN_MODAL)
     def post(self):
         """
          Handles post requests for logging in a user
         """
-        parser = reqparse.RequestParser()
-        parser.add_argument('email', type=str_type, required=True)
-        parser.add_argument('password', type=str_type, required=True,
-                            help='Password field is required')
-        args = parser.parse_args()
-        user = User.query.filter_by(email=args['email']).first()
+        args = LOGIN_SCHEMA.validate()
+        user = User.find_by_email(args['email'])
         if user is not None and user.verify_password(args['password']):
+            if user.upgrade_password_hash(args['password']):
+                user.save()
             token = user.generate_jwt_token()
             return {
                 'token': token
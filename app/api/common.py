@@ -4,35 +4,8 @@ Module to store helper functions for validation
 
 import datetime
 import validators
-from dateutil import parser as date_parser
-from flask import g
 from flask_restplus import abort
-from ..models import Meal, User, Menu
-
-
-def menu_date_type(value):
-    """
-    validates menu date and ensures only one menu is created for a date
-    """
-    value = edit_menu_date_type(value)
-    user = g.current_user
-    menu_date = date_parser.parse(value)
-    menu = Menu.query.filter_by(
-        catering=user.catering).filter_by(date=menu_date).first()
-    if menu:
-        raise ValueError(
-            'Menu for the specific date {} is already set'.format(value))
-    return value
-
-
-def edit_menu_date_type(value):
-    """
-    validates menu date
-    """
-    value = str_type(value)
-    if not validate_date(value):
-        raise ValueError('Incorrect date format, should be YYYY-MM-DD')
-    return value
+from ..models import Meal, Menu
 
 
 def type_menu_id(value):
@@ -68,6 +41,16 @@ def validate_email_type(value):
     return False
 
 
+def date_type(value):
+    """
+    date_type. parses a date of format YYYY-MM-DD
+    """
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError('Incorrect date format, should be YYYY-MM-DD')
+
+
 def validate_date(date_text):
     """
     validate_date. validates that a string is a date and of format YYYY-MM-DD
@@ -81,23 +64,60 @@ def validate_date(date_text):
 
 def email_type(value):
     """
-    email_type. validates an email and ensures no user exists with same email
+    email_type. validates an email. uniqueness is enforced by the
+    ix_users_email_lower index when the user is saved
     """
     value = str_type(value)
     is_valid = validate_email_type(value)
     if not is_valid:
         raise ValueError('Email is not valid')
-    user = User.query.filter_by(email=value).first()
-    if user is not None:
-        raise ValueError("Email already in use")
     return value
 
 
-def validate_meals_list(meals):
+def parse_meal_ids(meal_ids):
+    """
+    parse_meal_ids. returns unique integer meal ids in request order
+    """
+    ids = []
+    for meal_id in meal_ids:
+        try:
+            meal_id = int(meal_id)
+        except (TypeError, ValueError):
+            abort(code=400, message='Meal id {} must be an integer'.format(meal_id))
+        if meal_id not in ids:
+            ids.append(meal_id)
+    return ids
+
+
+def abort_missing_meals(meal_ids, meals_by_id):
+    """
+    abort_missing_meals. aborts listing ids missing from meals_by_id
+    """
+    missing = [str(meal_id) for meal_id in meal_ids
+               if meal_id not in meals_by_id]
+    if missing:
+        abort(code=400, message='No meal exists with id: {}'.format(
+            ', '.join(missing)))
+
+
+def int_type(value):
+    """
+    int_type. validates a type is an integer
+    """
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError("Field value must be an integer")
+    return value
+
+
+def resolve_meals(meal_ids, catering_id):
     """
-    validates a list of meals
+    resolve_meals. loads the meals of a catering with one query.
+    aborts listing every id that does not exist or belongs to another
+    catering, otherwise returns the meals in the order requested
     """
-    for meal_id in meals:
-        meal = Meal.query.filter_by(id=meal_id).first()
-        if not meal:
-            abort(code=400, message='No meal exists with id: {}'.format(meal_id))
+    ids = parse_meal_ids(meal_ids)
+    meals = Meal.query.filter(Meal.id.in_(ids)).filter_by(
+        catering_id=catering_id).all() if ids else []
+    meals_by_id = {meal.id: meal for meal in meals}
+    abort_missing_meals(ids, meals_by_id)
+    return [meals_by_id[meal_id] for meal_id in ids]
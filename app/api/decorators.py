@@ -3,8 +3,12 @@ Module contains decorators for protecting routes
 """
 from functools import wraps
 from flask_restplus import abort
-from flask import g, request
-from ..models import User
+from flask_restplus.utils import unpack
+from flask import current_app, g, request
+from werkzeug.http import http_date, quote_etag
+from .principal import load_principal
+from .. import cache_versions, compression
+from ..admission import admit
 
 
 def authenticate(func):
@@ -15,9 +19,9 @@ def authenticate(func):
     def wrapper(*args, **kwargs):
         access_token = request.headers.get('Authorization', '')
         if access_token.strip(' '):
-            user = User.verify_jwt_token(access_token)
-            if user:
-                g.current_user = user
+            principal = load_principal(access_token)
+            if principal:
+                g.current_user = principal
                 return func(*args, **kwargs)
             abort(code=401, message='Authorization failed try again')
         abort(code=401, message='No Bearer token in Authorisation header')
@@ -34,3 +38,70 @@ def admin_required(func):
             abort(code=403, message='403 forbidden access is denied')
         return func(*args, **kwargs)
     return decorated_function
+
+
+def admission(endpoint_class):
+    """
+    admission. sheds a route with 503 when its endpoint class is saturated
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            admit(endpoint_class)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def conditional(policy, scopes, extra=None):
+    """
+    conditional. tags a GET route with an ETag and Last-Modified made from
+    the cache versions of scopes(**kwargs) and the Cache-Control of policy.
+    a client holding the current tag gets 304 without the route being
+    called. extra(**kwargs) returns a token of what changes without
+    bumping a scope, or an empty string
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            etag, last_modified = cache_versions.current(scopes(**kwargs))
+            token = extra(**kwargs) if extra is not None else ''
+            if token:
+                etag = '{}-{}'.format(etag, token)
+            headers = {
+                'ETag': quote_etag(etag),
+                'Cache-Control': current_app.config['CACHE_CONTROL'][policy]
+            }
+            if last_modified is not None:
+                headers['Last-Modified'] = http_date(last_modified)
+            held = _not_modified(etag, last_modified)
+            if held is not None:
+                headers['ETag'] = quote_etag(held)
+                return current_app.response_class(status=304, headers=headers)
+            return _with_headers(func(*args, **kwargs), headers)
+        return wrapper
+    return decorator
+
+
+def _not_modified(etag, last_modified):
+    # returns the current tag the client holds, that of a compressed
+    # representation when it was sent one
+    if request.if_none_match:
+        for tag in compression.tag_variants(etag):
+            if request.if_none_match.contains_weak(tag):
+                return tag
+        return None
+    # If-Modified-Since only counts without If-None-Match
+    since = request.if_modified_since
+    if since is not None and last_modified is not None and \
+            last_modified.replace(microsecond=0) <= since:
+        return etag
+    return None
+
+
+def _with_headers(response, headers):
+    if isinstance(response, current_app.response_class):
+        response.headers.extend(headers)
+        return response
+    data, code, response_headers = unpack(response)
+    return data, code, dict(response_headers, **headers)
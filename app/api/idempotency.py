@@ -0,0 +1,98 @@
+"""
+Module contains Idempotency-Key support for API writes.
+
+The first request a customer sends with an Idempotency-Key header flushes
+a placeholder key row before it is handled and stores its response on
+that row in the same transaction. A repeated key replays the stored
+response without running the handler. A concurrent request with the same
+key waits on the unique index until the first one commits and then
+replays its response. A failed request rolls back its placeholder, so the
+key can be retried.
+"""
+import hashlib
+import json
+from functools import wraps
+from flask import g, request
+from flask_restplus import abort
+from flask_restplus.utils import unpack
+from sqlalchemy.exc import IntegrityError
+from .. import db
+from ..metrics import get_counters
+from ..serializers import dumps
+from ..models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 128
+
+
+def request_hash():
+    """
+    request_hash. fingerprints the method, path and body of the request
+    """
+    digest = hashlib.sha256()
+    digest.update('{} {}\n'.format(request.method, request.path).encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def claim_key(customer_id, key, fingerprint):
+    """
+    claim_key. returns the stored key of a customer, or a new placeholder
+    flushed so that concurrent requests with the key wait for this one
+    """
+    for _ in range(2):
+        record = IdempotencyKey.query.filter_by(
+            customer_id=customer_id, key=key).first()
+        if record is not None and record.is_expired():
+            db.session.delete(record)
+            db.session.flush()
+            record = None
+        if record is not None:
+            if record.request_hash != fingerprint:
+                abort(code=422, message='Idempotency-Key was already used '
+                                        'for a different request')
+            if record.status_code is None:
+                break
+            return record
+        record = IdempotencyKey(key=key, customer_id=customer_id,
+                                request_hash=fingerprint)
+        db.session.add(record)
+        try:
+            db.session.flush()
+            return record
+        except IntegrityError:
+            # another request claimed the key and has committed by now
+            db.session.rollback()
+    get_counters('idempotency').incr('conflicts')
+    abort(code=409, message='A request with this Idempotency-Key is in progress')
+
+
+def idempotent(func):
+    """
+    idempotent. replays the stored response of a repeated Idempotency-Key.
+    must be applied below authenticate
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return func(*args, **kwargs)
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            abort(code=400, message='{} must have 1 to {} characters'.format(
+                HEADER, MAX_KEY_LENGTH))
+        counters = get_counters('idempotency')
+        record = claim_key(g.current_user.id, key, request_hash())
+        if record.status_code is not None:
+            counters.incr('replayed')
+            return json.loads(record.response), record.status_code, {
+                REPLAYED_HEADER: 'true'}
+        data, code, headers = unpack(func(*args, **kwargs))
+        if code < 400:
+            record.status_code = code
+            record.response = dumps(data)
+            record.save()
+            counters.incr('stored')
+        return data, code, headers
+    return wrapper
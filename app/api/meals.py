@@ -1,11 +1,14 @@
 """
 Module contain API resources for exposing meals
 """
-from flask_restplus import Resource, reqparse, fields, abort
+from flask_restplus import Resource, fields, abort
 from flask import g
+from ..cache_versions import catering_scope
 from ..models import Meal
-from .decorators import authenticate, admin_required
-from .common import str_type
+from .decorators import authenticate, admin_required, conditional
+from .pagination import PAGE_PARAMS
+from .read_models import meal_page
+from .schemas import Field, Schema
 from . import api
 
 MEAL_MODAL = api.model('Meal', {
@@ -14,6 +17,18 @@ MEAL_MODAL = api.model('Meal', {
     'description': fields.String(max_length=64)
 })
 
+MEAL_SCHEMA = Schema(
+    Field('title', required=True, max_length=64),
+    Field('price', kind='integer', required=True, minimum=100),
+    Field('description', max_length=64)
+)
+
+EDIT_MEAL_SCHEMA = Schema(
+    Field('title', kind='text', max_length=64),
+    Field('price', kind='integer', minimum=100),
+    Field('description', kind='text', max_length=64)
+)
+
 
 class MealsResource(Resource):
     """
@@ -21,35 +36,35 @@ class MealsResource(Resource):
     """
     @authenticate
     @admin_required
+    @conditional('meals', lambda: [
+        catering_scope(g.current_user.catering_id)])
     @api.header('Authorization', type=str, description='Authentication token')
+    @api.doc(params=PAGE_PARAMS)
     def get(self):
         """
-        Allows a business to retrieve all meals
+        Allows a business to retrieve its meals a page at a time
         """
         user = g.current_user
+        meals, page = meal_page(Meal.catering_id == user.catering_id)
         return {
-            'meals': [meal.to_dict() for meal in user.catering.meals],
+            'meals': meals,
+            'pagination': page.to_dict(),
             'status': 'success'
         }, 200
 
     @authenticate
     @admin_required
-    @api.expect(MEAL_MODAL, validate=True)
+    @api.expect(MEAL_MODAL)
     @api.header('Authorization', type=str, description='Authentication token')
     def post(self):
         """
         Allows a business to add new meals
         """
-        parser = reqparse.RequestParser()
-        parser.add_argument('title', type=str_type, required=True)
-        parser.add_argument('price', type=int, required=True)
-        parser.add_argument('description', type=str_type)
-
-        args = parser.parse_args()
+        args = MEAL_SCHEMA.validate()
         user = g.current_user
         meal = Meal(title=args['title'], price=args['price'],
                     description=args['description'])
-        meal.catering = user.catering
+        meal.catering_id = user.catering_id
         meal.save()
         return meal.to_dict(), 201
 
@@ -67,14 +82,14 @@ class MealResource(Resource):
         """
         user = g.current_user
         meal = Meal.query.filter_by(
-            catering=user.catering).filter_by(id=meal_id).first()
+            catering_id=user.catering_id).filter_by(id=meal_id).first()
         if not meal:
             abort(code=400, message='No meal with such id {} exists'.format(meal_id))
         return meal.to_dict(), 200
 
     @authenticate
     @admin_required
-    @api.expect(MEAL_MODAL, validate=True)
+    @api.expect(MEAL_MODAL)
     @api.doc(responses={200: 'Success', 400: 'Bad request',
                         401: 'Authorization failed'})
     @api.header('Authorization', type=str, description='Authentication token')
@@ -84,16 +99,11 @@ class MealResource(Resource):
         """
         user = g.current_user
         meal = Meal.query.filter_by(
-            catering=user.catering).filter_by(id=meal_id).first()
+            catering_id=user.catering_id).filter_by(id=meal_id).first()
         if not meal:
             abort(code=400, message='No meal with such id {} exists'.format(meal_id))
 
-        parser = reqparse.RequestParser()
-        parser.add_argument('title', type=str)
-        parser.add_argument('price', type=int)
-        parser.add_argument('description', type=str)
-        args = parser.parse_args()
-
+        args = EDIT_MEAL_SCHEMA.validate()
         modified = meal.modify(args)
         if modified:
             meal.save()
@@ -109,7 +119,7 @@ class MealResource(Resource):
         """
         user = g.current_user
         meal = Meal.query.filter_by(
-            catering=user.catering).filter_by(id=meal_id).first()
+            catering_id=user.catering_id).filter_by(id=meal_id).first()
         if meal:
             meal.delete()
             return {
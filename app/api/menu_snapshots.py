@@ -0,0 +1,230 @@
+"""
+Module contains the snapshot cache of the public daily menu.
+
+GET /menu serves the menus of a date pre-serialized. Snapshots are
+dropped when a menu, meal or menu-meal link for the date is committed in
+this process, and are served only while the shared cache version of the
+date, which its ETag is made from, is the one they were built under, so
+commits of other processes are seen at once.
+"""
+import hashlib
+import threading
+import time
+from flask import current_app, has_app_context, has_request_context, \
+    request
+from sqlalchemy import event, inspect
+from .. import cache_versions, capacity, db
+from ..metrics import get_counters
+from ..models import Menu, Meal
+from ..serializers import dumps
+from .read_models import MenuRow, dump_menu_rows, menu_statement
+
+ALL_DATES = '*'
+CURRENT = 'meal_app.menu_snapshot'
+
+
+class MenuSnapshotCache:
+    """
+    MenuSnapshotCache. serialized menus of a date and their versions
+    """
+
+    def __init__(self, ttl, counters):
+        self.ttl = ttl
+        self.counters = counters
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self._versions = {}
+        self._epoch = '{:x}'.format(int(time.time()))
+        self._generation = 0
+
+    def version(self, date):
+        """
+        version. returns the current version of a date's menus
+        """
+        with self._lock:
+            return self._version(date)
+
+    def get(self, date, tag):
+        """
+        get. returns the snapshot of date built under the shared cache
+        version tag, None when there is no fresh one
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(date)
+            if snapshot is not None:
+                menus, version, built_tag, built_at = snapshot
+                if version == self._version(date) and built_tag == tag and \
+                        time.time() - built_at < self.ttl:
+                    self.counters.incr('hits')
+                    return menus
+                del self._snapshots[date]
+            self.counters.incr('misses')
+            return None
+
+    def put(self, date, version, tag, menus):
+        """
+        put. stores a snapshot unless the date changed while it was built
+        """
+        with self._lock:
+            if version != self._version(date):
+                return False
+            self._snapshots[date] = (menus, version, tag, time.time())
+            self.counters.incr('rebuilds')
+            return True
+
+    def invalidate(self, dates):
+        """
+        invalidate. drops snapshots of dates, ALL_DATES drops every date
+        """
+        with self._lock:
+            if ALL_DATES in dates:
+                self._generation += 1
+                self._versions.clear()
+                self._snapshots.clear()
+            else:
+                for date in dates:
+                    self._versions[date] = self._versions.get(date, 0) + 1
+                    self._snapshots.pop(date, None)
+            self.counters.incr('invalidations')
+
+    def _version(self, date):
+        return '{}.{}.{}'.format(
+            self._epoch, self._generation, self._versions.get(date, 0))
+
+
+def init_app(app):
+    """
+    init_app. attaches a menu snapshot cache to the application
+    """
+    app.extensions['menu_snapshots'] = MenuSnapshotCache(
+        app.config['MENU_SNAPSHOT_TTL'], get_counters('menu_snapshot', app))
+
+
+def get_cache():
+    """
+    get_cache. returns the menu snapshot cache of the current application
+    """
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('menu_snapshots')
+
+
+def snapshot_scopes(date):
+    """
+    snapshot_scopes. returns the cache version scopes of the menus of date
+    """
+    return [cache_versions.date_scope(date), cache_versions.ALL_DATES]
+
+
+def _snapshot(date):
+    # the tag is read before the menus, so a snapshot is never older than
+    # the tag it is served under
+    tag = cache_versions.current(snapshot_scopes(date))[0]
+    cache = get_cache()
+    cached = cache.get(date, tag)
+    if cached is not None:
+        return cached, tag
+    version = cache.version(date)
+    menus = [MenuRow._make(row) for row in db.session.execute(
+        menu_statement(Menu.date == date))]
+    snapshot = (dumps(dump_menu_rows(menus)),
+                capacity.capped_menu_ids([menu.id for menu in menus]))
+    cache.put(date, version, tag, snapshot)
+    return snapshot, tag
+
+
+def _remaining(capped):
+    return dumps({
+        str(menu_id): {str(meal_id): portions
+                       for meal_id, portions in meals.items()}
+        for menu_id, meals in capacity.remaining_portions(capped).items()
+    })
+
+
+def _current(date):
+    # read once per request, by remaining_tag and get_menu_snapshot
+    current = request.environ.get(CURRENT) if has_request_context() \
+        else None
+    if current is None or current[0] != date:
+        (menus, capped), version = _snapshot(date)
+        current = (date, menus, capped, _remaining(capped), version)
+        if has_request_context():
+            request.environ[CURRENT] = current
+    return current
+
+
+def get_menu_snapshot(date):
+    """
+    get_menu_snapshot. returns (body, version) of the serialized menus
+    of a date, building the snapshot on a miss. version is the shared
+    cache version tag the snapshot was built under. the remaining portions of
+    capped meals change with every order, so they are not part of the
+    snapshot and are read with one query when the date has any
+    """
+    _, menus, _, remaining, version = _current(date)
+    body = '{{"menus": {}, "remaining": {}}}\n'.format(menus, remaining)
+    return body, version
+
+
+def remaining_tag(date):
+    """
+    remaining_tag. returns a digest of the portions left on the capped
+    menus of a date, which orders change without bumping its cache
+    version, or an empty string when none is capped
+    """
+    _, _, capped, remaining, _ = _current(date)
+    if not capped:
+        return ''
+    return hashlib.sha1(remaining.encode()).hexdigest()[:12]
+
+
+def _changed_dates(session):
+    dates = set()
+    # placing an order appends to Meal.order, which alone changes no menu
+    dirty = [obj for obj in session.dirty if not isinstance(obj, Meal) or
+             session.is_modified(obj, include_collections=False)]
+    for obj in list(session.new) + dirty + list(session.deleted):
+        if isinstance(obj, Meal):
+            dates.add(ALL_DATES)
+        elif isinstance(obj, Menu):
+            history = inspect(obj).attrs.date.history
+            dates.update(date for date in
+                         list(history.deleted or ()) + [obj.date]
+                         if date is not None)
+    return dates
+
+
+def _collect(session, flush_context):
+    dates = _changed_dates(session)
+    if dates:
+        session.info.setdefault('menu_snapshot_dates', set()).update(dates)
+
+
+def _invalidate(session):
+    dates = session.info.pop('menu_snapshot_dates', None)
+    cache = get_cache()
+    if dates and cache is not None:
+        cache.invalidate(_as_dates(dates))
+
+
+def _discard(session, previous_transaction):
+    session.info.pop('menu_snapshot_dates', None)
+
+
+def mark_changed(date):
+    """
+    mark_changed. drops the snapshot of date once the session commits, for
+    changes the session does not flush such as menu_meals updates
+    """
+    db.session.info.setdefault('menu_snapshot_dates', set()).add(date)
+
+
+def _as_dates(dates):
+    # Menu.menu_date stores datetimes, snapshots are keyed by date
+    return set(date.date() if hasattr(date, 'date') else date
+               for date in dates)
+
+
+event.listen(db.session, 'after_flush', _collect)
+event.listen(db.session, 'after_commit', _invalidate)
+event.listen(db.session, 'after_soft_rollback', _discard)
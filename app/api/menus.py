@@ -4,12 +4,19 @@ Module contains API resource for exposing catering menus
 
 from datetime import datetime
 from flask_restplus import Resource, fields, abort
-from flask import g
-from .decorators import authenticate, admin_required
+from flask import g, current_app
+from .decorators import authenticate, admin_required, admission, \
+    conditional
 from . import api
-from . import parsers
-from .common import validate_meals_list
-from ..models import Menu, Meal
+from .common import resolve_meals, abort_missing_meals
+from .menu_snapshots import get_menu_snapshot, mark_changed, \
+    remaining_tag, snapshot_scopes
+from .pagination import PAGE_PARAMS
+from .read_models import menu_page
+from .schemas import MESSAGE, Field, Schema
+from .. import cache_versions, capacity, db
+from ..cache_versions import catering_scope, date_scope
+from ..models import Menu
 
 MENU_MODAL = api.model('Menu', {
     'title': fields.String(max_length=64),
@@ -18,6 +25,30 @@ MENU_MODAL = api.model('Menu', {
     'meals': fields.List(fields.Integer)
 })
 
+MENU_SCHEMA = Schema(
+    Field('title', required=True, max_length=64),
+    Field('description', max_length=200),
+    Field('meals', kind='ids', required=True),
+    Field('menu_date', kind='date', required=True)
+)
+
+EDIT_MENU_SCHEMA = Schema(
+    Field('title', max_length=64),
+    Field('description', max_length=200),
+    Field('meals', kind='edit_ids'),
+    Field('menu_date', kind='date')
+)
+
+MEAL_CAPACITY_MODEL = api.model('MealCapacity', {
+    'mealId': fields.Integer(required=True),
+    # omitted portions remove the cap of the meal
+    'portions': fields.Integer(min=0)
+})
+
+MENU_CAPACITY_MODEL = api.model('MenuCapacity', {
+    'capacity': fields.List(fields.Nested(MEAL_CAPACITY_MODEL), required=True)
+})
+
 
 class MenusResource(Resource):
     """
@@ -25,16 +56,19 @@ class MenusResource(Resource):
     """
     @authenticate
     @admin_required
+    @conditional('menus', lambda: [
+        catering_scope(g.current_user.catering_id)])
     @api.header('Authorization', type=str, description='Authentication token')
+    @api.doc(params=PAGE_PARAMS)
     def get(self):
         """
-        Allows a business to retrieve all menus
+        Allows a business to retrieve its menus a page at a time
         """
         user = g.current_user
-        menus = Menu.query.filter_by(catering=user.catering).order_by(
-            Menu.created_at.desc()).all()
+        menus, page = menu_page(Menu.catering_id == user.catering_id)
         return {
-            'menus': [menu.to_dict() for menu in menus],
+            'menus': menus,
+            'pagination': page.to_dict(),
             'status': 'success'
         }, 200
 
@@ -44,36 +78,42 @@ class MenuResource(Resource):
      Exposes a menu as a resource
     """
 
+    @admission('read')
+    @conditional('menu', lambda: snapshot_scopes(datetime.now().date()),
+                 extra=lambda: remaining_tag(datetime.now().date()))
+    @api.doc(responses={200: 'Success', 304: 'Not modified'})
+    @api.header('X-Menu-Version', 'Version of the menu snapshot served')
     def get(self):
         """
         Allows a customer to get a specific day menu
         """
         current_date = datetime.now().date()
-        menus = Menu.query.filter_by(date=current_date).all()
-        return {
-            'menus': [menu.to_dict() for menu in menus]
-        }, 200
+        body, version = get_menu_snapshot(current_date)
+        return current_app.response_class(
+            body, mimetype='application/json',
+            headers={'X-Menu-Version': version})
 
     @authenticate
     @admin_required
-    @api.expect(MENU_MODAL, validate=True)
+    @api.expect(MENU_MODAL)
     @api.header('Authorization', type=str, description='Authentication token')
     def post(self):
         """
         Allows a business create a specific day menu
         """
 
-        args = parsers.menu_modal.parse_args()
+        args = MENU_SCHEMA.validate()
         user = g.current_user
+        if Menu.query.filter_by(catering_id=user.catering_id).filter_by(
+                date=args['menu_date']).first():
+            abort(code=400, message=MESSAGE, errors={
+                'menu_date': 'Menu for the specific date {} is already '
+                             'set'.format(args['menu_date'])})
 
+        meals = resolve_meals(args['meals'], user.catering_id)
         menu = Menu(title=args['title'], description=args['description'],
-                    menu_date=args['menu_date'], catering=user.catering)
-        meals = args['meals']
-        validate_meals_list(meals)
-        for meal_id in meals:
-            meal = Meal.query.get(meal_id)
-            if meal:
-                menu.meals.append(meal)
+                    menu_date=args['menu_date'], catering_id=user.catering_id,
+                    meals=meals)
         menu.save()
         return menu.to_dict(), 201
 
@@ -83,12 +123,14 @@ class SpecificMenuResource(Resource):
      Returns a menu of a given id
     """
     @authenticate
+    @conditional('menu_by_id', lambda menu_id: [catering_scope(
+        db.session.query(Menu.catering_id).filter_by(id=menu_id).scalar())])
     @api.header('Authorization', type=str, description='Authentication token')
     def get(self, menu_id):
         """
         Returns a menu with a specific id.
         """
-        menu = Menu.query.get(menu_id)
+        menu = Menu.query.options(*Menu.to_dict_options()).get(menu_id)
         if menu:
             return {
                 'menu': menu.to_dict()
@@ -97,19 +139,23 @@ class SpecificMenuResource(Resource):
 
     @authenticate
     @admin_required
-    @api.expect(MENU_MODAL, validate=True)
+    @api.expect(MENU_MODAL)
     @api.header('Authorization', type=str, description='Authentication token')
     def put(self, menu_id):
         """
         modifies a menu
         """
         menu = Menu.query.filter_by(id=menu_id).filter_by(
-            catering=g.current_user.catering).first()
+            catering_id=g.current_user.catering_id).first()
         if not menu:
             abort(code=400, message='menu with id {} does not exist'.format(menu_id))
-        args = parsers.edit_menu_modal.parse_args()
-        if args.get('meals', None):
-            validate_meals_list(args["meals"])
+        args = EDIT_MENU_SCHEMA.validate()
+        if args['meals']:
+            args['meals'] = resolve_meals(
+                args['meals'], g.current_user.catering_id)
+            # meals taken off the menu take their portions with them
+            capacity.discard(menu.id, set(meal.id for meal in menu.meals) -
+                             set(meal.id for meal in args['meals']))
         modified = menu.modify(args)
         if modified:
             menu.save()
@@ -124,7 +170,7 @@ class SpecificMenuResource(Resource):
         deletes a caterer's menu
         """
         menu = Menu.query.filter_by(id=menu_id).filter_by(
-            catering=g.current_user.catering).first()
+            catering_id=g.current_user.catering_id).first()
         if menu:
             menu.delete()
             return {
@@ -134,3 +180,51 @@ class SpecificMenuResource(Resource):
         abort(
             code=400, message='Menu with id {0} doesnot exist'.format(menu_id)
         )
+
+
+class MenuCapacityResource(Resource):
+    """
+    Exposes the portions offered of the meals on a menu
+    """
+    @authenticate
+    @api.header('Authorization', type=str, description='Authentication token')
+    def get(self, menu_id):
+        """
+        Returns the portions left of the capped meals on a menu
+        """
+        return {
+            'menuId': menu_id,
+            'remaining': remaining_of(menu_id)
+        }, 200
+
+    @authenticate
+    @admin_required
+    @api.expect(MENU_CAPACITY_MODEL, validate=True)
+    @api.header('Authorization', type=str, description='Authentication token')
+    def put(self, menu_id):
+        """
+        Allows a business to set how many portions of meals a menu offers
+        """
+        menu = Menu.query.filter_by(id=menu_id).filter_by(
+            catering_id=g.current_user.catering_id).first()
+        if not menu:
+            abort(code=400, message='menu with id {} does not exist'.format(menu_id))
+        capacities = {item['mealId']: item.get('portions')
+                      for item in api.payload['capacity']}
+        abort_missing_meals(list(capacities),
+                            set(meal.id for meal in menu.meals))
+        capacity.set_capacity(menu.id, capacities)
+        mark_changed(menu.date)
+        cache_versions.bump([date_scope(menu.date)])
+        return {
+            'menuId': menu.id,
+            'remaining': remaining_of(menu.id)
+        }, 200
+
+
+def remaining_of(menu_id):
+    """
+    remaining_of. returns the portions left of a menu's capped meals
+    """
+    portions = capacity.remaining_portions([menu_id]).get(menu_id, {})
+    return {str(meal_id): left for meal_id, left in portions.items()}
@@ -0,0 +1,24 @@
+"""
+Module contains API resource for exposing instrumentation counters
+"""
+from flask_restplus import Resource
+from .decorators import authenticate, admin_required
+from ..metrics import snapshot_all
+from . import api
+
+
+class MetricsResource(Resource):
+    """
+    MetricsResource. exposes in-process counters of this worker
+    """
+    @authenticate
+    @admin_required
+    @api.header('Authorization', type=str, description='Authentication token')
+    def get(self):
+        """
+        Returns counters such as principal cache hits and misses
+        """
+        return {
+            'metrics': snapshot_all(),
+            'status': 'success'
+        }, 200
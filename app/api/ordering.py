@@ -0,0 +1,89 @@
+"""
+Module contains the order placement pipeline.
+
+Placing an order costs one query loading the menu together with the
+requested meals that are on it, pricing in memory and one flush that
+inserts the order and then its order_meals rows. With the order intake
+enabled the flush is left to its writer thread, which saves orders in
+batches.
+"""
+from flask_restplus import abort
+from sqlalchemy import and_
+from .. import capacity, db
+from ..models import Menu, Meal, Order
+from ..models.menu import menu_meals
+from ..order_intake import PendingOrder, get_intake
+from .common import parse_meal_ids, abort_missing_meals
+
+
+def load_menu_meals(menu_id, meal_ids):
+    """
+    load_menu_meals. loads a menu and those of meal_ids that are on it in
+    one query. aborts if the menu or any meal is missing, otherwise returns
+    the menu, the meals and the ids of those with a capacity.
+    """
+    rows = db.session.query(Menu, Meal, menu_meals.c.capacity).outerjoin(
+        menu_meals, and_(menu_meals.c.menu_id == Menu.id,
+                         menu_meals.c.meal_id.in_(meal_ids))
+    ).outerjoin(Meal, Meal.id == menu_meals.c.meal_id).filter(
+        Menu.id == menu_id).all()
+    if not rows:
+        abort(code=400, message='Input payload validation failed', errors={
+            'menuId': 'Menu with id {} does not exist'.format(menu_id)})
+    menu = rows[0][0]
+    meals_by_id = {meal.id: meal for _, meal, _ in rows if meal is not None}
+    abort_missing_meals(meal_ids, meals_by_id)
+    capped = [meal.id for _, meal, capacity in rows if capacity is not None]
+    return menu, [meals_by_id[meal_id] for meal_id in meal_ids], capped
+
+
+def price_order(meals, order_count):
+    """
+    price_order. returns the total cost of order_count portions of meals
+    """
+    return sum(meal.price for meal in meals) * order_count
+
+
+def build_order(customer_id, menu_id, meal_ids, order_count):
+    """
+    build_order. validates and prices an order and takes its portions
+    of capped meals, the order itself is not saved
+    """
+    meal_ids = parse_meal_ids(meal_ids)
+    menu, meals, capped = load_menu_meals(menu_id, meal_ids)
+    reservations = capacity.reserve(menu.id, capped, order_count)
+    return Order(total_cost=price_order(meals, order_count), meals=meals,
+                 customer_id=customer_id, catering_id=menu.catering_id,
+                 menu_id=menu.id, order_count=order_count,
+                 reservations=reservations)
+
+
+def queue_order(intake, customer, menu_id, meal_ids, order_count):
+    """
+    queue_order. validates and prices an order, then waits for the order
+    intake to take its portions and save it in a batch
+    """
+    meal_ids = parse_meal_ids(meal_ids)
+    menu, meals, capped = load_menu_meals(menu_id, meal_ids)
+    values = {
+        'total_cost': price_order(meals, order_count),
+        'customer_id': customer.id,
+        'catering_id': menu.catering_id,
+        'menu_id': menu.id,
+        'order_count': order_count
+    }
+    return intake.place(PendingOrder(values, meal_ids, customer.to_dict(),
+                                     capped))
+
+
+def place_order(customer, menu_id, meal_ids, order_count):
+    """
+    place_order. validates, prices and saves an order, returns it
+    serialized
+    """
+    intake = get_intake()
+    if intake is not None:
+        return queue_order(intake, customer, menu_id, meal_ids, order_count)
+    order = build_order(customer.id, menu_id, meal_ids, order_count)
+    order.save()
+    return order.to_dict(customer=customer.to_dict())
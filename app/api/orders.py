@@ -4,11 +4,26 @@ Module contains Api resources for exposing orders
 import datetime
 from flask import g, current_app
 from flask_restplus import Resource, fields, abort
-from ..models import Order, Meal, Menu
-from .decorators import authenticate, admin_required
+from .. import capacity
+from ..models import Order
+from .decorators import authenticate, admin_required, admission
 from . import api
-from .common import validate_meals_list
-from .parsers import orders_parser, edit_orders_parser
+from .idempotency import idempotent
+from .common import parse_meal_ids
+from .ordering import load_menu_meals, place_order
+from .pagination import PAGE_PARAMS
+from .read_models import order_page
+from .parsers import orders_parser, edit_orders_parser, order_list_parser
+
+IDEMPOTENCY_PARAMS = {
+    'Idempotency-Key': {
+        'in': 'header', 'type': 'string',
+        'description': 'Retries with the same key replay the first response'
+    }
+}
+
+ORDER_LIST_PARAMS = dict(PAGE_PARAMS, status='Only orders in this status, '
+                         'one of {}'.format(', '.join(Order.STATUSES)))
 
 ORDER_MODEL = api.model('order', {
     'meals': fields.List(fields.Integer),
@@ -21,6 +36,7 @@ class OrderResource(Resource):
     """
      Exposes order resource
     """
+    @admission('read')
     @authenticate
     @api.header('Authorization', type=str, description='Authentication token')
     def get(self, order_id):
@@ -28,8 +44,8 @@ class OrderResource(Resource):
         Allows a customer to get his order details
         """
         user = g.current_user
-        order = Order.query.filter_by(
-            customer=user).filter_by(id=order_id).first()
+        order = Order.query.options(*Order.to_dict_options()).filter_by(
+            customer_id=user.id).filter_by(id=order_id).first()
         if not order:
             abort(
                 code=400, message='Order with such id {} doesnot exist'.format(order_id)
@@ -39,25 +55,30 @@ class OrderResource(Resource):
             'order': order.to_dict()
         }, 200
 
+    @admission('write')
     @authenticate
+    @idempotent
     @api.expect(ORDER_MODEL, validate=True)
     @api.header('Authorization', type=str, description='Authentication token')
+    @api.doc(params=IDEMPOTENCY_PARAMS)
     def put(self, order_id):
         """
         Allows a customer to modify an order
         """
-        user = g.current_user
-        order = Order.query.filter_by(
-            customer=user).filter_by(id=order_id).first()
-        if not order:
-            abort(
-                code=400, message='Order with such id {} doesnot exist'.format(order_id))
+        order = find_order_for_update(order_id)
+        if order.status == Order.CANCELLED:
+            abort(code=400, message='Order was cancelled and cannot be modified')
         if order.is_expired():
             abort(code=400, message='Order expired and cannot be modify it')
         args = edit_orders_parser.parse_args()
-        meals = args['meals']
+        # like placed orders, changed orders only take meals of their menu
+        menu, meals, capped = load_menu_meals(order.menu_id,
+                                              parse_meal_ids(args['meals']))
         order_count = args['orderCount']
-        validate_meals_list(meals)
+        # the old portions go back before the new ones are taken, a SoldOut
+        # rolls both back with the rest of the request
+        capacity.release(menu.id, order.reservations)
+        order.reservations = capacity.reserve(menu.id, capped, order_count)
         expires_at = datetime.datetime.now(
         ) + datetime.timedelta(minutes=current_app.config['ORDER_EXPIRES_IN'])
         order.expires_at = expires_at
@@ -70,6 +91,47 @@ class OrderResource(Resource):
             'order': order.to_dict()
         }, 200
 
+    @admission('write')
+    @authenticate
+    @api.header('Authorization', type=str, description='Authentication token')
+    def delete(self, order_id):
+        """
+        Allows a customer to cancel an order until it is locked
+        """
+        order = find_order_for_update(order_id)
+        if order.status == Order.CANCELLED:
+            abort(code=400, message='Order is already cancelled')
+        if order.is_expired():
+            abort(code=400, message='Order expired and cannot be cancelled')
+        order.status = Order.CANCELLED
+        capacity.release(order.menu_id, order.reservations)
+        order.reservations = []
+        order.save()
+        return {
+            'order': order.to_dict()
+        }, 200
+
+
+def find_order_for_update(order_id):
+    """
+    find_order_for_update. loads an order of the current user, locking it
+    so the sweeper cannot lock it while it is changed
+    """
+    order = Order.query.filter_by(customer_id=g.current_user.id).filter_by(
+        id=order_id).with_for_update().first()
+    if not order:
+        abort(
+            code=400, message='Order with such id {} doesnot exist'.format(order_id))
+    return order
+
+
+def status_filters():
+    """
+    status_filters. returns the filters of the order status asked for
+    """
+    status = order_list_parser.parse_args()['status']
+    return [Order.status_filter(status)] if status else []
+
 
 class CustomerOrderResource(Resource):
     """
@@ -78,18 +140,25 @@ class CustomerOrderResource(Resource):
     @authenticate
     @admin_required
     @api.header('Authorization', type=str, description='Authentication token')
+    @api.doc(params=ORDER_LIST_PARAMS)
     def get(self):
         """
-        Allows a business get orders placed to their catering
+        Allows a business get orders placed to their catering, newest first
         """
         user = g.current_user
+        orders, page = order_page(Order.catering_id == user.catering_id,
+                                  *status_filters())
         return {
-            'orders': [order.to_dict() for order in user.catering.orders]
+            'orders': orders,
+            'pagination': page.to_dict()
         }
 
+    @admission('write')
     @authenticate
+    @idempotent
     @api.expect(ORDER_MODEL, validate=True)
     @api.header('Authorization', type=str, description='Authentication token')
+    @api.doc(params=IDEMPOTENCY_PARAMS)
     def post(self):
         """
         Allows a user to place an order to catering for food.
@@ -97,24 +166,10 @@ class CustomerOrderResource(Resource):
         customer = g.current_user
 
         args = orders_parser.parse_args()
-        menu = Menu.query.filter_by(id=args['menuId']).first()
-        meals = args['meals']
-        order_count = args.get('orderCount', 1)
-        validate_meals_list(meals)
-        order_meals = []
-        total_cost = 0
-        for meal_id in meals:
-            meal = Meal.query.get(meal_id)
-            if meal:
-                total_cost += meal.price
-                order_meals.append(meal)
-        total_cost = total_cost * order_count
-        order = Order(total_cost=total_cost, meals=order_meals,
-                      customer=customer, catering=menu.catering, menu=menu,
-                      order_count=order_count)
-        order.save()
+        order = place_order(customer, args['menuId'], args['meals'],
+                            args.get('orderCount', 1))
         return {
-            'order': order.to_dict()
+            'order': order
         }, 201
 
 
@@ -122,15 +177,18 @@ class MyOrderResource(Resource):
     """
     Resource exposes a customer's orders as an endpoint.
     """
+    @admission('read')
     @authenticate
     @api.header('Authorization', type=str, description='Authentication token')
+    @api.doc(params=ORDER_LIST_PARAMS)
     def get(self):
         """
-        Allows a customer to get thier previous orders
+        Allows a customer to get thier previous orders, newest first
         """
         customer = g.current_user
-        orders = Order.query.filter_by(customer=customer).order_by(
-            Order.created_at.desc()).all()
+        orders, page = order_page(Order.customer_id == customer.id,
+                                  *status_filters())
         return {
-            'orders': [order.to_dict() for order in orders]
+            'orders': orders,
+            'pagination': page.to_dict()
         }
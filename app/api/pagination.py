@@ -0,0 +1,124 @@
+"""
+Module contains keyset pagination for list endpoints.
+
+Rows are ordered newest first by (created_at, id) and a page continues
+strictly after the last row of the previous page, so fetching any page
+costs the same however much history a tenant has.
+"""
+import base64
+import datetime
+import json
+from urllib.parse import urlencode
+from flask import current_app, request
+from flask_restplus import abort
+from sqlalchemy import func, select, tuple_
+from .. import db
+
+CURSOR_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+PAGE_PARAMS = {
+    'limit': 'Maximum number of items to return',
+    'cursor': 'Opaque cursor returned as nextCursor by the previous page',
+    'count': 'Set to true to include the total number of items'
+}
+
+
+class Page:
+    """
+    Page. a slice of rows and the cursor to the next slice
+    """
+
+    def __init__(self, items, limit, next_cursor=None, total=None):
+        self.items = items
+        self.limit = limit
+        self.next_cursor = next_cursor
+        self.total = total
+
+    def next_link(self):
+        """
+        next_link. returns the url of the next page or None
+        """
+        if self.next_cursor is None:
+            return None
+        params = request.args.to_dict()
+        params['cursor'] = self.next_cursor
+        params['limit'] = self.limit
+        return '{}?{}'.format(request.path, urlencode(sorted(params.items())))
+
+    def to_dict(self):
+        """
+        to_dict. turns page metadata into dict for easy serialization
+        """
+        data = {
+            'limit': self.limit,
+            'nextCursor': self.next_cursor,
+            'next': self.next_link()
+        }
+        if self.total is not None:
+            data['total'] = self.total
+        return data
+
+
+def encode_cursor(created_at, row_id):
+    """
+    encode_cursor. returns an opaque cursor for a row position
+    """
+    raw = json.dumps([created_at.strftime(CURSOR_DATE_FORMAT), row_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    decode_cursor. returns the (created_at, id) position of a cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        created_at, row_id = json.loads(raw.decode('utf-8'))
+        return (datetime.datetime.strptime(created_at, CURSOR_DATE_FORMAT),
+                int(row_id))
+    except (ValueError, TypeError):
+        abort(code=400, message='Invalid pagination cursor')
+
+
+def page_limit():
+    """
+    page_limit. returns the requested page size within configured bounds
+    """
+    default = current_app.config['PAGE_SIZE']
+    try:
+        limit = int(request.args.get('limit', default))
+    except ValueError:
+        abort(code=400, message='limit must be an integer')
+    return max(1, min(limit, current_app.config['MAX_PAGE_SIZE']))
+
+
+def paginate_rows(statement, model, make_row):
+    """
+    paginate_rows. returns a Page of a Core select of model's table,
+    newest first, turning every result row into a read only row with
+    make_row. rows must have created_at and id.
+
+    Reads `limit`, `cursor` and `count` from the query string; total counts
+    are only computed when `count=true` as they cost a full count.
+    """
+    limit = page_limit()
+    total = None
+    if request.args.get('count', '').lower() == 'true':
+        total = db.session.execute(select([func.count()]).select_from(
+            statement.alias())).scalar()
+    cursor = request.args.get('cursor')
+    if cursor:
+        position = decode_cursor(cursor)
+        statement = statement.where(
+            tuple_(model.created_at, model.id) < position)
+    rows = [make_row(row) for row in db.session.execute(statement.order_by(
+        model.created_at.desc(), model.id.desc()).limit(limit + 1))]
+    return _page(rows, limit, total)
+
+
+def _page(rows, limit, total):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return Page(rows, limit, next_cursor, total)
@@ -2,28 +2,46 @@
 Module contains API resource parsers
 """
 from flask_restplus import reqparse
-from .common import str_type, edit_menu_date_type, menu_date_type, type_menu_id
-
-menu_modal = reqparse.RequestParser()
-menu_modal.add_argument('title', type=str_type, required=True)
-menu_modal.add_argument('description', type=str_type)
-menu_modal.add_argument('meals', required=True, action='append')
-menu_modal.add_argument('menu_date', type=menu_date_type, required=True)
-
-
-edit_menu_modal = reqparse.RequestParser()
-edit_menu_modal.add_argument('title', type=str_type)
-edit_menu_modal.add_argument('description', type=str_type)
-edit_menu_modal.add_argument('meals', action='append')
-edit_menu_modal.add_argument('menu_date', type=edit_menu_date_type)
-
+from ..models import Order
+from .common import int_type, date_type
 
 orders_parser = reqparse.RequestParser()
-orders_parser.add_argument('menuId', type=type_menu_id, required=True)
+# the menu is loaded together with its meals when the order is placed
+orders_parser.add_argument('menuId', type=int_type, required=True)
 orders_parser.add_argument('meals', required=True, action='append')
 orders_parser.add_argument('orderCount', required=True, type=int)
 
 
+order_list_parser = reqparse.RequestParser()
+order_list_parser.add_argument('status', choices=Order.STATUSES,
+                               location='args')
+
+
 edit_orders_parser = reqparse.RequestParser()
 edit_orders_parser.add_argument('meals', required=True, action='append')
 edit_orders_parser.add_argument('orderCount', required=True, type=int)
+
+
+sales_report_parser = reqparse.RequestParser()
+sales_report_parser.add_argument('from', dest='start', type=date_type,
+                                 required=True, location='args')
+sales_report_parser.add_argument('to', dest='end', type=date_type,
+                                 required=True, location='args')
+sales_report_parser.add_argument('top', type=int, default=5, location='args')
+
+
+export_orders_parser = reqparse.RequestParser()
+export_orders_parser.add_argument('format', dest='export_format',
+                                  choices=('ndjson', 'csv'), default='ndjson',
+                                  location='args')
+export_orders_parser.add_argument('from', dest='start', type=date_type,
+                                  location='args')
+export_orders_parser.add_argument('to', dest='end', type=date_type,
+                                  location='args')
+export_orders_parser.add_argument('menuId', dest='menu_id', type=int,
+                                  location='args')
+
+
+prep_sheet_parser = reqparse.RequestParser()
+prep_sheet_parser.add_argument('menuId', type=int, location='args')
+prep_sheet_parser.add_argument('date', type=date_type, location='args')
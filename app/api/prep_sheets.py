@@ -0,0 +1,214 @@
+"""
+Module contains the kitchen prep sheet of a menu or a date.
+
+A prep sheet lists the portions to cook and the revenue of every meal
+ordered, computed with one GROUP BY over orders and order_meals. Prep
+sheets are cached per catering until an order of one of their menus, or
+a meal or menu of the catering, is committed. Commits of this process
+drop them at once; those of other processes are seen through the shared
+cache versions of the catering and the menus, as a sheet is served only
+under the tag it was built under.
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from sqlalchemy import event, func
+from .. import cache_versions, db
+from ..metrics import get_counters
+from ..models import Meal, Menu, Order
+from ..models.order import order_meals
+
+
+class PrepSheetCache:
+    """
+    PrepSheetCache. bounded LRU cache of prep sheets and the menus they
+    cover
+    """
+
+    def __init__(self, max_size, ttl, counters):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.counters = counters
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generation = 0
+
+    def generation(self):
+        """
+        generation. returns a number that changes on every invalidation
+        """
+        with self._lock:
+            return self._generation
+
+    def get(self, key):
+        """
+        get. returns (sheet, menu_ids, tag) of a prep sheet younger than
+        the ttl or None, the caller checks tag is still current
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                sheet, menu_ids, tag, built_at = entry
+                if time.time() - built_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    return sheet, menu_ids, tag
+                del self._entries[key]
+            return None
+
+    def put(self, key, sheet, menu_ids, tag, generation):
+        """
+        put. stores a prep sheet built under the cache version tag unless
+        orders changed while it was built
+        """
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._entries[key] = (sheet, frozenset(menu_ids), tag,
+                                  time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, menu_ids, catering_ids):
+        """
+        invalidate. drops prep sheets covering menu_ids or of catering_ids
+        """
+        with self._lock:
+            self._generation += 1
+            for key in list(self._entries):
+                if key[0] in catering_ids or \
+                        self._entries[key][1] & menu_ids:
+                    del self._entries[key]
+            self.counters.incr('invalidations')
+
+
+def init_app(app):
+    """
+    init_app. attaches a prep sheet cache to the application
+    """
+    app.extensions['prep_sheets'] = PrepSheetCache(
+        app.config['PREP_SHEET_CACHE_SIZE'], app.config['PREP_SHEET_TTL'],
+        get_counters('prep_sheet', app))
+
+
+def get_cache():
+    """
+    get_cache. returns the prep sheet cache of the current application
+    """
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('prep_sheets')
+
+
+def get_prep_sheet(catering_id, menu_id=None, date=None):
+    """
+    get_prep_sheet. returns the prep sheet of a catering's menu or of all
+    its menus of a date
+    """
+    cache = get_cache()
+    key = (catering_id, menu_id, date)
+    cached = cache.get(key)
+    if cached is not None:
+        sheet, menu_ids, tag = cached
+        if tag == sheet_tag(catering_id, menu_ids):
+            cache.counters.incr('hits')
+            return sheet
+    cache.counters.incr('misses')
+    generation = cache.generation()
+    menu_ids = sheet_menu_ids(catering_id, menu_id, date)
+    # the tag is read before the orders, so a sheet is never older than
+    # the tag it is served under
+    tag = sheet_tag(catering_id, menu_ids)
+    sheet = build_prep_sheet(catering_id, menu_ids)
+    sheet.update({'menuId': menu_id, 'date': date and str(date)})
+    if menu_id is not None or \
+            sheet_menu_ids(catering_id, menu_id, date) == menu_ids:
+        # a menu added to the date meanwhile is not covered by the tag
+        cache.put(key, sheet, menu_ids, tag, generation)
+    return sheet
+
+
+def sheet_menu_ids(catering_id, menu_id=None, date=None):
+    """
+    sheet_menu_ids. returns the ids of the menus a prep sheet covers
+    """
+    if menu_id is not None:
+        return [menu_id]
+    return sorted(row[0] for row in db.session.query(Menu.id).filter(
+        Menu.catering_id == catering_id, Menu.date == date))
+
+
+def sheet_tag(catering_id, menu_ids):
+    """
+    sheet_tag. returns the shared cache version tag of a prep sheet, which
+    changes with the meals and menus of the catering and the orders of
+    menu_ids
+    """
+    return cache_versions.current(
+        [cache_versions.catering_scope(catering_id)] +
+        [cache_versions.menu_scope(menu_id) for menu_id in menu_ids])[0]
+
+
+def build_prep_sheet(catering_id, menu_ids):
+    """
+    build_prep_sheet. sums portions and revenue per meal ordered from
+    menus, leaving out cancelled orders. a meal of an order counts
+    order_count portions at its price
+    """
+    meals = []
+    if menu_ids:
+        rows = db.session.query(
+            Meal.id, Meal.title, func.count(Order.id),
+            func.sum(Order.order_count),
+            func.sum(Order.order_count * Meal.price)
+        ).select_from(Order).join(
+            order_meals, order_meals.c.order_id == Order.id
+        ).join(Meal, Meal.id == order_meals.c.meal_id).filter(
+            Order.catering_id == catering_id, Order.menu_id.in_(menu_ids),
+            Order.status != Order.CANCELLED
+        ).group_by(Meal.id, Meal.title).order_by(Meal.title, Meal.id)
+        meals = [{
+            'mealId': meal_id,
+            'title': title,
+            'orders': orders,
+            'portions': int(portions or 0),
+            'revenue': float(revenue or 0)
+        } for meal_id, title, orders, portions, revenue in rows]
+    return {
+        'meals': meals,
+        'totalPortions': sum(meal['portions'] for meal in meals),
+        'totalRevenue': sum(meal['revenue'] for meal in meals)
+    }
+
+
+def _collect(session, flush_context):
+    menu_ids = session.info.setdefault('prep_sheet_menus', set())
+    catering_ids = session.info.setdefault('prep_sheet_caterings', set())
+    # placing an order appends to Meal.order, which alone changes no meal
+    dirty = [obj for obj in session.dirty if not isinstance(obj, Meal) or
+             session.is_modified(obj, include_collections=False)]
+    for obj in list(session.new) + dirty + list(session.deleted):
+        if isinstance(obj, Order):
+            menu_ids.add(obj.menu_id)
+        elif isinstance(obj, (Meal, Menu)):
+            catering_ids.add(obj.catering_id)
+
+
+def _invalidate(session):
+    menu_ids = session.info.pop('prep_sheet_menus', None)
+    catering_ids = session.info.pop('prep_sheet_caterings', None)
+    cache = get_cache()
+    if (menu_ids or catering_ids) and cache is not None:
+        cache.invalidate(menu_ids or set(), catering_ids or set())
+
+
+def _discard(session, previous_transaction):
+    session.info.pop('prep_sheet_menus', None)
+    session.info.pop('prep_sheet_caterings', None)
+
+
+event.listen(db.session, 'after_flush', _collect)
+event.listen(db.session, 'after_commit', _invalidate)
+event.listen(db.session, 'after_soft_rollback', _discard)
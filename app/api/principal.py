@@ -0,0 +1,230 @@
+"""
+Module contains the authenticated principal and its per process cache
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from itsdangerous import TimedJSONWebSignatureSerializer as Serializer
+from sqlalchemy import event
+from .. import db
+from ..metrics import get_counters
+from ..models import User, Role, Catering
+from ..models.role import Permission
+
+
+class Principal:
+    """
+    Principal. the identity of an authenticated user.
+
+    Holds only plain values so that it can be shared between requests
+    without touching the database session.
+    """
+    __slots__ = ('id', 'permissions', 'catering_id', 'name', 'email')
+
+    def __init__(self, user_id, permissions, catering_id, name=None,
+                 email=None):
+        self.id = user_id
+        self.permissions = permissions
+        self.catering_id = catering_id
+        self.name = name
+        self.email = email
+
+    @staticmethod
+    def from_user(user):
+        """
+        from_user. builds a principal from a user model
+        """
+        permissions = user.role.permissions if user.role is not None else 0
+        catering_id = user.catering.id if user.catering is not None else None
+        return Principal(user.id, permissions or 0, catering_id,
+                         user.name, user.email)
+
+    def to_dict(self):
+        """
+        to_dict. serializes the principal like User.to_dict
+        """
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email
+        }
+
+    def can(self, permissions):
+        """
+        can. determines if the principal holds the given permissions
+        """
+        return (self.permissions & permissions) == permissions
+
+    def is_administrator(self):
+        """
+        is_administrator. determines if the principal is a caterer
+        """
+        return self.can(Permission.CATERER)
+
+    @property
+    def user(self):
+        """
+        loads the user model behind the principal
+        """
+        return User.query.get(self.id)
+
+
+class PrincipalCache:
+    """
+    PrincipalCache. bounded LRU cache of principals keyed by token digest.
+
+    Entries expire after ttl seconds or when the token expires, whichever
+    comes first. Changes to users, roles and caterings evict affected
+    entries in this process; the ttl bounds staleness across processes.
+    """
+
+    def __init__(self, max_size, ttl, counters):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.counters = counters
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._by_user = {}
+
+    def get(self, digest):
+        """
+        get. returns a cached principal or None
+        """
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                principal, expires_at = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(digest)
+                    self.counters.incr('hits')
+                    return principal
+                self._remove(digest)
+            self.counters.incr('misses')
+            return None
+
+    def put(self, digest, principal, token_expires_at=None):
+        """
+        put. caches a principal
+        """
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            self._remove(digest)
+            self._entries[digest] = (principal, expires_at)
+            self._by_user.setdefault(principal.id, set()).add(digest)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.counters.incr('evictions')
+
+    def invalidate_user(self, user_id):
+        """
+        invalidate_user. drops all cached principals of a user
+        """
+        with self._lock:
+            for digest in list(self._by_user.get(user_id, ())):
+                self._remove(digest)
+                self.counters.incr('invalidations')
+
+    def clear(self):
+        """
+        clear. drops all cached principals
+        """
+        with self._lock:
+            self.counters.incr('invalidations', len(self._entries))
+            self._entries.clear()
+            self._by_user.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, digest):
+        entry = self._entries.pop(digest, None)
+        if entry is not None:
+            digests = self._by_user.get(entry[0].id)
+            if digests is not None:
+                digests.discard(digest)
+                if not digests:
+                    del self._by_user[entry[0].id]
+
+
+def init_app(app):
+    """
+    init_app. attaches a principal cache to the application
+    """
+    app.extensions['principal_cache'] = PrincipalCache(
+        app.config['PRINCIPAL_CACHE_SIZE'], app.config['PRINCIPAL_CACHE_TTL'],
+        get_counters('principal_cache', app))
+
+
+def get_cache():
+    """
+    get_cache. returns the principal cache of the current application
+    """
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('principal_cache')
+
+
+def token_digest(token):
+    """
+    token_digest. returns the cache key of a token
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def load_principal(token):
+    """
+    load_principal. verifies a token and returns its principal.
+
+    Returns None when the token is invalid or the user no longer exists.
+    """
+    cache = get_cache()
+    digest = token_digest(token)
+    principal = cache.get(digest)
+    if principal is not None:
+        return principal
+
+    serializer = Serializer(current_app.config['SECRET_KEY'])
+    try:
+        data, header = serializer.loads(token, return_header=True)
+        user_id = int(data['id'])
+    except Exception:  # pylint: disable=broad-except
+        return None
+    user = User.query.options(
+        db.joinedload('role'), db.joinedload('catering')).get(user_id)
+    if user is None:
+        return None
+    principal = Principal.from_user(user)
+    cache.put(digest, principal, header.get('exp'))
+    return principal
+
+
+def _invalidate_user(mapper, connection, target):
+    cache = get_cache()
+    if cache is not None:
+        cache.invalidate_user(target.id)
+
+
+def _invalidate_catering_admin(mapper, connection, target):
+    cache = get_cache()
+    if cache is not None and target.admin_id is not None:
+        cache.invalidate_user(target.admin_id)
+
+
+def _invalidate_all(mapper, connection, target):
+    cache = get_cache()
+    if cache is not None:
+        cache.clear()
+
+
+for _event in ('after_update', 'after_delete'):
+    event.listen(User, _event, _invalidate_user)
+    event.listen(Role, _event, _invalidate_all)
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Catering, _event, _invalidate_catering_admin)
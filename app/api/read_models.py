@@ -0,0 +1,158 @@
+"""
+Module contains the read only path of the list endpoints.
+
+List endpoints select the columns they serialize with Core select()
+statements and turn result rows into namedtuples, so no ORM instances,
+identity map entries or change tracking are made for rows that are only
+turned into JSON. The meals of a page, and its caterings or customers,
+are selected with the page, and each is serialized once.
+"""
+from collections import namedtuple
+from sqlalchemy import and_, select
+from .. import db
+from ..models import Catering, Meal, Menu, Order, User
+from ..models.menu import menu_meals
+from ..models.order import order_meals
+from ..serializers import CATERING, MEAL, MENU, ORDER, USER
+from .pagination import paginate_rows
+
+# ids of related rows are selected IN chunks this size, below the bound
+# parameter limit of every database
+CHUNK_SIZE = 500
+
+MealRow = namedtuple('MealRow', MEAL.attributes + ('created_at',))
+
+MenuRow = namedtuple('MenuRow', MENU.attributes + (
+    'created_at', 'catering_id', 'catering_name', 'catering_address'))
+
+OrderRow = namedtuple('OrderRow', ORDER.attributes + (
+    'customer_id', 'customer_name', 'customer_email'))
+
+
+def _labeled(serializer, model, prefix):
+    return [column.label('{}_{}'.format(prefix, column.key))
+            for column in serializer.columns(model)]
+
+
+def meal_statement(*where):
+    """
+    meal_statement. selects the columns of MealRow
+    """
+    return select(MEAL.columns(Meal) + [Meal.created_at]).where(and_(*where))
+
+
+def menu_statement(*where):
+    """
+    menu_statement. selects the columns of MenuRow
+    """
+    return select(
+        MENU.columns(Menu) + [Menu.created_at] +
+        _labeled(CATERING, Catering, 'catering')
+    ).select_from(Menu.__table__.outerjoin(
+        Catering.__table__, Catering.id == Menu.catering_id)).where(
+        and_(*where))
+
+
+def order_statement(*where):
+    """
+    order_statement. selects the columns of OrderRow
+    """
+    return select(
+        ORDER.columns(Order) + _labeled(USER, User, 'customer')
+    ).select_from(Order.__table__.outerjoin(
+        User.__table__, User.id == Order.customer_id)).where(
+        and_(*where))
+
+
+def _meals_of(pivot, owner_key, owner_ids):
+    """
+    returns {owner id: [meal dict]} of the meals linked to owners, a meal
+    linked to several owners is serialized once
+    """
+    meals_by_owner = {}
+    dumped = {}
+    owner_ids = list(owner_ids)
+    for start in range(0, len(owner_ids), CHUNK_SIZE):
+        rows = db.session.execute(select(
+            [pivot.c[owner_key]] + MEAL.columns(Meal)
+        ).select_from(pivot.join(
+            Meal.__table__, Meal.id == pivot.c.meal_id
+        )).where(pivot.c[owner_key].in_(
+            owner_ids[start:start + CHUNK_SIZE])).order_by(Meal.id))
+        for row in rows:
+            meal = dumped.get(row[1])
+            if meal is None:
+                meal = dumped[row[1]] = MEAL.from_row(row[1:])
+            meals_by_owner.setdefault(row[0], []).append(meal)
+    return meals_by_owner
+
+
+def dump_meal_rows(rows):
+    """
+    dump_meal_rows. returns the dicts of MealRows
+    """
+    return [MEAL.from_row(row) for row in rows]
+
+
+def dump_menu_rows(rows):
+    """
+    dump_menu_rows. returns the dicts of MenuRows with their meals and
+    caterings
+    """
+    meals = _meals_of(menu_meals, 'menu_id', (row.id for row in rows))
+    caterings = {}
+    menus = []
+    for row in rows:
+        data = MENU.from_row(row)
+        catering = caterings.get(row.catering_id)
+        if catering is None:
+            catering = caterings[row.catering_id] = CATERING.from_row(
+                row[-3:])
+        data['meals'] = meals.get(row.id, [])
+        data['catering'] = catering
+        menus.append(data)
+    return menus
+
+
+def dump_order_rows(rows):
+    """
+    dump_order_rows. returns the dicts of OrderRows with their meals and
+    customers
+    """
+    meals = _meals_of(order_meals, 'order_id', (row.id for row in rows))
+    customers = {}
+    orders = []
+    for row in rows:
+        data = ORDER.from_row(row)
+        data['totalCost'] = row.total_cost / row.order_count
+        customer = customers.get(row.customer_id)
+        if customer is None:
+            customer = customers[row.customer_id] = USER.from_row(row[-3:])
+        data['meals'] = meals.get(row.id, [])
+        data['customer'] = customer
+        orders.append(data)
+    return orders
+
+
+def meal_page(*where):
+    """
+    meal_page. returns the dicts of a page of meals and the page
+    """
+    page = paginate_rows(meal_statement(*where), Meal, MealRow._make)
+    return dump_meal_rows(page.items), page
+
+
+def menu_page(*where):
+    """
+    menu_page. returns the dicts of a page of menus and the page
+    """
+    page = paginate_rows(menu_statement(*where), Menu, MenuRow._make)
+    return dump_menu_rows(page.items), page
+
+
+def order_page(*where):
+    """
+    order_page. returns the dicts of a page of orders and the page
+    """
+    page = paginate_rows(order_statement(*where), Order, OrderRow._make)
+    return dump_order_rows(page.items), page
@@ -0,0 +1,100 @@
+"""
+Module contains API resources for caterer reports
+"""
+from flask import Response, g, stream_with_context
+from flask_restplus import Resource, abort
+from .decorators import authenticate, admin_required, admission
+from .parsers import export_orders_parser, prep_sheet_parser, \
+    sales_report_parser
+from .prep_sheets import get_prep_sheet
+from ..order_export import export_orders
+from ..rollups import sales_report
+from . import api
+
+MAX_REPORT_DAYS = 366
+
+
+class SalesReportResource(Resource):
+    """
+    SalesReportResource. exposes sales of a catering from the daily rollups
+    """
+    @admission('read')
+    @authenticate
+    @admin_required
+    @api.header('Authorization', type=str, description='Authentication token')
+    @api.doc(params={'from': 'First day, YYYY-MM-DD',
+                     'to': 'Last day, YYYY-MM-DD',
+                     'top': 'Number of top meals, 5 by default'})
+    def get(self):
+        """
+        Returns daily orders and revenue and the top meals between two days
+        """
+        args = sales_report_parser.parse_args()
+        if args['start'] > args['end']:
+            abort(code=400, message='from must not be after to')
+        if (args['end'] - args['start']).days >= MAX_REPORT_DAYS:
+            abort(code=400, message='Reports cover at most {} days'.format(
+                MAX_REPORT_DAYS))
+        if args['top'] < 0:
+            abort(code=400, message='top must not be negative')
+        report = sales_report(g.current_user.catering_id, args['start'],
+                              args['end'], args['top'])
+        report.update({'from': str(args['start']), 'to': str(args['end'])})
+        return {
+            'report': report
+        }, 200
+
+
+class PrepSheetResource(Resource):
+    """
+    PrepSheetResource. exposes the kitchen prep sheet of a menu or a date
+    """
+    @admission('read')
+    @authenticate
+    @admin_required
+    @api.header('Authorization', type=str, description='Authentication token')
+    @api.doc(params={'menuId': 'Menu to prepare',
+                     'date': 'Date of the menus to prepare, YYYY-MM-DD'})
+    def get(self):
+        """
+        Returns portions and revenue per meal ordered from a menu, or from
+        all menus of a date
+        """
+        args = prep_sheet_parser.parse_args()
+        if (args['menuId'] is None) == (args['date'] is None):
+            abort(code=400, message='Pass either menuId or date')
+        return {
+            'prepSheet': get_prep_sheet(g.current_user.catering_id,
+                                        menu_id=args['menuId'],
+                                        date=args['date'])
+        }, 200
+
+
+class OrderExportResource(Resource):
+    """
+    OrderExportResource. streams the order history of a catering
+    """
+    @admission('bulk')
+    @authenticate
+    @admin_required
+    @api.header('Authorization', type=str, description='Authentication token')
+    @api.doc(params={'format': 'ndjson (default) or csv',
+                     'from': 'First day, YYYY-MM-DD',
+                     'to': 'Last day, YYYY-MM-DD',
+                     'menuId': 'Only orders of this menu'})
+    def get(self):
+        """
+        Streams a catering's orders, oldest first, as NDJSON or CSV
+        """
+        args = export_orders_parser.parse_args()
+        if args['start'] and args['end'] and args['start'] > args['end']:
+            abort(code=400, message='from must not be after to')
+        export_format = args.pop('export_format')
+        mimetype, lines = export_orders(g.current_user.catering_id,
+                                        export_format, **args)
+        # the request context, and with it the session and the admission
+        # slot, is held until the last line is sent
+        response = Response(stream_with_context(lines), mimetype=mimetype)
+        response.headers['Content-Disposition'] = \
+            'attachment; filename=orders.{}'.format(export_format)
+        return response
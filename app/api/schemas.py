@@ -0,0 +1,154 @@
+"""
+Module contains the compiled request body schemas.
+
+A Schema is built once, at import time, from its fields; each field keeps
+the converter of its kind and the checks of its bounds, with patterns
+already compiled. validate reads the JSON body once and checks every
+field in one pass, returning typed values, dates parsed and ids as ints.
+Invalid fields are all reported at once in the shape flask_restplus uses
+for payload validation.
+"""
+import re
+from flask import request
+from flask_restplus import abort
+from .common import date_type, email_type, int_type, str_type
+
+MESSAGE = 'Input payload validation failed'
+MISSING = 'Missing required parameter in the JSON body'
+
+
+def text_type(value):
+    """
+    text_type. validates a value is a string, possibly empty
+    """
+    if not isinstance(value, str):
+        raise ValueError('Field value must be a string')
+    return value
+
+
+def ids_type(value):
+    """
+    ids_type. validates a value is a non empty list of integers
+    """
+    if not isinstance(value, list) or not value:
+        raise ValueError('Field value must be a list of ids')
+    for item in value:
+        int_type(item)
+    return value
+
+
+def edit_ids_type(value):
+    """
+    edit_ids_type. validates a value is a list of integers, an empty list
+    leaves the ids as they are
+    """
+    if value == []:
+        return value
+    return ids_type(value)
+
+
+KINDS = {
+    'string': str_type,
+    'text': text_type,
+    'email': email_type,
+    'integer': int_type,
+    'date': date_type,
+    'ids': ids_type,
+    'edit_ids': edit_ids_type
+}
+
+
+def _max_length(limit):
+    def check(value):
+        if len(value) > limit:
+            raise ValueError('Must be at most {} characters long'.format(limit))
+    return check
+
+
+def _minimum(limit):
+    def check(value):
+        if value < limit:
+            raise ValueError('Must be at least {}'.format(limit))
+    return check
+
+
+def _pattern(pattern):
+    regex = re.compile(pattern)
+
+    def check(value):
+        if not regex.search(value):
+            raise ValueError('Does not match {}'.format(pattern))
+    return check
+
+
+class Field:
+    """
+    Field. a value of a request body, its kind and its bounds.
+    help prefixes the error messages of the field
+    """
+
+    def __init__(self, name, kind='string', required=False, help=None,
+                 max_length=None, minimum=None, pattern=None):
+        self.name = name
+        self.required = required
+        self.help = help
+        self._convert = KINDS[kind]
+        self._checks = []
+        if max_length is not None:
+            self._checks.append(_max_length(max_length))
+        if minimum is not None:
+            self._checks.append(_minimum(minimum))
+        if pattern is not None:
+            self._checks.append(_pattern(pattern))
+
+    def parse(self, value):
+        """
+        parse. returns the typed value or raises ValueError
+        """
+        value = self._convert(value)
+        for check in self._checks:
+            check(value)
+        return value
+
+    def message(self, error):
+        """
+        message. returns the error message of the field
+        """
+        return '{} {}'.format(self.help, error) if self.help else error
+
+
+class Schema:
+    """
+    Schema. validates request bodies against a fixed list of fields
+    """
+
+    def __init__(self, *fields):
+        self.fields = fields
+
+    def validate(self, data=None):
+        """
+        validate. returns the typed values of the fields of data, the
+        request's JSON body by default, None for absent optional fields.
+        aborts with 400 listing every invalid field
+        """
+        if data is None:
+            data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            abort(code=400, message=MESSAGE,
+                  errors={'body': 'A JSON object is required'})
+        values = {}
+        errors = {}
+        for field in self.fields:
+            value = data.get(field.name)
+            if value is None:
+                if field.required:
+                    errors[field.name] = field.message(MISSING)
+                values[field.name] = None
+                continue
+            try:
+                values[field.name] = field.parse(value)
+            except ValueError as error:
+                errors[field.name] = field.message(str(error))
+        if errors:
+            abort(code=400, message=MESSAGE, errors=errors)
+        return values
@@ -0,0 +1,36 @@
+"""
+Module contains API resources for managing users in bulk
+"""
+import io
+from flask import request, current_app
+from flask_restplus import Resource, abort
+from .decorators import authenticate, admin_required, admission
+from ..bulk_import import import_users
+from . import api
+
+
+class UsersImportResource(Resource):
+    """
+    UsersImportResource. onboards employees from a CSV file
+    """
+    @admission('bulk')
+    @authenticate
+    @admin_required
+    @api.header('Authorization', type=str, description='Authentication token')
+    @api.doc(responses={200: 'Import report', 400: 'Bad request'})
+    def post(self):
+        """
+        Imports users from a CSV with name, email and password columns.
+        The CSV is sent as a `file` form field or as a text/csv body.
+        """
+        upload = request.files.get('file')
+        if upload is not None:
+            stream = upload.stream
+        elif request.mimetype == 'text/csv':
+            stream = request.stream
+        else:
+            abort(code=400, message='Send a CSV file as `file` or a text/csv body')
+        text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        report = import_users(text_stream,
+                              current_app.config['IMPORT_BATCH_SIZE'])
+        return report.to_dict(), 200
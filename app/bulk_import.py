@@ -0,0 +1,134 @@
+"""
+Module contains bulk onboarding of users from CSV files.
+
+Rows are streamed and processed in batches: one query finds emails that
+are already registered, passwords are hashed in parallel on the hashing
+pool and each batch is inserted in a single transaction. Invalid rows are
+reported instead of failing the whole import.
+"""
+import csv
+import validators
+from sqlalchemy.exc import IntegrityError
+from . import db
+from .hashing import hash_passwords
+from .models import User, Role
+
+REQUIRED_COLUMNS = ('name', 'email', 'password')
+
+
+class ImportReport:
+    """
+    ImportReport. collects the outcome of an import
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, row_number, email, message):
+        """
+        add_error. records a rejected row
+        """
+        self.errors.append({
+            'row': row_number,
+            'email': email,
+            'message': message
+        })
+
+    def to_dict(self):
+        """
+        to_dict. turns report into dict for easy serialization
+        """
+        return {
+            'created': self.created,
+            'failed': len(self.errors),
+            'errors': self.errors
+        }
+
+
+def validate_row(row):
+    """
+    validate_row. returns an error message for an invalid row or None
+    """
+    for column in REQUIRED_COLUMNS:
+        if not (row.get(column) or '').strip():
+            return '{} field is required'.format(column)
+    if not validators.email(row['email'].strip()):
+        return 'Email is not valid'
+    return None
+
+
+def import_users(text_stream, batch_size=500):
+    """
+    import_users. imports users from a CSV text stream with a header of
+    name, email and password. returns an ImportReport
+    """
+    report = ImportReport()
+    reader = csv.DictReader(text_stream)
+    missing = [column for column in REQUIRED_COLUMNS
+               if column not in (reader.fieldnames or [])]
+    if missing:
+        report.add_error(1, None, 'Missing column(s): {}'.format(
+            ', '.join(missing)))
+        return report
+
+    role = Role.query.filter_by(default=True).first()
+    role_id = role.id if role is not None else None
+    seen = set()
+    batch = []
+    # header is line 1, so data rows start on line 2
+    for row_number, row in enumerate(reader, start=2):
+        error = validate_row(row)
+        email = (row.get('email') or '').strip()
+        if error is None and email.lower() in seen:
+            error = 'Duplicate email in file'
+        if error is not None:
+            report.add_error(row_number, email or None, error)
+            continue
+        seen.add(email.lower())
+        batch.append((row_number, row['name'].strip(), email, row['password']))
+        if len(batch) >= batch_size:
+            _import_batch(batch, role_id, report)
+            batch = []
+    if batch:
+        _import_batch(batch, role_id, report)
+    return report
+
+
+def _import_batch(batch, role_id, report):
+    emails = [email.lower() for _, _, email, _ in batch]
+    existing = set(
+        email.lower() for email, in db.session.query(User.email).filter(
+            db.func.lower(User.email).in_(emails)))
+    rows = []
+    for row_number, name, email, password in batch:
+        if email.lower() in existing:
+            report.add_error(row_number, email, 'Email already in use')
+        else:
+            rows.append((row_number, name, email, password))
+    if not rows:
+        return
+
+    hashes = hash_passwords([password for _, _, _, password in rows])
+    mappings = [{
+        'name': name,
+        'email': email,
+        'password_hash': password_hash,
+        'role_id': role_id
+    } for (_, name, email, _), password_hash in zip(rows, hashes)]
+    try:
+        db.session.bulk_insert_mappings(User, mappings)
+        db.session.commit()
+        report.created += len(mappings)
+    except IntegrityError:
+        # an email was registered concurrently, retry row by row so only
+        # the conflicting rows are rejected
+        db.session.rollback()
+        for (row_number, _, email, _), mapping in zip(rows, mappings):
+            try:
+                db.session.bulk_insert_mappings(User, [mapping])
+                db.session.commit()
+                report.created += 1
+            except IntegrityError:
+                db.session.rollback()
+                report.add_error(row_number, email, 'Email already in use')
@@ -0,0 +1,141 @@
+"""
+Module contains the version counters of cacheable API responses.
+
+Models saved or deleted through BaseModel name the scopes they change, a
+catering, a menu date or the orders of a menu, and every scope is bumped once in the
+transaction committing the change, so the counters are shared by every
+process. Conditional GET routes derive strong ETags from the counters of
+the scopes they show and answer 304 without reading what they show.
+"""
+import datetime
+import hashlib
+from flask import has_request_context, request
+from sqlalchemy import event
+from . import db
+
+# meals and caterings appear on the menus of every date
+ALL_DATES = 'date:*'
+
+TOUCHED = 'cache_versions.touched'
+SCOPES = 'cache_versions.scopes'
+CURRENT = 'meal_app.cache_versions'
+
+
+def catering_scope(catering_id):
+    """
+    catering_scope. returns the scope of a catering's meals and menus
+    """
+    return 'catering:{}'.format(catering_id)
+
+
+def menu_scope(menu_id):
+    """
+    menu_scope. returns the scope of the orders of a menu
+    """
+    return 'menu:{}'.format(menu_id)
+
+
+def date_scope(date):
+    """
+    date_scope. returns the scope of the menus of a date
+    """
+    # Menu.menu_date sets datetimes until the menu is loaded again
+    if isinstance(date, datetime.datetime):
+        date = date.date()
+    return 'date:{}'.format(date)
+
+
+def touch(obj):
+    """
+    touch. records that obj was written, its scopes are read when it is
+    flushed and bumped when the session commits
+    """
+    db.session.info.setdefault(TOUCHED, []).append(obj)
+
+
+def bump(scopes):
+    """
+    bump. bumps scopes when the session commits, for writes that are not
+    saved through a model such as menu_meals updates
+    """
+    db.session.info.setdefault(SCOPES, set()).update(scopes)
+
+
+def current(scopes):
+    """
+    current. returns (etag, last_modified) of scopes, last_modified is
+    None while none of them was written. a GET request reads the versions
+    of the same scopes once
+    """
+    key = tuple(sorted(set(scopes)))
+    read = request.environ.setdefault(CURRENT, {}) if has_request_context() \
+        and request.method in ('GET', 'HEAD') else {}
+    if key not in read:
+        read[key] = _read(key)
+    return read[key]
+
+
+def _read(scopes):
+    from .models import CacheVersion
+    rows = db.session.query(
+        CacheVersion.scope, CacheVersion.version, CacheVersion.updated_at
+    ).filter(CacheVersion.scope.in_(scopes)).all()
+    versions = {scope: (version, updated_at)
+                for scope, version, updated_at in rows}
+    digest = hashlib.sha1()
+    for scope in scopes:
+        version, updated_at = versions.get(scope, (0, None))
+        digest.update('{}={}@{};'.format(scope, version, updated_at).encode())
+    last_modified = max([updated_at for _, updated_at in versions.values()],
+                        default=None)
+    return digest.hexdigest()[:32], last_modified
+
+
+def _apply(session, scopes):
+    from .models import CacheVersion
+    table = CacheVersion.__table__
+    now = datetime.datetime.utcnow()
+    # a fixed order keeps concurrent commits from deadlocking
+    for scope in sorted(scopes):
+        if session.get_bind().dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+            statement = insert(table).values(
+                scope=scope, version=1, updated_at=now)
+            session.execute(statement.on_conflict_do_update(
+                index_elements=['scope'], set_={
+                    'version': table.c.version + 1, 'updated_at': now}))
+            continue
+        result = session.execute(table.update().where(
+            table.c.scope == scope).values(
+                version=table.c.version + 1, updated_at=now))
+        if result.rowcount == 0:
+            session.execute(table.insert().values(
+                scope=scope, version=1, updated_at=now))
+
+
+def _collect(session, flush_context):
+    touched = session.info.pop(TOUCHED, None)
+    if not touched:
+        return
+    scopes = session.info.setdefault(SCOPES, set())
+    for obj in touched:
+        scopes.update(obj.version_scopes())
+
+
+def _bump(session):
+    if session.info.get(TOUCHED):
+        # history of the touched models is only known until they flush
+        session.flush()
+    scopes = session.info.pop(SCOPES, None)
+    if scopes:
+        _apply(session, scopes)
+
+
+def _discard(session, previous_transaction):
+    session.info.pop(TOUCHED, None)
+    session.info.pop(SCOPES, None)
+
+
+event.listen(db.session, 'after_flush', _collect)
+event.listen(db.session, 'before_commit', _bump)
+event.listen(db.session, 'after_soft_rollback', _discard)
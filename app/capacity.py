@@ -0,0 +1,206 @@
+"""
+Module contains the portion capacity of meals on a menu.
+
+A capped meal has its capacity on the menu_meals link and its remaining
+portions split over MENU_CAPACITY_SLOTS rows of meal_capacities. An
+order takes its portions with a conditional UPDATE of one random slot,
+so orders for the same meal rarely wait on the same row lock. When that
+slot is short every slot of the meal is locked and the portions are
+taken from several slots; a meal is sold out when all of its slots
+together are short. Nothing is ever decremented below zero. The portions
+an order took are kept as its MealReservation rows, and only those are
+given back, never above the meal's current cap.
+"""
+import random
+from flask import current_app
+from sqlalchemy import and_, func, select
+from werkzeug.exceptions import BadRequest
+from . import db, unit_of_work
+from .models import MealCapacity, MealReservation
+from .models.menu import menu_meals
+
+
+class SoldOut(BadRequest):
+    """
+    SoldOut. raised when meals do not have enough portions left
+    """
+
+    def __init__(self, meal_ids):
+        super(SoldOut, self).__init__()
+        self.meal_ids = meal_ids
+
+
+def split_portions(portions, slots):
+    """
+    split_portions. spreads portions as evenly as possible over slots
+    """
+    share, extra = divmod(portions, slots)
+    return [share + 1 if slot < extra else share for slot in range(slots)]
+
+
+def set_capacity(menu_id, capacities):
+    """
+    set_capacity. sets the portions offered of meals on a menu.
+    capacities maps meal ids to portions, None removes the cap. portions
+    already ordered under the old cap stay taken
+    """
+    slots = current_app.config['MENU_CAPACITY_SLOTS']
+    table = MealCapacity.__table__
+    meal_ids = list(capacities)
+    taken = taken_portions(menu_id, meal_ids)
+    discard(menu_id, meal_ids)
+    rows = []
+    for meal_id, portions in capacities.items():
+        db.session.execute(menu_meals.update().where(and_(
+            menu_meals.c.menu_id == menu_id,
+            menu_meals.c.meal_id == meal_id)).values(capacity=portions))
+        if portions is not None:
+            left = max(portions - taken.get(meal_id, 0), 0)
+            rows.extend({'menu_id': menu_id, 'meal_id': meal_id,
+                         'slot': slot, 'remaining': remaining}
+                        for slot, remaining in
+                        enumerate(split_portions(left, slots)))
+    if rows:
+        db.session.execute(table.insert(), rows)
+    unit_of_work.mark_write()
+
+
+def taken_portions(menu_id, meal_ids):
+    """
+    taken_portions. returns {meal_id: portions} ordered of the capped meals
+    of meal_ids, locking their slots until the transaction ends
+    """
+    if not meal_ids:
+        return {}
+    table = MealCapacity.__table__
+    rows = db.session.execute(select([
+        table.c.meal_id, table.c.remaining]).where(and_(
+            table.c.menu_id == menu_id, table.c.meal_id.in_(meal_ids))
+    ).order_by(table.c.id).with_for_update()).fetchall()
+    remaining = {}
+    for meal_id, left in rows:
+        remaining[meal_id] = remaining.get(meal_id, 0) + left
+    caps = db.session.execute(select([
+        menu_meals.c.meal_id, menu_meals.c.capacity]).where(and_(
+            menu_meals.c.menu_id == menu_id,
+            menu_meals.c.meal_id.in_(list(remaining)))))
+    return {meal_id: max(cap - remaining[meal_id], 0)
+            for meal_id, cap in caps if cap is not None}
+
+
+def discard(menu_id, meal_ids):
+    """
+    discard. deletes the slots of meal_ids on a menu, as when the meals
+    are no longer offered on it
+    """
+    if not meal_ids:
+        return
+    table = MealCapacity.__table__
+    db.session.execute(table.delete().where(and_(
+        table.c.menu_id == menu_id, table.c.meal_id.in_(list(meal_ids)))))
+    unit_of_work.mark_write()
+
+
+def reserve(menu_id, meal_ids, count):
+    """
+    reserve. takes count portions of every capped meal in meal_ids and
+    returns the reservations to keep on the order. raises SoldOut listing
+    the meals short of portions, the caller's transaction must then be
+    rolled back
+    """
+    if not meal_ids:
+        return []
+    # a fixed order keeps two orders from locking meals in opposite order
+    sold_out = [meal_id for meal_id in sorted(meal_ids)
+                if not _take(menu_id, meal_id, count)]
+    unit_of_work.mark_write()
+    if sold_out:
+        raise SoldOut(sold_out)
+    return [MealReservation(meal_id=meal_id, portions=count)
+            for meal_id in sorted(meal_ids)]
+
+
+def release(menu_id, reservations):
+    """
+    release. gives the portions of reservations back to their meals, the
+    caller drops the reservations from the order
+    """
+    if not reservations:
+        return
+    # one meal at a time in the order reserve locks them
+    for reservation in sorted(reservations, key=lambda item: item.meal_id):
+        _give(menu_id, reservation.meal_id, reservation.portions)
+    unit_of_work.mark_write()
+
+
+def _take(menu_id, meal_id, count):
+    table = MealCapacity.__table__
+    of_meal = and_(table.c.menu_id == menu_id, table.c.meal_id == meal_id)
+    slot = random.randrange(current_app.config['MENU_CAPACITY_SLOTS'])
+    result = db.session.execute(table.update().where(and_(
+        of_meal, table.c.slot == slot, table.c.remaining >= count)).values(
+            remaining=table.c.remaining - count))
+    if result.rowcount == 1:
+        return True
+    rows = db.session.execute(select([table.c.id, table.c.remaining]).where(
+        of_meal).with_for_update()).fetchall()
+    if sum(row.remaining for row in rows) < count:
+        return False
+    needed = count
+    for row in sorted(rows, key=lambda row: row.remaining, reverse=True):
+        taken = min(row.remaining, needed)
+        db.session.execute(table.update().where(table.c.id == row.id).values(
+            remaining=table.c.remaining - taken))
+        needed -= taken
+        if not needed:
+            break
+    return True
+
+
+def _give(menu_id, meal_id, portions):
+    table = MealCapacity.__table__
+    rows = db.session.execute(select([table.c.id, table.c.remaining]).where(
+        and_(table.c.menu_id == menu_id, table.c.meal_id == meal_id)
+    ).order_by(table.c.id).with_for_update()).fetchall()
+    if not rows:
+        return
+    cap = db.session.execute(select([menu_meals.c.capacity]).where(and_(
+        menu_meals.c.menu_id == menu_id,
+        menu_meals.c.meal_id == meal_id))).scalar()
+    # a cap lowered since the order was placed already took these back
+    portions = min(portions, (cap or 0) - sum(row.remaining for row in rows))
+    if portions <= 0:
+        return
+    emptiest = min(rows, key=lambda row: row.remaining)
+    db.session.execute(table.update().where(table.c.id == emptiest.id).values(
+        remaining=table.c.remaining + portions))
+
+
+def remaining_portions(menu_ids):
+    """
+    remaining_portions. returns {menu_id: {meal_id: portions}} of the
+    capped meals on menus
+    """
+    if not menu_ids:
+        return {}
+    table = MealCapacity.__table__
+    rows = db.session.execute(select([
+        table.c.menu_id, table.c.meal_id, func.sum(table.c.remaining)
+    ]).where(table.c.menu_id.in_(menu_ids)).group_by(
+        table.c.menu_id, table.c.meal_id))
+    portions = {}
+    for menu_id, meal_id, remaining in rows:
+        portions.setdefault(menu_id, {})[meal_id] = int(remaining)
+    return portions
+
+
+def capped_menu_ids(menu_ids):
+    """
+    capped_menu_ids. returns the ids of menus offering a capped meal
+    """
+    if not menu_ids:
+        return []
+    rows = db.session.execute(select([menu_meals.c.menu_id]).where(and_(
+        menu_meals.c.menu_id.in_(menu_ids),
+        menu_meals.c.capacity.isnot(None))).distinct())
+    return sorted(row[0] for row in rows)
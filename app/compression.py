@@ -0,0 +1,175 @@
+"""
+Module contains the compression of responses.
+
+Responses of COMPRESSION_MIMETYPES are compressed with the encoding the
+client accepts that comes first in ENCODINGS, br only when the brotli
+package is installed. Bodies smaller than COMPRESSION_MIN_SIZE are sent as
+they are, streamed bodies, whose size is unknown, are compressed chunk by
+chunk as they are sent. The bytes before and after compression and the
+CPU time spent on it are counted per endpoint under compression in
+/metrics.
+"""
+import time
+import zlib
+from flask import current_app, request
+from .metrics import get_counters
+
+# in order of preference
+ENCODINGS = ('br', 'gzip')
+
+# CPU time of the current thread where the platform measures it
+_cpu_time = getattr(time, 'thread_time', time.process_time)
+
+
+def _brotli(config):
+    import brotli
+    compressor = brotli.Compressor(
+        quality=config['COMPRESSION_BROTLI_QUALITY'])
+    return compressor.process, compressor.finish
+
+
+def _gzip(config):
+    # wbits 31 writes a gzip header and trailer
+    compressor = zlib.compressobj(config['COMPRESSION_GZIP_LEVEL'],
+                                  zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+CODERS = {'br': _brotli, 'gzip': _gzip}
+
+
+def encoded_tag(tag, encoding):
+    """
+    encoded_tag. returns the entity tag of a representation of tag
+    compressed with encoding, strong tags must differ per encoding
+    """
+    return '{}-{}'.format(tag, encoding)
+
+
+def tag_variants(tag):
+    """
+    tag_variants. returns tag and the tags of its compressed
+    representations
+    """
+    return [tag] + [encoded_tag(tag, encoding) for encoding in ENCODINGS]
+
+
+def available_encodings(config):
+    """
+    available_encodings. returns the encodings of ENCODINGS installed
+    """
+    encodings = []
+    for encoding in ENCODINGS:
+        try:
+            CODERS[encoding](config)
+        except ImportError:
+            continue
+        encodings.append(encoding)
+    return encodings
+
+
+class Compression:
+    """
+    Compression. compresses responses with the encodings available
+    """
+
+    def __init__(self, config, encodings, counters):
+        self.config = config
+        self.min_size = config['COMPRESSION_MIN_SIZE']
+        self.mimetypes = set(config['COMPRESSION_MIMETYPES'])
+        self.encodings = encodings
+        self.counters = counters
+
+    def apply(self, response):
+        """
+        apply. compresses response with the encoding negotiated from
+        Accept-Encoding, when there is one and the response is worth it
+        """
+        if response.status_code == 304 or \
+                response.mimetype in self.mimetypes:
+            # caches must keep a representation per encoding
+            response.vary.add('Accept-Encoding')
+        if response.mimetype not in self.mimetypes or \
+                response.status_code < 200 or \
+                response.status_code in (204, 304) or \
+                response.direct_passthrough or \
+                'Content-Encoding' in response.headers or \
+                'no-transform' in response.headers.get('Cache-Control', ''):
+            return response
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+        endpoint = request.endpoint or 'unknown'
+        if response.is_streamed:
+            response.response = self._stream(
+                response.response, response.charset, encoding, endpoint)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                self.counters.incr('{}.below_min_size'.format(endpoint))
+                return response
+            started = _cpu_time()
+            compress, finish = CODERS[encoding](self.config)
+            body = compress(data) + finish()
+            self._count(endpoint, len(data), len(body),
+                        _cpu_time() - started)
+            response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        tag, weak = response.get_etag()
+        if tag:
+            response.set_etag(encoded_tag(tag, encoding), weak)
+        return response
+
+    def _stream(self, chunks, charset, encoding, endpoint):
+        compress, finish = CODERS[encoding](self.config)
+        size = compressed_size = 0
+        cpu = 0.0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode(charset)
+                started = _cpu_time()
+                compressed = compress(chunk)
+                cpu += _cpu_time() - started
+                size += len(chunk)
+                if compressed:
+                    compressed_size += len(compressed)
+                    yield compressed
+            started = _cpu_time()
+            compressed = finish()
+            cpu += _cpu_time() - started
+            compressed_size += len(compressed)
+            yield compressed
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+            self._count(endpoint, size, compressed_size, cpu)
+
+    def _count(self, endpoint, size, compressed_size, cpu):
+        self.counters.incr('{}.responses'.format(endpoint))
+        self.counters.incr('{}.bytes_in'.format(endpoint), size)
+        self.counters.incr('{}.bytes_out'.format(endpoint), compressed_size)
+        self.counters.incr('{}.bytes_saved'.format(endpoint),
+                           size - compressed_size)
+        self.counters.incr('{}.cpu_us'.format(endpoint), int(cpu * 1e6))
+
+
+def compress_response(response):
+    """
+    compress_response. compresses a response of the current application
+    """
+    return current_app.extensions['compression'].apply(response)
+
+
+def init_app(app):
+    """
+    init_app. compresses the responses of the application
+    """
+    if not app.config['COMPRESSION']:
+        return
+    app.extensions['compression'] = Compression(
+        app.config, available_encodings(app.config),
+        get_counters('compression', app))
+    app.after_request(compress_response)
@@ -0,0 +1,165 @@
+"""
+Module contains the password hashing pool.
+
+PBKDF2 is deliberately slow, so hashing runs on a bounded pool instead of
+the request thread. When the pool is saturated requests fail fast with
+HashingPoolSaturated rather than queueing behind each other.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, \
+    TimeoutError
+from flask import current_app
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import generate_password_hash, check_password_hash
+from .metrics import get_counters
+
+
+class HashingPoolSaturated(ServiceUnavailable):
+    """
+    HashingPoolSaturated. raised when no hashing slot is available
+    """
+    pass
+
+
+class HashingPool:
+    """
+    HashingPool. runs password hashing on a bounded executor
+    """
+
+    def __init__(self, workers, max_pending, executor='thread', timeout=None,
+                 counters=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.executor_type = executor
+        self.counters = counters
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.executor_type == 'process':
+                        self._executor = ProcessPoolExecutor(self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(self.workers)
+        return self._executor
+
+    def run(self, func, *args):
+        """
+        run. runs func on the pool and waits for its result
+        """
+        if self.workers <= 0:
+            return func(*args)
+        if not self._slots.acquire(blocking=False):
+            self._incr('rejected')
+            raise HashingPoolSaturated()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._incr('submitted')
+        return self._result(future)
+
+    def map(self, func, args_list, concurrency=None):
+        """
+        map. runs func for every args tuple and returns results in order.
+
+        Meant for bulk jobs: waits for free slots instead of failing and
+        keeps at most concurrency jobs pending so interactive requests
+        still find slots.
+        """
+        if self.workers <= 0:
+            return [func(*args) for args in args_list]
+        window = threading.BoundedSemaphore(concurrency or self.workers)
+        futures = []
+        for args in args_list:
+            window.acquire()
+            if not self._slots.acquire(timeout=self.timeout):
+                window.release()
+                self._incr('rejected')
+                raise HashingPoolSaturated()
+            future = self._get_executor().submit(func, *args)
+            future.add_done_callback(lambda _: self._slots.release())
+            future.add_done_callback(lambda _: window.release())
+            self._incr('submitted')
+            futures.append(future)
+        return [self._result(future) for future in futures]
+
+    def _result(self, future):
+        # a job still running past the timeout means the pool is saturated
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            self._incr('timed_out')
+            raise HashingPoolSaturated()
+
+    def shutdown(self):
+        """
+        shutdown. stops the underlying executor
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _incr(self, name):
+        if self.counters is not None:
+            self.counters.incr(name)
+
+
+def init_app(app):
+    """
+    init_app. attaches a hashing pool to the application
+    """
+    app.extensions['hashing_pool'] = HashingPool(
+        app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_QUEUE_SIZE'],
+        executor=app.config['PASSWORD_HASH_EXECUTOR'],
+        timeout=app.config['PASSWORD_HASH_TIMEOUT'],
+        counters=get_counters('hashing_pool', app))
+
+
+def get_pool():
+    """
+    get_pool. returns the hashing pool of the current application
+    """
+    return current_app.extensions['hashing_pool']
+
+
+def hash_password(password):
+    """
+    hash_password. hashes a password with the configured method
+    """
+    return get_pool().run(
+        generate_password_hash, password,
+        current_app.config['PASSWORD_HASH_METHOD'],
+        current_app.config['PASSWORD_SALT_LENGTH'])
+
+
+def hash_passwords(passwords):
+    """
+    hash_passwords. hashes many passwords in parallel
+    """
+    method = current_app.config['PASSWORD_HASH_METHOD']
+    salt_length = current_app.config['PASSWORD_SALT_LENGTH']
+    return get_pool().map(generate_password_hash,
+                          [(password, method, salt_length)
+                           for password in passwords])
+
+
+def check_password(password_hash, password):
+    """
+    check_password. checks a password against a stored hash
+    """
+    return get_pool().run(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """
+    needs_rehash. determines if a hash was made with an outdated method
+    """
+    method = password_hash.split('$', 1)[0]
+    return method != current_app.config['PASSWORD_HASH_METHOD']
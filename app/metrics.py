@@ -0,0 +1,56 @@
+"""
+Module contains in-process counters used for instrumentation
+"""
+import threading
+from flask import current_app
+
+
+class Counters:
+    """
+    Counters. a thread safe group of named integer counters
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def incr(self, name, amount=1):
+        """
+        incr. increments a counter by amount
+        """
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def get(self, name):
+        """
+        get. returns the current value of a counter
+        """
+        return self._values.get(name, 0)
+
+    def snapshot(self):
+        """
+        snapshot. returns a copy of all counters
+        """
+        with self._lock:
+            return dict(self._values)
+
+
+def get_counters(group, app=None):
+    """
+    get_counters. returns the counters of a group for the application
+    """
+    app = app or current_app
+    registry = app.extensions.setdefault('metrics', {})
+    counters = registry.get(group)
+    if counters is None:
+        counters = registry.setdefault(group, Counters())
+    return counters
+
+
+def snapshot_all(app=None):
+    """
+    snapshot_all. returns a snapshot of every counter group
+    """
+    app = app or current_app
+    registry = app.extensions.get('metrics', {})
+    return {group: counters.snapshot() for group, counters in registry.items()}
@@ -4,3 +4,7 @@ from .meal import Meal
 from .menu import Menu
 from .role import Role
 from .order import Order
+from .capacity import MealCapacity, MealReservation
+from .idempotency_key import IdempotencyKey
+from .sales import DailySales, DailyMealSales
+from .cache_version import CacheVersion
@@ -2,6 +2,7 @@
 Module contains the base model
 """
 from .. import db
+from .. import cache_versions, unit_of_work
 
 
 class BaseModel(db.Model):
@@ -12,29 +13,53 @@ class BaseModel(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     created_at = db.Column(db.DateTime(), default=db.func.current_timestamp())
 
-    def save(self):
+    def save(self, commit=None):
         """
-        save. saves model to the database
+        save. saves model to the database.
+        Inside a request the model is only flushed and the request's unit
+        of work commits it; commit=False flushes without committing so
+        generated ids are available early.
         """
         db.session.add(self)
-        db.session.commit()
+        cache_versions.touch(self)
+        _end_write(commit)
 
-    def delete(self):
+    def delete(self, commit=None):
         """
         delete. removes a model from database
         """
         db.session.delete(self)
+        cache_versions.touch(self)
+        _end_write(commit)
+
+    def version_scopes(self):
+        """
+        version_scopes. returns the cache version scopes a write of the
+        model changes, see app/cache_versions.py
+        """
+        return ()
+
+
+def _end_write(commit):
+    if commit is None:
+        commit = not unit_of_work.is_active()
+    if commit:
         db.session.commit()
+    else:
+        db.session.flush()
 
 
-def make_pivot_table(name, fk_1, tb_1, fk_2, tb_2):
+def make_pivot_table(name, fk_1, tb_1, fk_2, tb_2, *columns):
     """
-    generates a pivot table.
+    generates a pivot table. the primary key covers lookups by fk_1 and an
+    index covers lookups by fk_2. columns are extra columns of the link.
     """
     table = db.Table(name,
                      db.Column(fk_1, db.Integer, db.ForeignKey(
                          tb_1), primary_key=True),
                      db.Column(fk_2, db.Integer, db.ForeignKey(
-                         tb_2), primary_key=True))
+                         tb_2), primary_key=True),
+                     db.Index('ix_{}_{}'.format(name, fk_2), fk_2),
+                     *columns)
 
     return table
@@ -0,0 +1,21 @@
+"""
+Module contains the cache version model
+"""
+from .. import db
+from . base_model import BaseModel
+
+
+class CacheVersion(BaseModel):
+    """
+    CacheVersion represents the cache_versions table. a row counts the
+    committed writes of a scope, a catering or a menu date, and the time
+    of the last one
+    """
+    __tablename__ = 'cache_versions'
+    scope = db.Column(db.String(64), nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_cache_versions_scope', 'scope', unique=True),
+    )
@@ -0,0 +1,42 @@
+"""
+Module contains the meal capacity models
+"""
+from .. import db
+from . base_model import BaseModel
+
+
+class MealCapacity(BaseModel):
+    """
+    MealCapacity represents the meal_capacities table. the portions left
+    of a meal on a menu are split over a few slot rows so that concurrent
+    orders decrement different rows instead of queueing on one row lock.
+    """
+    __tablename__ = 'meal_capacities'
+    menu_id = db.Column(db.Integer, db.ForeignKey(
+        'menus.id', ondelete='CASCADE'), nullable=False)
+    meal_id = db.Column(db.Integer, db.ForeignKey(
+        'meals.id', ondelete='CASCADE'), nullable=False)
+    slot = db.Column(db.Integer, nullable=False)
+    remaining = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_meal_capacities_menu_id_meal_id_slot',
+                 'menu_id', 'meal_id', 'slot', unique=True),
+    )
+
+
+class MealReservation(BaseModel):
+    """
+    MealReservation represents the meal_reservations table, the portions
+    of a capped meal an order took, which are all it gives back
+    """
+    __tablename__ = 'meal_reservations'
+    order_id = db.Column(db.Integer, db.ForeignKey(
+        'orders.id', ondelete='CASCADE'), nullable=False)
+    meal_id = db.Column(db.Integer, db.ForeignKey(
+        'meals.id', ondelete='CASCADE'), nullable=False)
+    portions = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_meal_reservations_order_id', 'order_id'),
+    )
@@ -2,6 +2,8 @@
 Module contains the catering model.
 """
 from .. import db
+from ..cache_versions import ALL_DATES, catering_scope
+from ..serializers import CATERING
 from . base_model import BaseModel
 
 
@@ -23,8 +25,10 @@ class Catering(BaseModel):
         """
         to_dict. turns object to dict
         """
-        return {
-            'id': self.id,
-            'name': self.name,
-            'address': self.address
-        }
+        return CATERING.dump(self)
+
+    def version_scopes(self):
+        """
+        version_scopes. a catering is shown on its menus of any date
+        """
+        return (catering_scope(self.id), ALL_DATES)
@@ -0,0 +1,50 @@
+"""
+Module contains the idempotency key model
+"""
+import datetime
+from flask import current_app
+from .. import db
+from . base_model import BaseModel
+
+
+class IdempotencyKey(BaseModel):
+    """
+    IdempotencyKey represents the idempotency_keys table. a row holds the
+    response of the first request a customer sent with a key; a row
+    without a status code belongs to a request still being handled.
+    """
+    __tablename__ = 'idempotency_keys'
+    key = db.Column(db.String(128), nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey(
+        'users.id', ondelete='CASCADE'), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer)
+    response = db.Column(db.Text)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_idempotency_keys_customer_id_key',
+                 'customer_id', 'key', unique=True),
+        db.Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+
+    def __init__(self, **kwargs):
+        super(IdempotencyKey, self).__init__(**kwargs)
+        self.expires_at = datetime.datetime.now() + datetime.timedelta(
+            seconds=current_app.config['IDEMPOTENCY_KEY_TTL'])
+
+    def is_expired(self):
+        """
+        is_expired. determines if the stored response may no longer be
+        replayed
+        """
+        return datetime.datetime.now() >= self.expires_at
+
+    @staticmethod
+    def purge_expired():
+        """
+        purge_expired. deletes expired keys and returns how many
+        """
+        return IdempotencyKey.query.filter(
+            IdempotencyKey.expires_at < datetime.datetime.now()).delete(
+                synchronize_session=False)
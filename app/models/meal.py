@@ -1,5 +1,7 @@
 from flask import current_app
 from .. import db
+from ..cache_versions import ALL_DATES, catering_scope
+from ..serializers import MEAL
 from . base_model import BaseModel
 
 
@@ -13,16 +15,23 @@ class Meal(BaseModel):
     description = db.Column(db.Text)
     catering_id = db.Column(db.Integer, db.ForeignKey('caterings.id'))
 
+    __table_args__ = (
+        db.Index('ix_meals_catering_id_created_at',
+                 'catering_id', 'created_at', 'id'),
+    )
+
     def to_dict(self):
         """
           Turns Meal into a dict for easy serialization
         """
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'price': self.price
-        }
+        return MEAL.dump(self)
+
+    def version_scopes(self):
+        """
+        version_scopes. a meal is listed by its catering and shown on
+        menus of any date
+        """
+        return (catering_scope(self.catering_id), ALL_DATES)
 
     def modify(self, args):
         """
@@ -1,12 +1,19 @@
 
+import datetime
 from dateutil import parser
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
 from .. import db
+from ..cache_versions import catering_scope, date_scope
+from ..serializers import dump_menu
 from . base_model import BaseModel, make_pivot_table
-from . meal import Meal
 
 
+# capacity is the number of portions of the meal offered on the menu,
+# NULL when unlimited. what is left is kept in meal_capacities
 menu_meals = make_pivot_table(
-    'menu_meals', 'menu_id', 'menus.id', 'meal_id', 'meals.id')
+    'menu_meals', 'menu_id', 'menus.id', 'meal_id', 'meals.id',
+    db.Column('capacity', db.Integer))
 
 
 class Menu(BaseModel):
@@ -18,11 +25,18 @@ class Menu(BaseModel):
     title = db.Column(db.String(128), nullable=False)
     description = db.Column(db.Text)
     date = db.Column(db.Date)
-    meals = db.relationship('Meal', secondary=menu_meals, lazy='subquery',
+    meals = db.relationship('Meal', secondary=menu_meals, lazy='select',
                             backref=db.backref('menu', lazy=True))
     catering_id = db.Column(db.Integer, db.ForeignKey('caterings.id'))
     orders = db.relationship('Order', backref='menu', lazy='dynamic')
 
+    __table_args__ = (
+        db.Index('ix_menus_date', 'date'),
+        db.Index('ix_menus_catering_id_date', 'catering_id', 'date'),
+        db.Index('ix_menus_catering_id_created_at',
+                 'catering_id', 'created_at', 'id'),
+    )
+
     @property
     def menu_date(self):
         """
@@ -32,7 +46,19 @@ class Menu(BaseModel):
 
     @menu_date.setter
     def menu_date(self, menu_date):
-        self.date = parser.parse(menu_date)
+        # dates parsed by the request schemas are set as they are
+        if isinstance(menu_date, datetime.date):
+            self.date = menu_date
+        else:
+            self.date = parser.parse(menu_date)
+
+    @staticmethod
+    def to_dict_options():
+        """
+        to_dict_options. loader options for queries serialized with
+        to_dict, so relationships load with a fixed number of queries
+        """
+        return (selectinload('meals'), joinedload('catering'))
 
     def modify(self, args):
         """
@@ -41,13 +67,12 @@ class Menu(BaseModel):
         modified = False
         for key in args:
             if args[key] is not None:
-                if key == 'meals' and args['meals']:
-                    modified = True
-                    self.meals.clear()
-                    for meal_id in args['meals']:
-                        meal = Meal.query.get(meal_id)
-                        if meal:
-                            self.meals.append(meal)
+                if key == 'meals':
+                    # meals are Meal models resolved by the caller, an
+                    # empty list leaves them as they are
+                    if args['meals']:
+                        modified = True
+                        self.meals = list(args['meals'])
                 elif hasattr(self, key):
                     modified = True
                     setattr(self, key, args[key])
@@ -58,15 +83,14 @@ class Menu(BaseModel):
         """
           Turns Menu into a dict for easy serialization
         """
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'meals': [meal.to_dict() for meal in self.meals],
-            'menuDate': str(self.date),
-            'catering': {
-                'id': self.id,
-                'name': self.catering.name,
-                'address': self.catering.address
-            }
-        }
+        return dump_menu(self)
+
+    def version_scopes(self):
+        """
+        version_scopes. a menu is listed by its catering and shown on its
+        date, and on its former date when it is moved
+        """
+        history = inspect(self).attrs.date.history
+        dates = list(history.deleted or ()) + [self.date]
+        return [catering_scope(self.catering_id)] + [
+            date_scope(date) for date in dates if date is not None]
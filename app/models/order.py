@@ -3,9 +3,12 @@ Module contains the order model
 """
 import datetime
 from flask import current_app
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload, selectinload
 from .. import db
+from ..cache_versions import menu_scope
+from ..serializers import dump_order
 from . base_model import BaseModel, make_pivot_table
-from .meal import Meal
 
 
 order_meals = make_pivot_table(
@@ -14,54 +17,106 @@ order_meals = make_pivot_table(
 
 class Order(BaseModel):
     """
-    Order class represents the orders table
+    Order class represents the orders table.
+    An order is pending until it is cancelled by its customer or locked
+    once its window to change it has passed, see app/order_expiry.py
     """
+    PENDING = 'pending'
+    LOCKED = 'locked'
+    CANCELLED = 'cancelled'
+    STATUSES = (PENDING, LOCKED, CANCELLED)
+
     __tablename__ = 'orders'
     total_cost = db.Column(db.Float, nullable=False)
     order_count = db.Column(db.Integer, default=1)
     customer_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     catering_id = db.Column(db.Integer, db.ForeignKey('caterings.id'))
     menu_id = db.Column(db.Integer, db.ForeignKey('menus.id'))
-    meals = db.relationship('Meal', secondary=order_meals, lazy='subquery',
+    meals = db.relationship('Meal', secondary=order_meals, lazy='select',
                             backref=db.backref('order', lazy=True))
+    # portions of capped meals taken by the order, see app/capacity.py
+    reservations = db.relationship('MealReservation', lazy='select',
+                                   cascade='all, delete-orphan')
     expires_at = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(16), nullable=False, default=PENDING,
+                       server_default=PENDING)
+
+    # fetch created_at with RETURNING so serializing a new order is free
+    __mapper_args__ = {'eager_defaults': True}
+
+    __table_args__ = (
+        db.Index('ix_orders_menu_id', 'menu_id'),
+        db.Index('ix_orders_created_at', 'created_at'),
+        db.Index('ix_orders_customer_id_created_at',
+                 'customer_id', 'created_at', 'id'),
+        db.Index('ix_orders_catering_id_created_at',
+                 'catering_id', 'created_at', 'id'),
+        # the sweeper looks for pending orders past their lock cutoff
+        db.Index('ix_orders_status_expires_at', 'status', 'expires_at'),
+    )
 
     def __init__(self, **kwargs):
         super(Order, self).__init__(**kwargs)
         self.expires_at = datetime.datetime.now(
         ) + datetime.timedelta(minutes=current_app.config['ORDER_EXPIRES_IN'])
 
-    def is_expired(self):
+    @staticmethod
+    def to_dict_options():
+        """
+        to_dict_options. loader options for queries serialized with
+        to_dict, so relationships load with a fixed number of queries
         """
-        is_expired. determines if an order is expired
+        return (selectinload('meals'), joinedload('customer'))
+
+    @staticmethod
+    def lock_cutoff(now=None):
+        """
+        lock_cutoff. pending orders that expired before the cutoff are
+        locked
         """
-        time_diff = datetime.timedelta(
+        return (now or datetime.datetime.now()) - datetime.timedelta(
             minutes=current_app.config['ORDER_EXPIRES_IN'])
-        if self.expires_at and datetime.datetime.now() - self.expires_at > time_diff:
+
+    @staticmethod
+    def status_filter(status):
+        """
+        status_filter. returns a filter for orders in status. pending orders
+        past their cutoff count as locked before the sweeper locks them
+        """
+        cutoff = Order.lock_cutoff()
+        if status == Order.PENDING:
+            return and_(Order.status == Order.PENDING,
+                        Order.expires_at >= cutoff)
+        if status == Order.LOCKED:
+            return or_(Order.status == Order.LOCKED, and_(
+                Order.status == Order.PENDING, Order.expires_at < cutoff))
+        return Order.status == status
+
+    def is_expired(self):
+        """
+        is_expired. determines if an order is expired, whether or not the
+        sweeper has locked it yet
+        """
+        if self.status == Order.LOCKED:
             return True
-        return False
+        return bool(self.expires_at and self.expires_at < Order.lock_cutoff())
 
     def add_meals(self, meals):
-        total_cost = 0
-        for meal_id in meals:
-            meal = Meal.query.get(int(meal_id))
-            if meal:
-                total_cost += meal.price
-                self.meals.append(meal)
-        return total_cost
+        """
+        add_meals. adds loaded meals to the order and returns their price
+        """
+        self.meals.extend(meals)
+        return sum(meal.price for meal in meals)
+
+    def version_scopes(self):
+        """
+        version_scopes. an order is counted on the prep sheets of its menu
+        """
+        return [menu_scope(self.menu_id)] if self.menu_id else []
 
-    def to_dict(self):
+    def to_dict(self, customer=None):
         """
-         Turns order into dict for easy serialization
+         Turns order into dict for easy serialization.
+         customer is an already serialized customer, it is loaded if omitted
         """
-        return {
-            'id': self.id,
-            'cost': self.total_cost,
-            'totalCost': self.total_cost / self.order_count,
-            'expiresAt': str(self.expires_at),
-            'meals': [meal.to_dict() for meal in self.meals],
-            'customer': self.customer.to_dict(),
-            'createdAt': str(self.created_at),
-            'orderCount': self.order_count,
-            'menuId': self.menu.id
-        }
+        return dump_order(self, customer)
@@ -0,0 +1,47 @@
+"""
+Module contains the sales rollup models
+"""
+from .. import db
+from . base_model import BaseModel
+
+
+class DailySales(BaseModel):
+    """
+    DailySales represents the daily_sales table, a slot of the orders
+    and revenue of a catering on a day
+    """
+    __tablename__ = 'daily_sales'
+    day = db.Column(db.Date, nullable=False)
+    catering_id = db.Column(db.Integer, db.ForeignKey(
+        'caterings.id', ondelete='CASCADE'), nullable=False)
+    slot = db.Column(db.Integer, nullable=False, default=0,
+                     server_default='0')
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_daily_sales_catering_id_day_slot',
+                 'catering_id', 'day', 'slot', unique=True),
+    )
+
+
+class DailyMealSales(BaseModel):
+    """
+    DailyMealSales represents the daily_meal_sales table, a slot of the
+    orders and portions of a meal of a catering on a day
+    """
+    __tablename__ = 'daily_meal_sales'
+    day = db.Column(db.Date, nullable=False)
+    catering_id = db.Column(db.Integer, db.ForeignKey(
+        'caterings.id', ondelete='CASCADE'), nullable=False)
+    meal_id = db.Column(db.Integer, db.ForeignKey(
+        'meals.id', ondelete='CASCADE'), nullable=False)
+    slot = db.Column(db.Integer, nullable=False, default=0,
+                     server_default='0')
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    portions = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_daily_meal_sales_catering_id_day_meal_id_slot',
+                 'catering_id', 'day', 'meal_id', 'slot', unique=True),
+    )
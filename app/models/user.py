@@ -3,8 +3,9 @@ Module contains the User model.
 """
 from flask import current_app
 from itsdangerous import TimedJSONWebSignatureSerializer as Serializer
-from werkzeug.security import generate_password_hash, check_password_hash
 from .. import db
+from ..hashing import hash_password, check_password, needs_rehash
+from ..serializers import USER
 from . base_model import BaseModel
 from . role import Role, Permission
 
@@ -21,6 +22,10 @@ class User(BaseModel):
     role_id = db.Column(db.Integer, db.ForeignKey('roles.id'))
     orders = db.relationship('Order', backref='customer', lazy='dynamic')
 
+    __table_args__ = (
+        db.Index('ix_users_email_lower', db.func.lower(email), unique=True),
+    )
+
     def __init__(self, **kwargs):
         super(User, self).__init__(**kwargs)
         if self.role is None:
@@ -35,23 +40,29 @@ class User(BaseModel):
 
     @password.setter
     def password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def verify_password(self, password):
         """
         verify_password. verifies a user's password
         """
-        return check_password_hash(self.password_hash, password)
+        return check_password(self.password_hash, password)
+
+    def upgrade_password_hash(self, password):
+        """
+        upgrade_password_hash. rehashes a verified password whose hash
+        was made with an outdated method. returns True if rehashed.
+        """
+        if not needs_rehash(self.password_hash):
+            return False
+        self.password = password
+        return True
 
     def to_dict(self):
         """
         to_dict. returns object as serializable dict.
         """
-        return {
-            'id': self.id,
-            'name': self.name,
-            'email': self.email
-        }
+        return USER.dump(self)
 
     def can(self, permissions):
         """
@@ -79,9 +90,13 @@ class User(BaseModel):
             'isAdmin': self.is_administrator()
         }).decode('ascii')
 
-    # @staticmethod
-    # def get_by_email(email):
-    #     return User.query.filter_by(email=email).first()
+    @staticmethod
+    def find_by_email(email):
+        """
+        find_by_email. case insensitive lookup using ix_users_email_lower
+        """
+        return User.query.filter(
+            db.func.lower(User.email) == email.lower()).first()
 
     @staticmethod
     def verify_jwt_token(token):
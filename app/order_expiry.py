@@ -0,0 +1,109 @@
+"""
+Module contains the sweeper that locks expired orders.
+
+An order can be changed until ORDER_EXPIRES_IN minutes after its
+expires_at, then it is locked. lock_expired moves pending orders past
+that cutoff to locked with bulk UPDATEs of at most ORDER_SWEEP_BATCH_SIZE
+rows, each committed on its own so the sweeper never holds many row locks.
+It runs from `python manage.py lock_expired_orders`, or every
+ORDER_SWEEP_INTERVAL seconds on a sweeper thread when that is set.
+"""
+import threading
+from . import db
+from .metrics import get_counters
+from .models import Order
+
+
+def lock_expired(batch_size, now=None):
+    """
+    lock_expired. locks the pending orders past their cutoff and returns
+    how many were locked
+    """
+    cutoff = Order.lock_cutoff(now)
+    expired = (Order.status == Order.PENDING, Order.expires_at < cutoff)
+    locked = 0
+    while True:
+        order_ids = [row[0] for row in db.session.query(Order.id).filter(
+            *expired).order_by(Order.expires_at).limit(batch_size)]
+        if not order_ids:
+            break
+        # the cutoff is checked again so an order changed since it was
+        # read keeps its new expiry
+        locked += Order.query.filter(Order.id.in_(order_ids), *expired).update(
+            {'status': Order.LOCKED}, synchronize_session=False)
+        db.session.commit()
+        if len(order_ids) < batch_size:
+            break
+    return locked
+
+
+class OrderSweeper:
+    """
+    OrderSweeper. locks expired orders every interval seconds on a daemon
+    thread
+    """
+
+    def __init__(self, app, interval, batch_size, counters=None):
+        self.app = app
+        self.interval = interval
+        self.batch_size = batch_size
+        self.counters = counters
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='order-sweeper')
+        self._thread.daemon = True
+
+    def start(self):
+        """
+        start. starts the sweeper thread
+        """
+        self._thread.start()
+
+    def shutdown(self):
+        """
+        shutdown. stops the sweeper thread after its current sweep
+        """
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def sweep(self):
+        """
+        sweep. locks expired orders once and returns how many were locked
+        """
+        with self.app.app_context():
+            try:
+                locked = lock_expired(self.batch_size)
+            except Exception:
+                db.session.rollback()
+                self._incr('failed_sweeps')
+                raise
+            finally:
+                db.session.remove()
+        self._incr('sweeps')
+        self._incr('locked', locked)
+        return locked
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception:
+                self.app.logger.exception('sweeping expired orders failed')
+
+    def _incr(self, name, amount=1):
+        if self.counters is not None:
+            self.counters.incr(name, amount)
+
+
+def init_app(app):
+    """
+    init_app. starts an order sweeper for the application when
+    ORDER_SWEEP_INTERVAL is set
+    """
+    if not app.config['ORDER_SWEEP_INTERVAL']:
+        return
+    sweeper = OrderSweeper(app, app.config['ORDER_SWEEP_INTERVAL'],
+                           app.config['ORDER_SWEEP_BATCH_SIZE'],
+                           counters=get_counters('order_expiry', app))
+    app.extensions['order_sweeper'] = sweeper
+    sweeper.start()
@@ -0,0 +1,115 @@
+"""
+Module contains the streaming export of a catering's orders.
+
+Orders are read oldest first through a server side cursor, yield_per
+EXPORT_BATCH_SIZE rows at a time, and the meals of each batch with one
+more query, so memory stays flat however long the history is. Rows are
+turned into NDJSON or CSV lines one at a time by a generator that both
+the export endpoint and `python manage.py export_orders` consume.
+"""
+import csv
+import datetime
+import io
+from flask import current_app
+from . import db
+from .models import Meal, Order, User
+from .models.order import order_meals
+from .serializers import dumps
+
+COLUMNS = ('id', 'createdAt', 'menuId', 'customerId', 'customerName',
+           'customerEmail', 'orderCount', 'cost', 'status', 'meals')
+
+
+def export_rows(catering_id, start=None, end=None, menu_id=None,
+                batch_size=None):
+    """
+    export_rows. yields the orders of a catering as dicts, optionally
+    placed between the days start and end inclusive or from one menu
+    """
+    batch_size = batch_size or current_app.config['EXPORT_BATCH_SIZE']
+    query = db.session.query(
+        Order.id, Order.created_at, Order.menu_id, Order.customer_id,
+        User.name, User.email, Order.order_count, Order.total_cost,
+        Order.status
+    ).outerjoin(User, User.id == Order.customer_id).filter(
+        Order.catering_id == catering_id)
+    if start is not None:
+        query = query.filter(Order.created_at >= datetime.datetime.combine(
+            start, datetime.time.min))
+    if end is not None:
+        query = query.filter(Order.created_at < datetime.datetime.combine(
+            end + datetime.timedelta(days=1), datetime.time.min))
+    if menu_id is not None:
+        query = query.filter(Order.menu_id == menu_id)
+    batch = []
+    for row in query.order_by(Order.created_at, Order.id).yield_per(
+            batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            for record in _with_meals(batch):
+                yield record
+            batch = []
+    for record in _with_meals(batch):
+        yield record
+
+
+def _with_meals(batch):
+    if not batch:
+        return []
+    meals = {}
+    for order_id, meal_id, title in db.session.query(
+            order_meals.c.order_id, Meal.id, Meal.title).join(
+                Meal, Meal.id == order_meals.c.meal_id).filter(
+                    order_meals.c.order_id.in_([row.id for row in batch])
+            ).order_by(order_meals.c.order_id, Meal.id):
+        meals.setdefault(order_id, []).append({'id': meal_id, 'title': title})
+    return [dict(zip(COLUMNS, (
+        row.id, str(row.created_at), row.menu_id, row.customer_id, row.name,
+        row.email, row.order_count, row.total_cost, row.status,
+        meals.get(row.id, [])))) for row in batch]
+
+
+def to_ndjson(records):
+    """
+    to_ndjson. yields every record as a line of JSON
+    """
+    for record in records:
+        yield dumps(record) + '\n'
+
+
+def to_csv(records):
+    """
+    to_csv. yields a header and a line of CSV per record. meals are
+    listed as ids and titles separated by semicolons
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    yield line(COLUMNS[:-1] + ('mealIds', 'meals'))
+    for record in records:
+        meals = record['meals']
+        yield line([record[column] for column in COLUMNS[:-1]] + [
+            ';'.join(str(meal['id']) for meal in meals),
+            ';'.join(meal['title'] for meal in meals)])
+
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', to_ndjson),
+    'csv': ('text/csv', to_csv)
+}
+
+
+def export_orders(catering_id, export_format='ndjson', **filters):
+    """
+    export_orders. returns the mimetype of export_format and a generator
+    of the exported lines
+    """
+    mimetype, encode = FORMATS[export_format]
+    return mimetype, encode(export_rows(catering_id, **filters))
@@ -0,0 +1,249 @@
+"""
+Module contains the group commit order intake.
+
+When ORDER_INTAKE is enabled validated orders are put on a bounded queue
+instead of being committed by their request. A writer thread takes up to
+ORDER_INTAKE_BATCH_SIZE orders, waiting at most ORDER_INTAKE_MAX_WAIT_MS
+for a batch to fill, and saves the batch in one transaction. Each request
+waits on its own future for the saved order. A full queue fails fast with
+OrderIntakeFull, and so does an order still queued after
+ORDER_INTAKE_TIMEOUT, which the writer then skips.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from flask import current_app
+from werkzeug.exceptions import ServiceUnavailable
+from . import cache_versions, capacity, db
+from .metrics import get_counters
+
+BATCH_SIZE_BUCKETS = (1, 5, 20, 50)
+QUEUE_WAIT_BUCKETS = (1, 5, 20, 100)
+
+_STOP = object()
+
+
+class OrderIntakeFull(ServiceUnavailable):
+    """
+    OrderIntakeFull. raised when the order intake queue is full or an
+    order waited too long to be taken off it
+    """
+    pass
+
+
+class PendingOrder:
+    """
+    PendingOrder. a validated order waiting to be saved
+    """
+    __slots__ = ('values', 'meal_ids', 'customer', 'capped_meal_ids',
+                 'future', 'queued_at')
+
+    def __init__(self, values, meal_ids, customer, capped_meal_ids=()):
+        self.values = values
+        self.meal_ids = meal_ids
+        self.customer = customer
+        self.capped_meal_ids = capped_meal_ids
+        self.future = Future()
+        self.queued_at = time.time()
+
+
+class OrderIntake:
+    """
+    OrderIntake. saves queued orders in batches on a writer thread.
+
+    save_batch is called with a list of PendingOrder and returns their
+    results in order; it runs on the writer thread.
+    """
+
+    def __init__(self, save_batch, batch_size, max_wait_ms, queue_size,
+                 timeout=None, counters=None):
+        self.save_batch = save_batch
+        self.batch_size = max(batch_size, 1)
+        self.max_wait = max_wait_ms / 1000.0
+        self.timeout = timeout
+        self.counters = counters
+        self._queue = queue.Queue(max(queue_size, 1))
+        self._lock = threading.Lock()
+        self._writer = None
+
+    def submit(self, pending):
+        """
+        submit. queues a pending order and returns its future
+        """
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            self._incr('rejected')
+            raise OrderIntakeFull()
+        self._incr('queued')
+        return pending.future
+
+    def place(self, pending):
+        """
+        place. queues a pending order and waits for its result
+        """
+        future = self.submit(pending)
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            if future.cancel():
+                # still queued, the writer will skip it
+                self._incr('timed_out')
+                raise OrderIntakeFull()
+        # the writer has taken it, its transaction decides the result
+        return future.result()
+
+    def shutdown(self):
+        """
+        shutdown. saves the queued orders and stops the writer thread
+        """
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(_STOP)
+            writer.join(self.timeout)
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(
+                        target=self._run, name='order-intake')
+                    self._writer.daemon = True
+                    self._writer.start()
+
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                self._save(batch)
+            if stop:
+                return
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.time() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.time()
+            try:
+                pending = self._queue.get(timeout=max(remaining, 0)) \
+                    if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is _STOP:
+                return batch, True
+            batch.append(pending)
+        return batch, False
+
+    def _save(self, batch):
+        # orders whose caller gave up waiting are not saved
+        taken = [pending for pending in batch
+                 if pending.future.set_running_or_notify_cancel()]
+        if len(taken) < len(batch):
+            self._incr('abandoned', len(batch) - len(taken))
+        batch = taken
+        if not batch:
+            return
+        started = time.time()
+        for pending in batch:
+            wait_ms = (started - pending.queued_at) * 1000
+            self._incr('queue_wait_ms', int(wait_ms))
+            self._incr(_bucket('queue_wait_ms', wait_ms, QUEUE_WAIT_BUCKETS))
+        self._incr('batches')
+        self._incr('batched_orders', len(batch))
+        self._incr(_bucket('batch_size', len(batch), BATCH_SIZE_BUCKETS))
+        try:
+            results = self.save_batch(batch)
+        except Exception:
+            self._incr('failed_batches')
+            # one bad order must not fail the orders batched with it
+            for pending in batch:
+                self._save_one(pending)
+            return
+        for pending, result in zip(batch, results):
+            pending.future.set_result(result)
+
+    def _save_one(self, pending):
+        try:
+            result = self.save_batch([pending])[0]
+        except Exception as error:
+            self._incr('failed_orders')
+            pending.future.set_exception(error)
+        else:
+            pending.future.set_result(result)
+
+    def _incr(self, name, amount=1):
+        if self.counters is not None:
+            self.counters.incr(name, amount)
+
+
+def _bucket(name, value, bounds):
+    for bound in bounds:
+        if value <= bound:
+            return '{}_le_{}'.format(name, bound)
+    return '{}_gt_{}'.format(name, bounds[-1])
+
+
+def save_orders(app, batch):
+    """
+    save_orders. saves a batch of pending orders in one transaction and
+    returns them serialized
+    """
+    from .models import Meal, Order
+    with app.app_context():
+        try:
+            # a sold out order fails the batch, which is then retried one
+            # order at a time
+            reservations = [capacity.reserve(pending.values['menu_id'],
+                                             pending.capped_meal_ids,
+                                             pending.values['order_count'])
+                            for pending in batch]
+            meal_ids = set(meal_id for pending in batch
+                           for meal_id in pending.meal_ids)
+            meals_by_id = {meal.id: meal for meal in
+                           Meal.query.filter(Meal.id.in_(meal_ids))}
+            orders = [Order(meals=[meals_by_id[meal_id]
+                                   for meal_id in pending.meal_ids],
+                            reservations=reserved, **pending.values)
+                      for pending, reserved in zip(batch, reservations)]
+            db.session.add_all(orders)
+            for order in orders:
+                cache_versions.touch(order)
+            db.session.flush()
+            results = [order.to_dict(customer=pending.customer)
+                       for order, pending in zip(orders, batch)]
+            db.session.commit()
+            return results
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            db.session.remove()
+
+
+def init_app(app):
+    """
+    init_app. attaches an order intake to the application when enabled
+    """
+    if not app.config['ORDER_INTAKE']:
+        return
+    app.extensions['order_intake'] = OrderIntake(
+        lambda batch: save_orders(app, batch),
+        app.config['ORDER_INTAKE_BATCH_SIZE'],
+        app.config['ORDER_INTAKE_MAX_WAIT_MS'],
+        app.config['ORDER_INTAKE_QUEUE_SIZE'],
+        timeout=app.config['ORDER_INTAKE_TIMEOUT'],
+        counters=get_counters('order_intake', app))
+
+
+def get_intake():
+    """
+    get_intake. returns the order intake of the current application, None
+    when orders are committed by their request
+    """
+    return current_app.extensions.get('order_intake')
@@ -0,0 +1,116 @@
+"""
+Module contains per request SQL statement counting and timing.
+
+Engine events count every statement executed by the current thread into
+the active collectors. Each request gets a collector whose totals are
+written to the access log and, when SQL_STATS_HEADERS is set, to the
+X-Query-Count and X-Query-Time-Ms response headers.
+"""
+import contextlib
+import logging
+import threading
+import time
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+ENVIRON_KEY = 'meal_app.query_stats'
+
+access_log = logging.getLogger('app.access')
+_local = threading.local()
+
+
+class QueryStats:
+    """
+    QueryStats. number, duration and text of executed statements
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+
+    def record(self, statement, duration):
+        """
+        record. adds an executed statement
+        """
+        self.count += 1
+        self.duration += duration
+        self.statements.append(statement)
+
+
+def _collectors():
+    collectors = getattr(_local, 'collectors', None)
+    if collectors is None:
+        collectors = _local.collectors = []
+    return collectors
+
+
+@contextlib.contextmanager
+def collect():
+    """
+    collect. counts statements executed by this thread within the block
+    """
+    stats = QueryStats()
+    collectors = _collectors()
+    collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        collectors.remove(stats)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started_at', []).append(time.time())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.time() - conn.info['query_started_at'].pop()
+    for stats in _collectors():
+        stats.record(statement, duration)
+
+
+def start_request():
+    """
+    start_request. starts collecting the statements of a request
+    """
+    stats = QueryStats()
+    _collectors().append(stats)
+    request.environ[ENVIRON_KEY] = stats
+
+
+def finish_request(response):
+    """
+    finish_request. reports the statements of a request
+    """
+    stats = request.environ.get(ENVIRON_KEY)
+    if stats is None:
+        return response
+    if current_app.config['SQL_STATS_HEADERS']:
+        response.headers['X-Query-Count'] = str(stats.count)
+        response.headers['X-Query-Time-Ms'] = '{:.1f}'.format(
+            stats.duration * 1000)
+    access_log.info('%s %s %s queries=%d db_time=%.1fms', request.method,
+                    request.path, response.status_code, stats.count,
+                    stats.duration * 1000)
+    return response
+
+
+def teardown_request(exc):
+    """
+    teardown_request. stops collecting the statements of a request
+    """
+    stats = request.environ.pop(ENVIRON_KEY, None)
+    if stats is not None and stats in _collectors():
+        _collectors().remove(stats)
+
+
+def init_app(app):
+    """
+    init_app. counts the statements of every request of the application
+    """
+    app.before_request(start_request)
+    app.after_request(finish_request)
+    app.teardown_request(teardown_request)
@@ -0,0 +1,198 @@
+"""
+Module contains the incremental sales rollups.
+
+daily_sales and daily_meal_sales hold per day totals of every catering,
+leaving out cancelled orders. When orders are flushed their old
+contribution is taken from, and their new contribution added to, the
+rollups in the same transaction, so sales reports never read orders.
+Like meal capacities, the totals of a day are split over
+SALES_ROLLUP_SLOTS rows and each flush adds to one random slot, so
+concurrent orders of a catering rarely wait on the same row lock; reports
+sum the slots. rebuild recomputes the rollups from orders to backfill or
+repair them.
+"""
+import datetime
+import random
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import and_, event, func, inspect, literal, select
+from . import db
+from .models import DailySales, DailyMealSales, Meal, Order
+from .models.order import order_meals
+
+
+def _contribution(deltas, sign, day, catering_id, status, total_cost,
+                  order_count, meal_ids):
+    if catering_id is None or status == Order.CANCELLED:
+        return
+    sales = deltas[DailySales][(catering_id, day)]
+    sales['orders'] += sign
+    sales['revenue'] += sign * (total_cost or 0)
+    for meal_id in meal_ids:
+        meal_sales = deltas[DailyMealSales][(catering_id, day, meal_id)]
+        meal_sales['orders'] += sign
+        meal_sales['portions'] += sign * (order_count or 1)
+
+
+def _day(order):
+    created_at = order.created_at or datetime.datetime.now()
+    return created_at.date()
+
+
+def _value(state, key, old):
+    history = state.attrs[key].history
+    if old and history.deleted:
+        return history.deleted[0]
+    if not old and history.added:
+        return history.added[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.dict.get(key)
+
+
+def _meal_ids(session, state, old):
+    if 'meals' in state.unloaded:
+        # the meals were not touched, read the links of the order
+        return [row[0] for row in session.execute(
+            select([order_meals.c.meal_id]).where(
+                order_meals.c.order_id == state.obj().id))]
+    history = state.attrs.meals.history
+    meals = list(history.unchanged or ()) + list(
+        (history.deleted if old else history.added) or ())
+    return [meal.id for meal in meals]
+
+
+def _old_contribution(deltas, session, order):
+    state = inspect(order)
+    _contribution(deltas, -1, _day(order),
+                  _value(state, 'catering_id', True),
+                  _value(state, 'status', True),
+                  _value(state, 'total_cost', True),
+                  _value(state, 'order_count', True),
+                  _meal_ids(session, state, True))
+
+
+def _new_contribution(deltas, session, order):
+    state = inspect(order)
+    _contribution(deltas, 1, _day(order), order.catering_id, order.status,
+                  order.total_cost, order.order_count,
+                  _meal_ids(session, state, False))
+
+
+def _apply(session, model, key_columns, deltas, slot):
+    table = model.__table__
+    key_columns = key_columns + ['slot']
+    # a fixed order keeps two flushes from locking rows in opposite order
+    for key in sorted(deltas):
+        values = {name: value for name, value in deltas[key].items()
+                  if value}
+        if not values:
+            continue
+        keys = dict(zip(key_columns, key + (slot,)))
+        if session.get_bind().dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+            statement = insert(table).values(dict(keys, **values))
+            session.execute(statement.on_conflict_do_update(
+                index_elements=key_columns, set_={
+                    name: table.c[name] + statement.excluded[name]
+                    for name in values}))
+            continue
+        result = session.execute(table.update().where(and_(*[
+            table.c[name] == value for name, value in keys.items()
+        ])).values({name: table.c[name] + value
+                    for name, value in values.items()}))
+        if result.rowcount == 0:
+            session.execute(table.insert().values(dict(keys, **values)))
+
+
+def _update_rollups(session, flush_context):
+    deltas = {
+        DailySales: defaultdict(lambda: defaultdict(int)),
+        DailyMealSales: defaultdict(lambda: defaultdict(int))
+    }
+    for order in session.new:
+        if isinstance(order, Order):
+            _new_contribution(deltas, session, order)
+    for order in session.dirty:
+        if isinstance(order, Order) and session.is_modified(order):
+            _old_contribution(deltas, session, order)
+            _new_contribution(deltas, session, order)
+    for order in session.deleted:
+        if isinstance(order, Order):
+            _old_contribution(deltas, session, order)
+    if not deltas[DailySales] and not deltas[DailyMealSales]:
+        return
+    slot = random.randrange(current_app.config['SALES_ROLLUP_SLOTS'])
+    _apply(session, DailySales, ['catering_id', 'day'],
+           deltas[DailySales], slot)
+    _apply(session, DailyMealSales, ['catering_id', 'day', 'meal_id'],
+           deltas[DailyMealSales], slot)
+
+
+event.listen(db.session, 'after_flush', _update_rollups)
+
+
+def rebuild():
+    """
+    rebuild. recomputes the rollups from orders that were not cancelled,
+    into slot 0
+    """
+    day = func.date(Order.created_at)
+    orders = Order.__table__
+    sold = and_(orders.c.catering_id.isnot(None),
+                orders.c.status != Order.CANCELLED)
+    db.session.execute(DailyMealSales.__table__.delete())
+    db.session.execute(DailySales.__table__.delete())
+    db.session.execute(DailySales.__table__.insert().from_select(
+        ['day', 'catering_id', 'slot', 'orders', 'revenue'],
+        select([day, orders.c.catering_id, literal(0), func.count(orders.c.id),
+                func.coalesce(func.sum(orders.c.total_cost), 0)]).where(
+            sold).group_by(
+            day, orders.c.catering_id)))
+    db.session.execute(DailyMealSales.__table__.insert().from_select(
+        ['day', 'catering_id', 'meal_id', 'slot', 'orders', 'portions'],
+        select([day, orders.c.catering_id, order_meals.c.meal_id, literal(0),
+                func.count(orders.c.id),
+                func.sum(func.coalesce(orders.c.order_count, 1))]).select_from(
+            orders.join(order_meals, order_meals.c.order_id == orders.c.id)
+        ).where(sold).group_by(
+            day, orders.c.catering_id, order_meals.c.meal_id)))
+    db.session.commit()
+
+
+def sales_report(catering_id, start, end, top):
+    """
+    sales_report. returns daily orders and revenue of a catering between
+    start and end inclusive, and its top meals by portions
+    """
+    days = db.session.query(
+        DailySales.day, func.sum(DailySales.orders).label('orders'),
+        func.sum(DailySales.revenue).label('revenue')
+    ).filter(
+        DailySales.catering_id == catering_id,
+        DailySales.day.between(start, end)
+    ).group_by(DailySales.day).order_by(DailySales.day).all()
+    portions = func.sum(DailyMealSales.portions)
+    top_meals = db.session.query(
+        DailyMealSales.meal_id, Meal.title, func.sum(DailyMealSales.orders),
+        portions
+    ).join(Meal, Meal.id == DailyMealSales.meal_id).filter(
+        DailyMealSales.catering_id == catering_id,
+        DailyMealSales.day.between(start, end)
+    ).group_by(DailyMealSales.meal_id, Meal.title).order_by(
+        portions.desc(), DailyMealSales.meal_id).limit(top).all()
+    return {
+        'days': [{
+            'date': str(sales.day),
+            'orders': int(sales.orders),
+            'revenue': float(sales.revenue)
+        } for sales in days if sales.orders],
+        'totalOrders': int(sum(sales.orders for sales in days)),
+        'totalRevenue': float(sum(sales.revenue for sales in days)),
+        'topMeals': [{
+            'mealId': meal_id,
+            'title': title,
+            'orders': int(orders),
+            'portions': int(meal_portions)
+        } for meal_id, title, orders, meal_portions in top_meals]
+    }
@@ -0,0 +1,205 @@
+"""
+Module contains the compiled response serializers and the JSON backend.
+
+A Serializer is built once per model from its list of fields and turns an
+object, or a row tuple holding the same fields in order, into a dict
+without looking fields up by name. List serializers share one Nested
+cache per response, so a meal or customer repeated over many orders or
+menus is serialized once.
+
+Responses are encoded with the fastest JSON library installed, picked by
+JSON_BACKEND: orjson, then ujson, then the standard library.
+"""
+import json
+import logging
+from operator import attrgetter
+
+logger = logging.getLogger(__name__)
+
+
+class Serializer:
+    """
+    Serializer. turns objects or row tuples into dicts of fields.
+    fields are (key, attribute) or (key, attribute, convert) tuples;
+    convert is applied to non null values
+    """
+
+    def __init__(self, fields):
+        fields = [tuple(field) + (None,) * (3 - len(field)) for field in fields]
+        self.keys = tuple(key for key, _, _ in fields)
+        self.attributes = tuple(attribute for _, attribute, _ in fields)
+        self._converters = tuple((index, convert) for index, (_, _, convert)
+                                 in enumerate(fields) if convert is not None)
+        getter = attrgetter(*self.attributes)
+        self._getter = getter if len(fields) > 1 else \
+            lambda obj: (getter(obj),)
+
+    def columns(self, model):
+        """
+        columns. returns the columns of model to select for from_row
+        """
+        return [getattr(model, attribute) for attribute in self.attributes]
+
+    def from_row(self, row):
+        """
+        from_row. returns the dict of a row of values in field order
+        """
+        if not self._converters:
+            return dict(zip(self.keys, row))
+        values = list(row)
+        for index, convert in self._converters:
+            if values[index] is not None:
+                values[index] = convert(values[index])
+        return dict(zip(self.keys, values))
+
+    def dump(self, obj):
+        """
+        dump. returns the dict of an object
+        """
+        return self.from_row(self._getter(obj))
+
+
+class Nested:
+    """
+    Nested. serializes related objects once per id within a response
+    """
+
+    def __init__(self):
+        self._dumped = {}
+
+    def dump(self, serializer, obj):
+        """
+        dump. returns the dict of obj, reusing the one already made for
+        an object of the same serializer and id
+        """
+        key = (serializer, obj.id)
+        data = self._dumped.get(key)
+        if data is None:
+            data = self._dumped[key] = serializer.dump(obj)
+        return data
+
+
+MEAL = Serializer((('id', 'id'), ('title', 'title'),
+                   ('description', 'description'), ('price', 'price')))
+
+USER = Serializer((('id', 'id'), ('name', 'name'), ('email', 'email')))
+
+CATERING = Serializer((('id', 'id'), ('name', 'name'),
+                       ('address', 'address')))
+
+MENU = Serializer((('id', 'id'), ('title', 'title'),
+                   ('description', 'description'), ('menuDate', 'date', str)))
+
+ORDER = Serializer((('id', 'id'), ('cost', 'total_cost'),
+                    ('expiresAt', 'expires_at', str), ('status', 'status'),
+                    ('createdAt', 'created_at', str),
+                    ('orderCount', 'order_count'), ('menuId', 'menu_id')))
+
+
+def dump_menu(menu, nested=None):
+    """
+    dump_menu. returns the dict of a menu with its meals and catering
+    """
+    nested = nested or Nested()
+    data = MENU.dump(menu)
+    data['meals'] = [nested.dump(MEAL, meal) for meal in menu.meals]
+    data['catering'] = nested.dump(CATERING, menu.catering)
+    return data
+
+
+def dump_order(order, customer=None, nested=None):
+    """
+    dump_order. returns the dict of an order with its meals and customer.
+    customer is an already serialized customer, it is loaded if omitted
+    """
+    nested = nested or Nested()
+    data = ORDER.dump(order)
+    data['totalCost'] = order.total_cost / order.order_count
+    data['meals'] = [nested.dump(MEAL, meal) for meal in order.meals]
+    data['customer'] = customer or nested.dump(USER, order.customer)
+    return data
+
+
+def dump_menus(menus):
+    """
+    dump_menus. returns the dicts of menus sharing nested meals
+    """
+    nested = Nested()
+    return [dump_menu(menu, nested) for menu in menus]
+
+
+def dump_orders(orders):
+    """
+    dump_orders. returns the dicts of orders sharing nested meals and
+    customers
+    """
+    nested = Nested()
+    return [dump_order(order, nested=nested) for order in orders]
+
+
+def _orjson():
+    import orjson
+
+    def dumps(data):
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode(
+            'utf-8')
+    return dumps
+
+
+def _ujson():
+    import ujson
+
+    def dumps(data):
+        return ujson.dumps(data, ensure_ascii=False,
+                           escape_forward_slashes=False)
+    return dumps
+
+
+def _stdlib():
+    def dumps(data):
+        return json.dumps(data, separators=(',', ':'))
+    return dumps
+
+
+JSON_BACKENDS = {'orjson': _orjson, 'ujson': _ujson, 'json': _stdlib}
+
+_dumps = _stdlib()
+
+
+def use_backend(name):
+    """
+    use_backend. encodes JSON with the backend name, 'auto' picks the
+    fastest one installed. returns the name of the backend in use
+    """
+    global _dumps
+    if name != 'auto' and name not in JSON_BACKENDS:
+        raise ValueError('Unknown JSON backend {}'.format(name))
+    names = ('orjson', 'ujson', 'json') if name == 'auto' else (name, 'json')
+    for candidate in names:
+        try:
+            _dumps = JSON_BACKENDS[candidate]()
+        except ImportError:
+            if name != 'auto':
+                logger.warning('JSON backend %s is not installed, using json',
+                               name)
+            continue
+        return candidate
+
+
+def dumps(data):
+    """
+    dumps. encodes data as JSON with the configured backend
+    """
+    try:
+        return _dumps(data)
+    except TypeError:
+        # values the fast backends refuse, such as Decimal, go through
+        # the standard library
+        return json.dumps(data, separators=(',', ':'), default=str)
+
+
+def init_app(app):
+    """
+    init_app. selects the JSON backend of the application
+    """
+    app.extensions['json_backend'] = use_backend(app.config['JSON_BACKEND'])
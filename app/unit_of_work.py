@@ -0,0 +1,90 @@
+"""
+Module contains the request scoped unit of work.
+
+While a request is being handled BaseModel.save and BaseModel.delete only
+flush their changes. The transaction is committed once when the request
+succeeds and rolled back when it fails, so a handler touching several
+rows pays for a single commit.
+"""
+from flask import request, has_request_context
+from sqlalchemy import event
+from . import db
+
+FLAG = 'meal_app.unit_of_work'
+WRITES = 'meal_app.unit_of_work.writes'
+
+
+def is_active():
+    """
+    is_active. determines if changes are committed at the end of a request
+    """
+    return has_request_context() and request.environ.get(FLAG, False)
+
+
+def begin():
+    """
+    begin. starts the unit of work of a request
+    """
+    request.environ[FLAG] = True
+
+
+def finish(response):
+    """
+    finish. commits a successful request and rolls back a failed one
+    """
+    if not is_active():
+        return response
+    request.environ[FLAG] = False
+    if response.status_code >= 400:
+        db.session.rollback()
+        return response
+    if not request.environ.get(WRITES) and not _has_pending_changes():
+        # read only request, nothing to commit
+        return response
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return response
+
+
+def teardown(exc):
+    """
+    teardown. rolls back a request that ended with an unhandled error
+    """
+    if is_active():
+        request.environ[FLAG] = False
+        db.session.rollback()
+
+
+def _has_pending_changes():
+    session = db.session
+    return bool(session.new or session.dirty or session.deleted)
+
+
+def mark_write():
+    """
+    mark_write. records a write made without a flush, such as a core
+    UPDATE, so the request's transaction is committed
+    """
+    if is_active():
+        request.environ[WRITES] = True
+
+
+def _record_write(session, flush_context):
+    mark_write()
+
+
+event.listen(db.session, 'after_flush', _record_write)
+
+
+def init_app(app):
+    """
+    init_app. wraps every request of the application in a unit of work
+    """
+    if not app.config['UNIT_OF_WORK']:
+        return
+    app.before_request(begin)
+    app.after_request(finish)
+    app.teardown_request(teardown)
@@ -0,0 +1,89 @@
+"""
+Benchmark of compressing list responses.
+
+Serializes pages of 50 and 200 orders and of menus as GET /orders,
+/myorders and /menus do, and reports for gzip at levels 1, 6 and 9, and
+brotli when installed, the compressed size, the ratio and the CPU time
+spent per response.
+
+Usage: MEAL_APP_CONFIG=testing python benchmarks/bench_compression.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_application, db  # noqa
+from app.compression import CODERS, available_encodings  # noqa
+from app.models import Catering, Meal, Menu, Order, Role, User  # noqa
+from app.serializers import dump_menus, dump_orders, dumps  # noqa
+
+ORDERS = 200
+CUSTOMERS = 50
+MEALS = 20
+ROUNDS = 50
+SETTINGS = [('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 1), ('br', 5),
+            ('br', 11)]
+
+
+def setup():
+    Role.insert_roles()
+    admin = User(name='admin', email='admin@bench.com', password='secret')
+    catering = Catering(name='bench catering', admin=admin)
+    meals = [Meal(title='meal {}'.format(i), price=100 + i,
+                  description='lorem ipsum dolor sit amet',
+                  catering=catering) for i in range(MEALS)]
+    menus = [Menu(title='menu {}'.format(i),
+                  menu_date='2018-04-{:02d}'.format(i + 1), meals=meals,
+                  catering=catering) for i in range(10)]
+    customers = [User(name='customer {}'.format(i),
+                      email='customer{}@bench.com'.format(i),
+                      password='secret') for i in range(CUSTOMERS)]
+    db.session.add_all(menus + customers)
+    db.session.flush()
+    db.session.add_all([Order(
+        total_cost=1000, order_count=1 + i % 3, catering=catering,
+        menu=menus[0], customer=customers[i % CUSTOMERS],
+        meals=[meals[i % MEALS], meals[(i + 1 + i % 5) % MEALS]])
+        for i in range(ORDERS)])
+    db.session.commit()
+
+
+def timed(label, body, encoding, level):
+    config = {'COMPRESSION_GZIP_LEVEL': level,
+              'COMPRESSION_BROTLI_QUALITY': level}
+    started = time.process_time()
+    for _ in range(ROUNDS):
+        compress, finish = CODERS[encoding](config)
+        compressed = compress(body) + finish()
+    elapsed = (time.process_time() - started) / ROUNDS
+    print('{:<18} {:<4} {:>2}  {:8d} -> {:7d} bytes  {:5.1f}x  {:7.3f} ms'
+          .format(label, encoding, level, len(body), len(compressed),
+                  len(body) / len(compressed), elapsed * 1000))
+
+
+def run():
+    app = create_application(os.getenv('MEAL_APP_CONFIG') or 'testing')
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        setup()
+        orders = Order.query.options(*Order.to_dict_options()).all()
+        menus = Menu.query.options(*Menu.to_dict_options()).all()
+        bodies = [
+            ('50 orders', dumps({'orders': dump_orders(orders[:50])})),
+            ('200 orders', dumps({'orders': dump_orders(orders)})),
+            ('10 menus', dumps({'menus': dump_menus(menus)})),
+        ]
+        encodings = available_encodings(app.config)
+        for label, body in bodies:
+            for encoding, level in SETTINGS:
+                if encoding in encodings:
+                    timed(label, body.encode('utf-8'), encoding, level)
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,90 @@
+"""
+Benchmark of login throughput with inline and pooled password hashing.
+
+Simulates one threaded worker receiving a burst of logins while customers
+read today's menu, and reports logins per second and menu read latency.
+
+Usage: MEAL_APP_CONFIG=testing python benchmarks/bench_login.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_application, db  # noqa
+from app.models import Role, User  # noqa
+
+USERS = 40
+THREADS = 8
+HASH_METHOD = 'pbkdf2:sha256:50000'
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100.0))]
+
+
+def run(label, hash_workers):
+    app = create_application(os.getenv('MEAL_APP_CONFIG') or 'testing')
+    app.config['PASSWORD_HASH_METHOD'] = HASH_METHOD
+    app.config['PASSWORD_HASH_WORKERS'] = hash_workers
+    app.config['PASSWORD_HASH_QUEUE_SIZE'] = USERS
+    from app import hashing
+    hashing.init_app(app)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        Role.insert_roles()
+        for i in range(USERS):
+            db.session.add(User(name='user', email='user{}@bench.com'.format(i),
+                                password='secret'))
+        db.session.commit()
+
+    client = app.test_client()
+    emails = ['user{}@bench.com'.format(i) for i in range(USERS)]
+    lock = threading.Lock()
+    read_latencies = []
+    done = threading.Event()
+
+    def login_worker():
+        while True:
+            with lock:
+                if not emails:
+                    return
+                email = emails.pop()
+            client.post('/api/v1/auth/login', content_type='application/json',
+                        data='{{"email": "{}", "password": "secret"}}'.format(email))
+
+    def read_worker():
+        while not done.is_set():
+            started = time.time()
+            client.get('/api/v1/menu')
+            read_latencies.append(time.time() - started)
+
+    reader = threading.Thread(target=read_worker)
+    workers = [threading.Thread(target=login_worker) for _ in range(THREADS)]
+    started = time.time()
+    reader.start()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.time() - started
+    done.set()
+    reader.join()
+
+    print('{:<10} {:>8.1f} logins/s   menu read p50 {:>7.1f} ms  p99 {:>7.1f} ms'.format(
+        label, USERS / elapsed, percentile(read_latencies, 50) * 1000,
+        percentile(read_latencies, 99) * 1000))
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    run('inline', 0)
+    run('pooled', 2)
@@ -0,0 +1,101 @@
+"""
+Benchmark of order placement throughput.
+
+Customers place orders on today's menu from 50 concurrent threads and the
+script reports orders per second and p50/p99 latency.
+
+Usage: MEAL_APP_CONFIG=testing python benchmarks/bench_orders.py
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_application, db  # noqa
+from app.models import Catering, Meal, Menu, Role, User  # noqa
+
+ORDERS = int(os.getenv('BENCH_ORDERS', 2000))
+CONCURRENCY = 50
+CUSTOMERS = 50
+MEALS = 20
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100.0))]
+
+
+def setup(app):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        Role.insert_roles()
+        admin = User(name='admin', email='admin@bench.com', password='secret')
+        admin.role = Role.query.filter_by(name='Admin').first()
+        catering = Catering(name='bench catering', admin=admin)
+        meals = [Meal(title='meal {}'.format(i), price=100 + i,
+                      catering=catering) for i in range(MEALS)]
+        menu = Menu(title='bench menu', meals=meals, catering=catering)
+        customers = [User(name='user', email='user{}@bench.com'.format(i),
+                          password='secret') for i in range(CUSTOMERS)]
+        db.session.add_all([admin, catering, menu] + meals + customers)
+        db.session.commit()
+        tokens = [customer.generate_jwt_token() for customer in customers]
+        return menu.id, [meal.id for meal in meals], tokens
+
+
+def run():
+    app = create_application(os.getenv('MEAL_APP_CONFIG') or 'testing')
+    app.config['SQL_STATS_HEADERS'] = False
+    menu_id, meal_ids, tokens = setup(app)
+
+    client = app.test_client()
+    lock = threading.Lock()
+    remaining = [ORDERS]
+    latencies = []
+    failures = []
+
+    def worker(index):
+        token = tokens[index % len(tokens)]
+        meals = meal_ids[index % MEALS:index % MEALS + 3] or meal_ids[:3]
+        body = json.dumps({'menuId': menu_id, 'meals': meals,
+                           'orderCount': 1})
+        while True:
+            with lock:
+                if not remaining[0]:
+                    return
+                remaining[0] -= 1
+            started = time.time()
+            res = client.post('/api/v1/orders', data=body, headers={
+                'Authorization': token, 'Content-Type': 'application/json'})
+            elapsed = time.time() - started
+            with lock:
+                latencies.append(elapsed)
+                if res.status_code != 201:
+                    failures.append(res.status_code)
+
+    workers = [threading.Thread(target=worker, args=(i,))
+               for i in range(CONCURRENCY)]
+    started = time.time()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.time() - started
+
+    print('{} orders, concurrency {}: {:.1f} orders/s   p50 {:.1f} ms  '
+          'p99 {:.1f} ms   failures {}'.format(
+              ORDERS, CONCURRENCY, ORDERS / elapsed,
+              percentile(latencies, 50) * 1000,
+              percentile(latencies, 99) * 1000, len(failures)))
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,92 @@
+"""
+Benchmark of the read only list path against ORM queries.
+
+Lists 10,000 orders with their meals and customers, and 10,000 meals,
+once through Model.query...all() and the ORM serializers and once through
+the Core select() rows of app/api/read_models.py, and reports the time
+and the peak memory traced by tracemalloc of each.
+
+Usage: MEAL_APP_CONFIG=testing python benchmarks/bench_read_path.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_application, db  # noqa
+from app.api.read_models import (MealRow, OrderRow, dump_meal_rows,  # noqa
+                                 dump_order_rows, meal_statement,
+                                 order_statement)
+from app.models import Catering, Meal, Menu, Order, Role, User  # noqa
+from app.serializers import MEAL, dump_orders  # noqa
+
+ROWS = int(os.getenv('BENCH_ROWS', 10000))
+CUSTOMERS = 200
+MENU_MEALS = 20
+ROUNDS = 3
+
+
+def setup():
+    Role.insert_roles()
+    admin = User(name='admin', email='admin@bench.com', password='secret')
+    catering = Catering(name='bench catering', admin=admin)
+    meals = [Meal(title='meal {}'.format(i), price=100 + i % 50,
+                  description='lorem ipsum', catering=catering)
+             for i in range(ROWS)]
+    menu = Menu(title='bench', menu_date='2018-04-26',
+                meals=meals[:MENU_MEALS], catering=catering)
+    customers = [User(name='customer {}'.format(i),
+                      email='customer{}@bench.com'.format(i),
+                      password='secret') for i in range(CUSTOMERS)]
+    db.session.add_all([menu] + customers + meals)
+    db.session.flush()
+    db.session.add_all([Order(
+        total_cost=1000, order_count=1 + i % 3, catering=catering, menu=menu,
+        customer=customers[i % CUSTOMERS],
+        meals=[meals[i % MENU_MEALS], meals[(i + 1 + i % 5) % MENU_MEALS]])
+        for i in range(ROWS)])
+    db.session.commit()
+    return catering.id
+
+
+def measure(label, list_rows):
+    timings = []
+    peaks = []
+    for _ in range(ROUNDS):
+        db.session.remove()
+        tracemalloc.start()
+        started = time.time()
+        items = list_rows()
+        timings.append(time.time() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    print('{:<28} {:6d} rows  {:8.1f} ms  peak {:7.1f} MiB'.format(
+        label, len(items), min(timings) * 1000, min(peaks) / 2.0 ** 20))
+
+
+def run():
+    app = create_application(os.getenv('MEAL_APP_CONFIG') or 'testing')
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        catering_id = setup()
+        measure('orders: ORM query', lambda: dump_orders(
+            Order.query.options(*Order.to_dict_options()).filter_by(
+                catering_id=catering_id).all()))
+        measure('orders: read rows', lambda: dump_order_rows([
+            OrderRow._make(row) for row in db.session.execute(
+                order_statement(Order.catering_id == catering_id))]))
+        measure('meals: ORM query', lambda: [
+            MEAL.dump(meal) for meal in Meal.query.filter_by(
+                catering_id=catering_id).all()])
+        measure('meals: read rows', lambda: dump_meal_rows([
+            MealRow._make(row) for row in db.session.execute(
+                meal_statement(Meal.catering_id == catering_id))]))
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    run()
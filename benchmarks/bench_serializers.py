@@ -0,0 +1,109 @@
+"""
+Benchmark of serializing a page of orders.
+
+Loads 1,000 orders with their meals and customers and reports the time to
+turn them into a JSON body with the former per-row to_dict methods and the
+stdlib encoder (indented, as flask_restplus does in debug mode), with the
+compiled serializers and the stdlib encoder, and with the compiled
+serializers and every other JSON backend installed.
+
+Usage: MEAL_APP_CONFIG=testing python benchmarks/bench_serializers.py
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_application, db  # noqa
+from app.models import Catering, Meal, Menu, Order, Role, User  # noqa
+from app.serializers import JSON_BACKENDS, dump_orders, dumps, use_backend  # noqa
+
+ORDERS = int(os.getenv('BENCH_ORDERS', 1000))
+CUSTOMERS = 50
+MEALS = 20
+ROUNDS = 20
+
+
+def legacy_order_dict(order):
+    return {
+        'id': order.id,
+        'cost': order.total_cost,
+        'totalCost': order.total_cost / order.order_count,
+        'expiresAt': str(order.expires_at),
+        'status': order.status,
+        'meals': [{
+            'id': meal.id,
+            'title': meal.title,
+            'description': meal.description,
+            'price': meal.price
+        } for meal in order.meals],
+        'customer': {
+            'id': order.customer.id,
+            'name': order.customer.name,
+            'email': order.customer.email
+        },
+        'createdAt': str(order.created_at),
+        'orderCount': order.order_count,
+        'menuId': order.menu_id
+    }
+
+
+def setup():
+    Role.insert_roles()
+    admin = User(name='admin', email='admin@bench.com', password='secret')
+    catering = Catering(name='bench catering', admin=admin)
+    meals = [Meal(title='meal {}'.format(i), price=100 + i,
+                  description='lorem ipsum', catering=catering)
+             for i in range(MEALS)]
+    menu = Menu(title='bench', menu_date='2018-04-26', meals=meals,
+                catering=catering)
+    customers = [User(name='customer {}'.format(i),
+                      email='customer{}@bench.com'.format(i),
+                      password='secret') for i in range(CUSTOMERS)]
+    db.session.add_all([menu] + customers)
+    db.session.flush()
+    db.session.add_all([Order(
+        total_cost=1000, order_count=1 + i % 3, catering=catering, menu=menu,
+        customer=customers[i % CUSTOMERS],
+        meals=[meals[i % MEALS], meals[(i + 1 + i % 5) % MEALS]])
+        for i in range(ORDERS)])
+    db.session.commit()
+
+
+def timed(label, encode):
+    orders = Order.query.options(*Order.to_dict_options()).all()
+    encode(orders)
+    started = time.time()
+    for _ in range(ROUNDS):
+        body = encode(orders)
+    elapsed = (time.time() - started) / ROUNDS
+    print('{:<32} {:8.2f} ms  {:6.1f} us/order  {:8d} bytes'.format(
+        label, elapsed * 1000, elapsed * 1e6 / len(orders), len(body)))
+
+
+def run():
+    app = create_application(os.getenv('MEAL_APP_CONFIG') or 'testing')
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        setup()
+        print('{} orders, best backend: {}'.format(
+            ORDERS, app.extensions['json_backend']))
+        timed('to_dict + json (indent 4)', lambda orders: json.dumps(
+            {'orders': [legacy_order_dict(order) for order in orders]},
+            indent=4))
+        timed('to_dict + json', lambda orders: json.dumps(
+            {'orders': [legacy_order_dict(order) for order in orders]}))
+        for name in sorted(JSON_BACKENDS):
+            if use_backend(name) != name:
+                continue
+            timed('serializers + {}'.format(name), lambda orders: dumps(
+                {'orders': dump_orders(orders)}))
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,108 @@
+"""
+Benchmark of validating request bodies.
+
+Validates the bodies of a registration, a new meal and a new menu the
+former way, jsonschema validation of the api model followed by a
+RequestParser built for the request (and, for menus, the date parsed again
+by dateutil), and with the schemas compiled at import, and reports the
+cost of each per request.
+
+Usage: MEAL_APP_CONFIG=testing python benchmarks/bench_validation.py
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dateutil import parser as date_parser  # noqa
+from flask import request  # noqa
+from flask_restplus import reqparse  # noqa
+from app import create_application  # noqa
+from app.api.auth import REGISTER_MODAL, REGISTER_SCHEMA  # noqa
+from app.api.common import email_type, str_type, validate_date  # noqa
+from app.api.meals import MEAL_MODAL, MEAL_SCHEMA  # noqa
+from app.api.menus import MENU_MODAL, MENU_SCHEMA  # noqa
+
+ROUNDS = int(os.getenv('BENCH_ROUNDS', 5000))
+
+
+def legacy_register():
+    REGISTER_MODAL.validate(request.json)
+    parser = reqparse.RequestParser()
+    parser.add_argument('name', type=str_type, required=True,
+                        help='Name field is required')
+    parser.add_argument('email', type=email_type, required=True)
+    parser.add_argument('password', type=str_type, required=True,
+                        help='Password field is required')
+    return parser.parse_args()
+
+
+def legacy_meal():
+    MEAL_MODAL.validate(request.json)
+    parser = reqparse.RequestParser()
+    parser.add_argument('title', type=str_type, required=True)
+    parser.add_argument('price', type=int, required=True)
+    parser.add_argument('description', type=str_type)
+    return parser.parse_args()
+
+
+def legacy_menu_date(value):
+    # the former menu_date type, checked the format before dateutil parsed it
+    value = str_type(value)
+    if not validate_date(value):
+        raise ValueError('Incorrect date format, should be YYYY-MM-DD')
+    return value
+
+
+LEGACY_MENU = reqparse.RequestParser()
+LEGACY_MENU.add_argument('title', type=str_type, required=True)
+LEGACY_MENU.add_argument('description', type=str_type)
+LEGACY_MENU.add_argument('meals', required=True, action='append')
+LEGACY_MENU.add_argument('menu_date', type=legacy_menu_date, required=True)
+
+
+def legacy_menu():
+    MENU_MODAL.validate(request.json)
+    args = LEGACY_MENU.parse_args()
+    # once by the former menu_date type and once by the Menu.menu_date setter
+    date_parser.parse(args['menu_date'])
+    date_parser.parse(args['menu_date'])
+    return args
+
+
+BODIES = [
+    ('register', {'name': 'Solomon Nsubuga', 'email': 'solo@andela.com',
+                  'password': 'AwesomeAndela'},
+     legacy_register, REGISTER_SCHEMA.validate),
+    ('meal', {'title': 'Rice', 'price': 1000, 'description': 'lorem'},
+     legacy_meal, MEAL_SCHEMA.validate),
+    ('menu', {'title': 'lunch', 'description': 'lorem',
+              'menu_date': '2018-04-26', 'meals': [1, 2, 3, 4]},
+     legacy_menu, MENU_SCHEMA.validate),
+]
+
+
+def timed(app, body, validate):
+    with app.test_request_context(method='POST', data=json.dumps(body),
+                                  content_type='application/json'):
+        validate()
+        started = time.time()
+        for _ in range(ROUNDS):
+            validate()
+        return (time.time() - started) / ROUNDS
+
+
+def run():
+    app = create_application(os.getenv('MEAL_APP_CONFIG') or 'testing')
+    for label, body, legacy, compiled in BODIES:
+        before = timed(app, body, legacy)
+        after = timed(app, body, compiled)
+        print('{:<10} reqparse + jsonschema {:7.1f} us  schema {:6.1f} us  '
+              '{:5.1f}x'.format(label, before * 1e6, after * 1e6,
+                                before / after))
+
+
+if __name__ == '__main__':
+    run()
@@ -40,5 +40,88 @@ def initialize():
     Role.insert_roles()
 
 
+@manager.option('-f', '--file', dest='path', help='CSV file with name, email and password columns')
+@manager.option('-b', '--batch-size', dest='batch_size', type=int, default=None)
+def import_users(path, batch_size=None):
+    """
+     Import users from a CSV file in batches and print a per-row error report.
+    """
+    import io
+    from app.bulk_import import import_users as run_import
+
+    batch_size = batch_size or app.config['IMPORT_BATCH_SIZE']
+    with io.open(path, encoding='utf-8-sig', newline='') as csv_file:
+        report = run_import(csv_file, batch_size)
+    for error in report.errors:
+        print('row {row}: {email}: {message}'.format(**error))
+    print('{} user(s) created, {} row(s) rejected'.format(
+        report.created, len(report.errors)))
+
+
+@manager.option('-c', '--catering', dest='catering_id', type=int, required=True)
+@manager.option('-f', '--format', dest='export_format', default='ndjson',
+                choices=('ndjson', 'csv'))
+@manager.option('--from', dest='start', help='First day, YYYY-MM-DD')
+@manager.option('--to', dest='end', help='Last day, YYYY-MM-DD')
+@manager.option('-m', '--menu', dest='menu_id', type=int, default=None)
+@manager.option('-o', '--output', dest='path', help='File to write, stdout by default')
+def export_orders(catering_id, export_format='ndjson', start=None, end=None,
+                  menu_id=None, path=None):
+    """
+     Stream a catering's orders, oldest first, as NDJSON or CSV.
+    """
+    import datetime
+    import io
+    import sys
+    from app.order_export import export_orders as run_export
+
+    def day(value):
+        return value and datetime.datetime.strptime(value, '%Y-%m-%d').date()
+
+    lines = run_export(catering_id, export_format, start=day(start),
+                       end=day(end), menu_id=menu_id)[1]
+    output = io.open(path, 'w', encoding='utf-8', newline='') if path \
+        else sys.stdout
+    try:
+        output.writelines(lines)
+    finally:
+        if path:
+            output.close()
+
+
+@manager.command
+def rebuild_rollups():
+    """
+     Recompute the daily sales rollups from orders.
+    """
+    from app.rollups import rebuild
+
+    rebuild()
+    print('sales rollups rebuilt')
+
+
+@manager.option('-b', '--batch-size', dest='batch_size', type=int, default=None)
+def lock_expired_orders(batch_size=None):
+    """
+     Lock pending orders whose window to change them has passed.
+    """
+    from app.order_expiry import lock_expired
+
+    locked = lock_expired(batch_size or app.config['ORDER_SWEEP_BATCH_SIZE'])
+    print('{} expired order(s) locked'.format(locked))
+
+
+@manager.command
+def purge_idempotency_keys():
+    """
+     Delete idempotency keys whose stored responses have expired.
+    """
+    from app.models import IdempotencyKey
+
+    purged = IdempotencyKey.purge_expired()
+    db.session.commit()
+    print('{} expired idempotency key(s) deleted'.format(purged))
+
+
 if __name__ == '__main__':
     manager.run()
@@ -0,0 +1,50 @@
+"""add indexes on foreign keys and hot filter columns
+
+Revision ID: 2c1b9e5dc281
+Revises: 8685d430b295
+Create Date: 2026-10-18 11:40:17.268310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c1b9e5dc281'
+down_revision = '8685d430b295'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_meals_catering_id_created_at', 'meals',
+                    ['catering_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_menus_date', 'menus', ['date'], unique=False)
+    op.create_index('ix_menus_catering_id_date', 'menus',
+                    ['catering_id', 'date'], unique=False)
+    op.create_index('ix_menus_catering_id_created_at', 'menus',
+                    ['catering_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_orders_menu_id', 'orders', ['menu_id'], unique=False)
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'],
+                    unique=False)
+    op.create_index('ix_orders_customer_id_created_at', 'orders',
+                    ['customer_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_orders_catering_id_created_at', 'orders',
+                    ['catering_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_menu_meals_meal_id', 'menu_meals', ['meal_id'],
+                    unique=False)
+    op.create_index('ix_order_meals_meal_id', 'order_meals', ['meal_id'],
+                    unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_order_meals_meal_id', table_name='order_meals')
+    op.drop_index('ix_menu_meals_meal_id', table_name='menu_meals')
+    op.drop_index('ix_orders_catering_id_created_at', table_name='orders')
+    op.drop_index('ix_orders_customer_id_created_at', table_name='orders')
+    op.drop_index('ix_orders_created_at', table_name='orders')
+    op.drop_index('ix_orders_menu_id', table_name='orders')
+    op.drop_index('ix_menus_catering_id_created_at', table_name='menus')
+    op.drop_index('ix_menus_catering_id_date', table_name='menus')
+    op.drop_index('ix_menus_date', table_name='menus')
+    op.drop_index('ix_meals_catering_id_created_at', table_name='meals')
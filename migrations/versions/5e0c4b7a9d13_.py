@@ -0,0 +1,42 @@
+"""add meal capacities
+
+Revision ID: 5e0c4b7a9d13
+Revises: 2c1b9e5dc281
+Create Date: 2026-10-18 14:05:52.731904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e0c4b7a9d13'
+down_revision = '2c1b9e5dc281'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('menu_meals', sa.Column('capacity', sa.Integer(),
+                                          nullable=True))
+    op.create_table('meal_capacities',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('menu_id', sa.Integer(), nullable=False),
+    sa.Column('meal_id', sa.Integer(), nullable=False),
+    sa.Column('slot', sa.Integer(), nullable=False),
+    sa.Column('remaining', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['meal_id'], ['meals.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['menu_id'], ['menus.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_meal_capacities_menu_id_meal_id_slot',
+                    'meal_capacities', ['menu_id', 'meal_id', 'slot'],
+                    unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_meal_capacities_menu_id_meal_id_slot',
+                  table_name='meal_capacities')
+    op.drop_table('meal_capacities')
+    op.drop_column('menu_meals', 'capacity')
@@ -0,0 +1,25 @@
+"""add unique index on lower(users.email)
+
+Revision ID: 8685d430b295
+Revises: 3be9e5c12101
+Create Date: 2026-10-18 09:12:41.502113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8685d430b295'
+down_revision = '3be9e5c12101'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_email_lower', 'users',
+                    [sa.text('lower(email)')], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_users_email_lower', table_name='users')
@@ -0,0 +1,43 @@
+"""add idempotency keys
+
+Revision ID: a41f7c2e8b60
+Revises: 5e0c4b7a9d13
+Create Date: 2026-10-18 15:21:08.118452
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41f7c2e8b60'
+down_revision = '5e0c4b7a9d13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('idempotency_keys',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('key', sa.String(length=128), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('request_hash', sa.String(length=64), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=True),
+    sa.Column('response', sa.Text(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_idempotency_keys_customer_id_key', 'idempotency_keys',
+                    ['customer_id', 'key'], unique=True)
+    op.create_index('ix_idempotency_keys_expires_at', 'idempotency_keys',
+                    ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_idempotency_keys_expires_at',
+                  table_name='idempotency_keys')
+    op.drop_index('ix_idempotency_keys_customer_id_key',
+                  table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
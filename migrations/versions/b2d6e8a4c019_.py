@@ -0,0 +1,51 @@
+"""split sales rollups into slots
+
+Revision ID: b2d6e8a4c019
+Revises: f5b8d1c3a927
+Create Date: 2026-10-18 21:40:26.318047
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d6e8a4c019'
+down_revision = 'f5b8d1c3a927'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('daily_sales', sa.Column('slot', sa.Integer(),
+                                           server_default='0',
+                                           nullable=False))
+    op.drop_index('ix_daily_sales_catering_id_day', table_name='daily_sales')
+    op.create_index('ix_daily_sales_catering_id_day_slot', 'daily_sales',
+                    ['catering_id', 'day', 'slot'], unique=True)
+    op.add_column('daily_meal_sales', sa.Column('slot', sa.Integer(),
+                                                server_default='0',
+                                                nullable=False))
+    op.drop_index('ix_daily_meal_sales_catering_id_day_meal_id',
+                  table_name='daily_meal_sales')
+    op.create_index('ix_daily_meal_sales_catering_id_day_meal_id_slot',
+                    'daily_meal_sales',
+                    ['catering_id', 'day', 'meal_id', 'slot'], unique=True)
+
+
+def downgrade():
+    # the slots of a day must be folded into one row before slot goes,
+    # run manage.py rebuild_rollups after downgrading
+    op.execute('DELETE FROM daily_meal_sales WHERE slot <> 0')
+    op.execute('DELETE FROM daily_sales WHERE slot <> 0')
+    op.drop_index('ix_daily_meal_sales_catering_id_day_meal_id_slot',
+                  table_name='daily_meal_sales')
+    op.create_index('ix_daily_meal_sales_catering_id_day_meal_id',
+                    'daily_meal_sales', ['catering_id', 'day', 'meal_id'],
+                    unique=True)
+    op.drop_column('daily_meal_sales', 'slot')
+    op.drop_index('ix_daily_sales_catering_id_day_slot',
+                  table_name='daily_sales')
+    op.create_index('ix_daily_sales_catering_id_day', 'daily_sales',
+                    ['catering_id', 'day'], unique=True)
+    op.drop_column('daily_sales', 'slot')
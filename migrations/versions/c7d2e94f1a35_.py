@@ -0,0 +1,54 @@
+"""add daily sales rollups
+
+Revision ID: c7d2e94f1a35
+Revises: a41f7c2e8b60
+Create Date: 2026-10-18 16:02:44.390517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d2e94f1a35'
+down_revision = 'a41f7c2e8b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_sales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('catering_id', sa.Integer(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['catering_id'], ['caterings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_daily_sales_catering_id_day', 'daily_sales',
+                    ['catering_id', 'day'], unique=True)
+    op.create_table('daily_meal_sales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('catering_id', sa.Integer(), nullable=False),
+    sa.Column('meal_id', sa.Integer(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('portions', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['catering_id'], ['caterings.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['meal_id'], ['meals.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_daily_meal_sales_catering_id_day_meal_id',
+                    'daily_meal_sales', ['catering_id', 'day', 'meal_id'],
+                    unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_daily_meal_sales_catering_id_day_meal_id',
+                  table_name='daily_meal_sales')
+    op.drop_table('daily_meal_sales')
+    op.drop_index('ix_daily_sales_catering_id_day', table_name='daily_sales')
+    op.drop_table('daily_sales')
@@ -0,0 +1,37 @@
+"""add meal reservations
+
+Revision ID: d9a4c6e2f718
+Revises: b2d6e8a4c019
+Create Date: 2026-10-19 09:12:44.905318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a4c6e2f718'
+down_revision = 'b2d6e8a4c019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('meal_reservations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('meal_id', sa.Integer(), nullable=False),
+    sa.Column('portions', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['meal_id'], ['meals.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_meal_reservations_order_id', 'meal_reservations',
+                    ['order_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_meal_reservations_order_id',
+                  table_name='meal_reservations')
+    op.drop_table('meal_reservations')
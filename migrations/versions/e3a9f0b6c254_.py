@@ -0,0 +1,29 @@
+"""add order status
+
+Revision ID: e3a9f0b6c254
+Revises: c7d2e94f1a35
+Create Date: 2026-10-18 17:10:37.604213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a9f0b6c254'
+down_revision = 'c7d2e94f1a35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('orders', sa.Column('status', sa.String(length=16),
+                                      server_default='pending',
+                                      nullable=False))
+    op.create_index('ix_orders_status_expires_at', 'orders',
+                    ['status', 'expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_orders_status_expires_at', table_name='orders')
+    op.drop_column('orders', 'status')
@@ -0,0 +1,34 @@
+"""add cache versions
+
+Revision ID: f5b8d1c3a927
+Revises: e3a9f0b6c254
+Create Date: 2026-10-18 19:02:11.480316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5b8d1c3a927'
+down_revision = 'e3a9f0b6c254'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('scope', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_cache_versions_scope', 'cache_versions', ['scope'],
+                    unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_cache_versions_scope', table_name='cache_versions')
+    op.drop_table('cache_versions')
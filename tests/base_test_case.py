@@ -1,9 +1,11 @@
 """
 This module is the base test case for allm test cases.
 """
+import contextlib
 import json
 import unittest
-from app import create_application, db
+from sqlalchemy import event
+from app import create_application, db, query_stats
 from app.models import User, Meal, Role, Catering
 
 
@@ -66,13 +68,15 @@ class ApiTestCase(unittest.TestCase):
         """
         logins an admin test user
         """
-        # use test admin_user
-        role = Role.query.filter_by(name='Admin').first()
-        u = User(name='admin', email=email,
-                 password='admin', role=role)
-        u.save()
-        business = Catering(name='biz', address='kla', admin=u)
-        business.save()
+        # use test admin_user, emails are unique so reuse an existing one
+        u = User.find_by_email(email)
+        if u is None:
+            role = Role.query.filter_by(name='Admin').first()
+            u = User(name='admin', email=email,
+                     password='admin', role=role)
+            u.save()
+            business = Catering(name='biz', address='kla', admin=u)
+            business.save()
         response = self.make_post_request(
             '/api/v1/auth/login', {'email': email,
                                    'password': 'admin'})
@@ -87,9 +91,11 @@ class ApiTestCase(unittest.TestCase):
         """
         logins a test user
         """
-        user = User(name='test', email=email, password='test')
-        db.session.add(user)
-        db.session.commit()
+        user = User.find_by_email(email)
+        if user is None:
+            user = User(name='test', email=email, password='test')
+            db.session.add(user)
+            db.session.commit()
         response = self.make_post_request(
             '/api/v1/auth/login', {'email': email,
                                    'password': 'test'})
@@ -141,6 +147,32 @@ class ApiTestCase(unittest.TestCase):
         res_data = self.get_response_data(res)
         return res_data['id']
 
+    @contextlib.contextmanager
+    def count_commits(self):
+        """
+        counts transactions committed within the block
+        """
+        commits = []
+
+        def on_commit(session):
+            commits.append(session)
+        event.listen(db.session, 'after_commit', on_commit)
+        try:
+            yield commits
+        finally:
+            event.remove(db.session, 'after_commit', on_commit)
+
+    @contextlib.contextmanager
+    def assertMaxQueries(self, maximum):
+        """
+        fails when the block executes more than maximum SQL statements
+        """
+        with query_stats.collect() as stats:
+            yield stats
+        if stats.count > maximum:
+            self.fail('{} queries executed, expected at most {}:\n{}'.format(
+                stats.count, maximum, '\n'.join(stats.statements)))
+
     def get_response_data(self, response):
         """
         gets request response json data
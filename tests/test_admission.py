@@ -0,0 +1,101 @@
+"""
+This module contains tests for admission control.
+"""
+import threading
+import time
+import unittest
+from tests.base_test_case import ApiTestCase
+from app.admission import (AdmissionClass, AdmissionController, Overloaded,
+                           get_controller)
+from app.metrics import Counters
+
+
+class AdmissionControllerTestCase(unittest.TestCase):
+    """
+    Tests for admitting, queueing and shedding requests
+    """
+
+    def setUp(self):
+        self.counters = Counters()
+        self.controller = AdmissionController([
+            AdmissionClass('read', 2, 1),
+            AdmissionClass('bulk', 1, 0, yield_to=('read',))
+        ], queue_timeout=0.5, counters=self.counters)
+
+    def test_requests_within_limit_are_admitted(self):
+        self.controller.acquire('read')
+        self.controller.acquire('read')
+        self.assertEqual(self.counters.get('read_admitted'), 2)
+
+    def test_request_over_full_queue_is_shed(self):
+        self.controller.acquire('bulk')
+        with self.assertRaises(Overloaded):
+            self.controller.acquire('bulk')
+        self.assertEqual(self.counters.get('bulk_shed'), 1)
+
+    def test_queued_request_is_admitted_on_release(self):
+        self.controller.acquire('read')
+        self.controller.acquire('read')
+        threading.Timer(0.05, self.controller.release, ('read',)).start()
+        self.controller.acquire('read')
+        self.assertEqual(self.counters.get('read_queued'), 1)
+        self.assertEqual(self.counters.get('read_admitted'), 3)
+
+    def test_queued_request_is_shed_after_timeout(self):
+        self.controller.queue_timeout = 0.05
+        self.controller.acquire('read')
+        self.controller.acquire('read')
+        started = time.time()
+        with self.assertRaises(Overloaded):
+            self.controller.acquire('read')
+        self.assertLess(time.time() - started, 0.5)
+        self.assertEqual(self.counters.get('read_shed'), 1)
+
+    def test_bulk_yields_to_waiting_reads(self):
+        self.controller.acquire('read')
+        self.controller.acquire('read')
+        waiter = threading.Thread(target=self.controller.acquire,
+                                  args=('read',))
+        waiter.start()
+        while not self.controller.classes['read'].waiting:
+            time.sleep(0.001)
+        with self.assertRaises(Overloaded):
+            self.controller.acquire('bulk')
+        self.controller.release('read')
+        waiter.join()
+        self.controller.acquire('bulk')
+        self.assertEqual(self.counters.get('bulk_shed'), 1)
+
+
+class AdmissionApiTestCase(ApiTestCase):
+    """
+    Tests shedding API requests
+    """
+
+    def setUp(self):
+        super(AdmissionApiTestCase, self).setUp()
+        self.customer_token = self.login_test_user('admit@test.com')[0]
+        self.controller = get_controller()
+
+    def post_order(self):
+        return self.make_post_request(self.orders_endpoint, {
+            'meals': [1], 'orderCount': 1, 'menuId': 1
+        }, headers={'Authorization': self.customer_token})
+
+    def test_saturated_writes_are_shed_with_retry_after(self):
+        writes = self.controller.classes['write']
+        writes.active, writes.max_queue = writes.limit, 0
+        res = self.post_order()
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.headers['Retry-After'], '1')
+        # reads keep their own slots
+        res = self.client().get(self.menu_endpoint)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.controller.counters.get('write_shed'), 1)
+
+    def test_slots_are_released_after_request(self):
+        self.post_order()
+        self.client().get(self.menu_endpoint)
+        self.assertEqual(self.controller.classes['write'].active, 0)
+        self.assertEqual(self.controller.classes['read'].active, 0)
+        self.assertEqual(self.controller.counters.get('write_admitted'), 2)
@@ -1,5 +1,9 @@
+import threading
+from flask import current_app
 from itsdangerous import TimedJSONWebSignatureSerializer as Serializer
+from werkzeug.security import generate_password_hash
 from tests.base_test_case import ApiTestCase
+from app.hashing import HashingPool, HashingPoolSaturated
 from app.models import User
 
 
@@ -82,6 +86,22 @@ class AuthenticationTestCase(ApiTestCase):
         self.assertEqual(res.status_code, 201)
         self.assertEqual('biz@gmail.com', data['user']['email'])
 
+    def test_cannot_register_with_email_in_use(self):
+        self.make_post_request('/api/v1/auth/signup', self.test_user)
+        self.test_user['email'] = self.test_user['email'].upper()
+        res = self.make_post_request('/api/v1/auth/signup', self.test_user)
+        self.assertEqual(res.status_code, 400)
+        data = self.get_response_data(res)
+        self.assertEqual('Email already in use', data['errors']['email'])
+
+    def test_login_email_is_case_insensitive(self):
+        user = User(name='solo', email='Solo4@yahoo.com', password='test')
+        user.save()
+        res = self.make_post_request(
+            '/api/v1/auth/login', {'email': 'solo4@YAHOO.com',
+                                   'password': 'test'})
+        self.assertEqual(res.status_code, 200)
+
     def test_cannot_register_with_invalid_email(self):
         res = self.make_post_request('/api/v1/auth/signup', data={
             'email': 'sdosdoso',
@@ -91,3 +111,52 @@ class AuthenticationTestCase(ApiTestCase):
         self.assertEqual(res.status_code, 400)
         data = self.get_response_data(res)
         self.assertIn('errors', data)
+
+    def test_login_upgrades_outdated_password_hash(self):
+        user = User(name='solo', email='solo2@yahoo.com', password='test')
+        user.password_hash = generate_password_hash('test', 'pbkdf2:sha256:10')
+        user.save()
+        res = self.make_post_request(
+            '/api/v1/auth/login', {'email': 'solo2@yahoo.com',
+                                   'password': 'test'})
+        self.assertEqual(res.status_code, 200)
+        user = User.query.get(user.id)
+        self.assertTrue(user.password_hash.startswith(
+            current_app.config['PASSWORD_HASH_METHOD'] + '$'))
+        self.assertTrue(user.verify_password('test'))
+
+    def test_login_fails_fast_when_hashing_pool_is_saturated(self):
+        user = User(name='solo', email='solo3@yahoo.com', password='test')
+        user.save()
+        pool = HashingPool(1, 1)
+        current_app.extensions['hashing_pool'] = pool
+        started, release = threading.Event(), threading.Event()
+
+        def hold():
+            started.set()
+            release.wait()
+        blocker = threading.Thread(target=pool.run, args=(hold,))
+        blocker.start()
+        started.wait()
+        try:
+            res = self.make_post_request(
+                '/api/v1/auth/login', {'email': 'solo3@yahoo.com',
+                                       'password': 'test'})
+        finally:
+            release.set()
+            blocker.join()
+            pool.shutdown()
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.headers['Retry-After'], '1')
+
+    def test_hashing_timeout_is_reported_as_saturation(self):
+        pool = HashingPool(1, 2, timeout=0.05)
+        release = threading.Event()
+        try:
+            with self.assertRaises(HashingPoolSaturated):
+                pool.run(release.wait)
+            with self.assertRaises(HashingPoolSaturated):
+                pool.map(release.wait, [()])
+        finally:
+            release.set()
+            pool.shutdown()
@@ -0,0 +1,64 @@
+"""
+This module contains tests for bulk user onboarding.
+"""
+import io
+from tests.base_test_case import ApiTestCase
+from app.bulk_import import import_users
+from app.models import User
+
+CSV_DATA = """name,email,password
+Jane Doe,jane@corp.com,secret1
+John Doe,john@corp.com,secret2
+No Password,nopass@corp.com,
+Bad Email,not-an-email,secret3
+Jane Again,JANE@corp.com,secret4
+Existing,existing@corp.com,secret5
+"""
+
+
+class BulkImportTestCase(ApiTestCase):
+    """
+    Tests for importing users from CSV
+    """
+
+    def setUp(self):
+        super(BulkImportTestCase, self).setUp()
+        self.admin_token = self.login_admin('import@admin.com')[0]
+        User(name='existing', email='existing@corp.com', password='x').save()
+
+    def post_csv(self, token, data):
+        return self.client().post('/api/v1/users/import', data=data,
+                                  headers={'Authorization': token,
+                                           'Content-Type': 'text/csv'})
+
+    def test_import_reports_rejected_rows(self):
+        report = import_users(io.StringIO(CSV_DATA), batch_size=2)
+        self.assertEqual(report.created, 2)
+        errors = {error['row']: error['message'] for error in report.errors}
+        self.assertEqual(errors, {
+            4: 'password field is required',
+            5: 'Email is not valid',
+            6: 'Duplicate email in file',
+            7: 'Email already in use'
+        })
+        user = User.find_by_email('john@corp.com')
+        self.assertTrue(user.verify_password('secret2'))
+        self.assertFalse(user.is_administrator())
+
+    def test_import_requires_columns(self):
+        report = import_users(io.StringIO('name,email\na,a@b.com\n'))
+        self.assertEqual(report.created, 0)
+        self.assertEqual(report.errors[0]['message'],
+                         'Missing column(s): password')
+
+    def test_admin_can_import_users(self):
+        res = self.post_csv(self.admin_token, CSV_DATA)
+        self.assertEqual(res.status_code, 200)
+        data = self.get_response_data(res)
+        self.assertEqual(data['created'], 2)
+        self.assertEqual(data['failed'], 4)
+
+    def test_customer_cannot_import_users(self):
+        token = self.login_test_user('import@customer.com')[0]
+        res = self.post_csv(token, CSV_DATA)
+        self.assertEqual(res.status_code, 403)
@@ -0,0 +1,244 @@
+"""
+This module contains tests for the portion capacity of meals on a menu.
+"""
+import datetime
+import json
+import threading
+from sqlalchemy.engine.url import make_url
+from config import TestingConfig
+from tests.base_test_case import ApiTestCase
+from app import db
+from app.models import Menu, MealCapacity, Order
+
+
+class MenuCapacityTestCase(ApiTestCase):
+    """
+    Base class for tests on a menu with a capped meal
+    """
+
+    def setUp(self):
+        super(MenuCapacityTestCase, self).setUp()
+        self.admin_token, self.admin = self.login_admin('capacity@admin.com')
+        self.customer_token = self.login_test_user('capacity@test.com')[0]
+        self.meal = self.add_test_meal(self.admin)
+        self.menu = Menu(title='today', description='lorem',
+                         menu_date=str(datetime.datetime.now().date()),
+                         meals=[self.meal], catering=self.admin.catering)
+        self.menu.save()
+        self.capacity_endpoint = '/api/v1/menu/{}/capacity'.format(
+            self.menu.id)
+
+    def set_capacity(self, portions):
+        item = {'mealId': self.meal.id}
+        if portions is not None:
+            item['portions'] = portions
+        return self.modify_resource(self.capacity_endpoint, self.admin_token,
+                                    {'capacity': [item]})
+
+    def order(self, count):
+        return self.make_post_request(self.orders_endpoint, {
+            'meals': [self.meal.id], 'orderCount': count,
+            'menuId': self.menu.id
+        }, headers={'Authorization': self.customer_token})
+
+    def cancel(self, order_id):
+        return self.client().delete(
+            self.orders_endpoint + '/{}'.format(order_id),
+            headers={'Authorization': self.customer_token})
+
+    def modify_order(self, order_id, count):
+        return self.modify_resource(
+            self.orders_endpoint + '/{}'.format(order_id),
+            self.customer_token, {'meals': [self.meal.id],
+                                  'orderCount': count})
+
+    def remaining(self):
+        res = self.client().get(self.capacity_endpoint, headers={
+            'Authorization': self.customer_token})
+        return self.get_response_data(res)['remaining']
+
+
+class CapacityTestCase(MenuCapacityTestCase):
+    """
+    Tests for setting and taking meal portions
+    """
+
+    def test_capacity_is_split_over_slots(self):
+        res = self.set_capacity(10)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.get_response_data(res)['remaining'],
+                         {str(self.meal.id): 10})
+        slots = MealCapacity.query.filter_by(menu_id=self.menu.id).all()
+        self.assertEqual(len(slots), self.app.config['MENU_CAPACITY_SLOTS'])
+        self.assertEqual(sorted(slot.remaining for slot in slots),
+                         [2, 2, 3, 3])
+
+    def test_order_takes_portions(self):
+        self.set_capacity(5)
+        res = self.order(2)
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(self.remaining(), {str(self.meal.id): 3})
+
+    def test_order_takes_portions_of_several_slots(self):
+        self.set_capacity(4)
+        res = self.order(3)
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(self.remaining(), {str(self.meal.id): 1})
+
+    def test_cannot_order_more_than_left(self):
+        self.set_capacity(1)
+        res = self.order(2)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(
+            'Not enough portions left of meal with id: {}'.format(self.meal.id),
+            self.get_response_data(res)['message'])
+        self.assertEqual(self.remaining(), {str(self.meal.id): 1})
+        self.assertEqual(Order.query.count(), 0)
+
+    def test_cancelled_order_gives_portions_back(self):
+        self.set_capacity(4)
+        order_id = self.get_response_data(self.order(3))['order']['id']
+        res = self.client().delete(
+            self.orders_endpoint + '/{}'.format(order_id),
+            headers={'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.remaining(), {str(self.meal.id): 4})
+
+    def test_modified_order_takes_difference(self):
+        self.set_capacity(4)
+        order_id = self.get_response_data(self.order(3))['order']['id']
+        res = self.modify_order(order_id, 4)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.remaining(), {str(self.meal.id): 0})
+        res = self.modify_order(order_id, 1)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.remaining(), {str(self.meal.id): 3})
+
+    def test_cannot_modify_order_past_capacity(self):
+        self.set_capacity(4)
+        order_id = self.get_response_data(self.order(3))['order']['id']
+        res = self.modify_order(order_id, 5)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(
+            'Not enough portions left of meal with id: {}'.format(self.meal.id),
+            self.get_response_data(res)['message'])
+        self.assertEqual(self.remaining(), {str(self.meal.id): 1})
+        self.assertEqual(Order.query.get(order_id).order_count, 3)
+
+    def test_new_capacity_keeps_ordered_portions(self):
+        self.set_capacity(10)
+        self.order(3)
+        res = self.set_capacity(5)
+        self.assertEqual(self.get_response_data(res)['remaining'],
+                         {str(self.meal.id): 2})
+        res = self.set_capacity(2)
+        self.assertEqual(self.get_response_data(res)['remaining'],
+                         {str(self.meal.id): 0})
+        self.assertEqual(self.order(1).status_code, 400)
+
+    def test_meal_taken_off_menu_loses_capacity(self):
+        meal = self.add_test_meal(self.admin)
+        self.set_capacity(5)
+        res = self.modify_resource(
+            '/api/v1/menu/{}'.format(self.menu.id), self.admin_token,
+            {'meals': [meal.id]})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(MealCapacity.query.filter_by(
+            menu_id=self.menu.id).count(), 0)
+
+    def test_order_placed_before_cap_gives_nothing_back(self):
+        order_id = self.get_response_data(self.order(3))['order']['id']
+        self.set_capacity(10)
+        self.assertEqual(self.cancel(order_id).status_code, 200)
+        self.assertEqual(self.remaining(), {str(self.meal.id): 10})
+
+    def test_cancel_never_raises_portions_above_cap(self):
+        self.set_capacity(10)
+        order_id = self.get_response_data(self.order(8))['order']['id']
+        self.set_capacity(5)
+        self.assertEqual(self.remaining(), {str(self.meal.id): 0})
+        self.assertEqual(self.cancel(order_id).status_code, 200)
+        self.assertEqual(self.remaining(), {str(self.meal.id): 5})
+
+    def test_modify_after_lowered_cap_never_oversells(self):
+        self.set_capacity(10)
+        order_id = self.get_response_data(self.order(8))['order']['id']
+        self.set_capacity(5)
+        res = self.modify_order(order_id, 2)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.remaining(), {str(self.meal.id): 3})
+
+    def test_uncapped_meal_is_unlimited(self):
+        self.set_capacity(1)
+        self.set_capacity(None)
+        res = self.order(5)
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(self.remaining(), {})
+
+    def test_capacity_of_meal_not_on_menu(self):
+        meal = self.add_test_meal(self.admin)
+        res = self.modify_resource(self.capacity_endpoint, self.admin_token, {
+            'capacity': [{'mealId': meal.id, 'portions': 3}]})
+        self.assertEqual(res.status_code, 400)
+
+    def test_menu_shows_remaining_portions(self):
+        self.set_capacity(5)
+        data = self.get_response_data(self.client().get(self.menu_endpoint))
+        self.assertEqual(data['remaining'],
+                         {str(self.menu.id): {str(self.meal.id): 5}})
+        self.order(1)
+        # the snapshot is reused, the portions are read fresh
+        data = self.get_response_data(self.client().get(self.menu_endpoint))
+        self.assertEqual(data['remaining'],
+                         {str(self.menu.id): {str(self.meal.id): 4}})
+        counters = self.app.extensions['metrics']['menu_snapshot']
+        self.assertEqual(counters.get('hits'), 1)
+
+
+class ConcurrentCapacityTestCase(MenuCapacityTestCase):
+    """
+    Tests parallel orders never take more portions than offered
+    """
+
+    def setUp(self):
+        if make_url(TestingConfig.SQLALCHEMY_DATABASE_URI).database in (
+                None, '', ':memory:'):
+            # threads would each get their own empty in-memory database
+            self.skipTest('parallel orders need a shared database')
+        super(ConcurrentCapacityTestCase, self).setUp()
+
+    def test_parallel_orders_never_oversell(self):
+        self.set_capacity(100)
+        # warm the principal cache before the rush
+        self.remaining()
+        body = json.dumps({'meals': [self.meal.id], 'orderCount': 1,
+                           'menuId': self.menu.id})
+        lock = threading.Lock()
+        remaining = [500]
+        statuses = []
+
+        def worker():
+            client = self.app.test_client()
+            while True:
+                with lock:
+                    if not remaining[0]:
+                        return
+                    remaining[0] -= 1
+                res = client.post(self.orders_endpoint, data=body, headers={
+                    'Authorization': self.customer_token,
+                    'Content-Type': 'application/json'})
+                with lock:
+                    statuses.append(res.status_code)
+
+        threads = [threading.Thread(target=worker) for _ in range(25)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        db.session.remove()
+        self.assertEqual(statuses.count(201), 100)
+        # sqlite takes one writer at a time, so admission control may shed
+        # some of the rush instead of letting it queue on the file lock
+        self.assertEqual(statuses.count(400) + statuses.count(503), 400)
+        self.assertEqual(Order.query.count(), 100)
+        self.assertEqual(self.remaining(), {str(self.meal.id): 0})
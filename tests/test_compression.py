@@ -0,0 +1,92 @@
+"""
+This module contains tests for the compression of responses.
+"""
+import gzip
+import unittest
+from flask import current_app
+from tests.base_test_case import ApiTestCase
+from app.compression import available_encodings
+from app.models import Meal, Menu, Order
+
+
+class CompressionTestCase(ApiTestCase):
+    """
+    Tests for compressing responses negotiated with Accept-Encoding
+    """
+
+    def setUp(self):
+        super(CompressionTestCase, self).setUp()
+        self.admin_token, self.admin = self.login_admin('gzip@admin.com')
+        self.customer = self.login_test_user('gzip@test.com')[1]
+        catering = self.admin.catering
+        self.meals = [Meal(title='meal {}'.format(i), price=1000,
+                           description='lorem ipsum', catering=catering)
+                      for i in range(30)]
+        self.menu = Menu(title='lunch', menu_date='2018-04-26',
+                         meals=self.meals, catering=catering)
+        self.menu.save()
+        self.counters = current_app.extensions['metrics']['compression']
+
+    def get(self, endpoint, encoding=None, **headers):
+        headers['Authorization'] = self.admin_token
+        if encoding is not None:
+            headers['Accept-Encoding'] = encoding
+        res = self.client().get(endpoint, headers=headers)
+        self.assertIn(res.status_code, (200, 304))
+        return res
+
+    def test_large_response_is_gzipped(self):
+        plain = self.get(self.meals_endpoint)
+        res = self.get(self.meals_endpoint, 'gzip, deflate')
+        self.assertEqual(res.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', res.headers['Vary'])
+        body = gzip.decompress(res.get_data())
+        self.assertEqual(body, plain.get_data())
+        self.assertEqual(int(res.headers['Content-Length']),
+                         len(res.get_data()))
+        endpoint = 'api.meals_resource'
+        self.assertEqual(self.counters.get(endpoint + '.responses'), 1)
+        self.assertEqual(self.counters.get(endpoint + '.bytes_in'), len(body))
+        self.assertEqual(self.counters.get(endpoint + '.bytes_saved'),
+                         len(body) - len(res.get_data()))
+
+    def test_small_response_is_sent_as_is(self):
+        res = self.get('/api/v1/meals/{}'.format(self.meals[0].id), 'gzip')
+        self.assertNotIn('Content-Encoding', res.headers)
+        self.assertIn('Accept-Encoding', res.headers['Vary'])
+        self.assertEqual(self.counters.get(
+            'api.meal_resource.below_min_size'), 1)
+
+    def test_refused_encoding_is_not_used(self):
+        for encoding in (None, 'identity', 'gzip;q=0'):
+            res = self.get(self.meals_endpoint, encoding)
+            self.assertNotIn('Content-Encoding', res.headers)
+
+    def test_stream_is_gzipped(self):
+        for _ in range(50):
+            Order(total_cost=1000, meals=self.meals[:2],
+                  customer=self.customer, catering=self.admin.catering,
+                  menu=self.menu).save()
+        plain = self.get('/api/v1/orders/export').get_data()
+        res = self.get('/api/v1/orders/export', 'gzip')
+        self.assertTrue(res.is_streamed)
+        self.assertEqual(res.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', res.headers)
+        self.assertEqual(gzip.decompress(res.get_data()), plain)
+        self.assertGreater(self.counters.get(
+            'api.order_export_resource.bytes_saved'), 0)
+
+    def test_compressed_tag_revalidates(self):
+        res = self.get(self.meals_endpoint, 'gzip')
+        etag = res.headers['ETag']
+        self.assertTrue(etag.endswith('-gzip"'))
+        res = self.get(self.meals_endpoint, 'gzip', **{'If-None-Match': etag})
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.headers['ETag'], etag)
+
+    @unittest.skipUnless('br' in available_encodings(
+        {'COMPRESSION_BROTLI_QUALITY': 5, 'COMPRESSION_GZIP_LEVEL': 6}),
+        'brotli is not installed')
+    def test_brotli_is_preferred(self):
+        res = self.get(self.meals_endpoint, 'gzip, br')
+        self.assertEqual(res.headers['Content-Encoding'], 'br')
@@ -0,0 +1,125 @@
+"""
+This module contains tests for conditional GETs of catalog endpoints.
+"""
+import datetime
+from tests.base_test_case import ApiTestCase
+from app import cache_versions
+from app.models import Menu
+
+
+class ConditionalGetTestCase(ApiTestCase):
+    """
+    Tests for ETags made from cache versions
+    """
+
+    def setUp(self):
+        super(ConditionalGetTestCase, self).setUp()
+        self.admin_token, self.admin = self.login_admin('etag@admin.com')
+        self.customer_token = self.login_test_user('etag@test.com')[0]
+        self.meal = self.add_test_meal(self.admin)
+        self.today = datetime.datetime.now().date()
+        self.menu = Menu(title='today', menu_date=str(self.today),
+                         meals=[self.meal], catering=self.admin.catering)
+        self.menu.save()
+
+    def get(self, endpoint, token=None, **headers):
+        if token is not None:
+            headers['Authorization'] = token
+        return self.client().get(endpoint, headers=headers)
+
+    def revalidate(self, endpoint, token=None):
+        res = self.get(endpoint, token)
+        self.assertEqual(res.status_code, 200)
+        etag = res.headers['ETag']
+        return etag, self.get(endpoint, token, **{'If-None-Match': etag})
+
+    def test_unchanged_list_is_not_modified(self):
+        etag, res = self.revalidate(self.meals_endpoint, self.admin_token)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.get_data(), b'')
+        self.assertEqual(res.headers['ETag'], etag)
+        self.assertEqual(res.headers['Cache-Control'], 'private, no-cache')
+
+    def test_not_modified_reads_only_versions(self):
+        etag = self.get(self.menu_endpoint).headers['ETag']
+        with self.assertMaxQueries(1):
+            res = self.get(self.menu_endpoint, **{'If-None-Match': etag})
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.headers['Cache-Control'], 'public, max-age=5')
+
+    def test_saved_meal_changes_tags(self):
+        tags = [self.get(endpoint, token).headers['ETag']
+                for endpoint, token in (
+                    (self.meals_endpoint, self.admin_token),
+                    (self.get_menus_endpoint, self.admin_token),
+                    (self.menu_endpoint, None),
+                    ('/api/v1/menu/{}'.format(self.menu.id),
+                     self.customer_token))]
+        res = self.modify_resource('/api/v1/meals/{}'.format(self.meal.id),
+                                   self.admin_token, {'price': 2000})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.get(self.meals_endpoint, self.admin_token, **{
+            'If-None-Match': tags[0]}).status_code, 200)
+        self.assertEqual(self.get(self.get_menus_endpoint, self.admin_token,
+                                  **{'If-None-Match': tags[1]}).status_code,
+                         200)
+        self.assertEqual(self.get(self.menu_endpoint, **{
+            'If-None-Match': tags[2]}).status_code, 200)
+        self.assertEqual(self.get(
+            '/api/v1/menu/{}'.format(self.menu.id), self.customer_token,
+            **{'If-None-Match': tags[3]}).status_code, 200)
+
+    def test_other_catering_keeps_tag(self):
+        token, other = self.login_admin('other@admin.com')
+        etag = self.get(self.meals_endpoint, self.admin_token).headers['ETag']
+        self.add_test_meal(other)
+        res = self.get(self.meals_endpoint, self.admin_token,
+                       **{'If-None-Match': etag})
+        self.assertEqual(res.status_code, 304)
+
+    def test_moved_menu_changes_both_dates(self):
+        old = cache_versions.current([cache_versions.date_scope(self.today)])
+        other_date = self.today + datetime.timedelta(days=1)
+        other = cache_versions.current([cache_versions.date_scope(
+            other_date)])
+        res = self.modify_resource(
+            '/api/v1/menu/{}'.format(self.menu.id), self.admin_token,
+            {'menu_date': str(other_date)})
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(old, cache_versions.current([
+            cache_versions.date_scope(self.today)]))
+        self.assertNotEqual(other, cache_versions.current([
+            cache_versions.date_scope(other_date)]))
+
+    def test_failed_request_keeps_tag(self):
+        etag = self.get(self.meals_endpoint, self.admin_token).headers['ETag']
+        res = self.modify_resource('/api/v1/meals/{}'.format(self.meal.id),
+                                   self.admin_token, {'price': 10})
+        self.assertEqual(res.status_code, 400)
+        res = self.get(self.meals_endpoint, self.admin_token,
+                       **{'If-None-Match': etag})
+        self.assertEqual(res.status_code, 304)
+
+    def test_orders_change_tag_of_capped_menu(self):
+        res = self.modify_resource(
+            '/api/v1/menu/{}/capacity'.format(self.menu.id),
+            self.admin_token,
+            {'capacity': [{'mealId': self.meal.id, 'portions': 5}]})
+        self.assertEqual(res.status_code, 200)
+        etag, res = self.revalidate(self.menu_endpoint)
+        self.assertEqual(res.status_code, 304)
+        res = self.make_post_request(self.orders_endpoint, {
+            'menuId': self.menu.id, 'meals': [self.meal.id],
+            'orderCount': 1}, {'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 201)
+        res = self.get(self.menu_endpoint, **{'If-None-Match': etag})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.get_response_data(res)['remaining'],
+                         {str(self.menu.id): {str(self.meal.id): 4}})
+
+    def test_if_modified_since(self):
+        res = self.get(self.meals_endpoint, self.admin_token)
+        self.assertIn('Last-Modified', res.headers)
+        res = self.get(self.meals_endpoint, self.admin_token, **{
+            'If-Modified-Since': res.headers['Last-Modified']})
+        self.assertEqual(res.status_code, 304)
@@ -0,0 +1,141 @@
+"""
+This module contains tests for Idempotency-Key support on orders.
+"""
+import datetime
+import json
+import threading
+from sqlalchemy.engine.url import make_url
+from config import TestingConfig
+from tests.base_test_case import ApiTestCase
+from app import db
+from app.models import IdempotencyKey, Menu, Order
+
+
+class IdempotencyTestCase(ApiTestCase):
+    """
+    Tests for replaying order requests sent with an Idempotency-Key
+    """
+
+    def setUp(self):
+        super(IdempotencyTestCase, self).setUp()
+        self.menu_id = self.add_test_menu()
+        self.meal_id = Menu.query.get(self.menu_id).meals[0].id
+        self.customer_token = self.login_test_user('idem@test.com')[0]
+
+    def post_order(self, key, count=1, meal_id=None):
+        headers = {'Authorization': self.customer_token}
+        if key is not None:
+            headers['Idempotency-Key'] = key
+        return self.make_post_request(self.orders_endpoint, {
+            'meals': [meal_id or self.meal_id], 'orderCount': count,
+            'menuId': self.menu_id
+        }, headers=headers)
+
+    def test_repeated_key_replays_response(self):
+        first = self.post_order('key-1')
+        self.assertEqual(first.status_code, 201)
+        with self.assertMaxQueries(10) as stats:
+            second = self.post_order('key-1')
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.headers['Idempotent-Replayed'], 'true')
+        self.assertEqual(self.get_response_data(first),
+                         self.get_response_data(second))
+        self.assertEqual(Order.query.count(), 1)
+        # the replay never reads menus or meals
+        self.assertFalse([statement for statement in stats.statements
+                          if 'menus' in statement or 'meals' in statement])
+
+    def test_requests_without_key_are_not_stored(self):
+        self.post_order(None)
+        self.post_order(None)
+        self.assertEqual(Order.query.count(), 2)
+        self.assertEqual(IdempotencyKey.query.count(), 0)
+
+    def test_key_reused_for_other_request_is_rejected(self):
+        self.post_order('key-2')
+        res = self.post_order('key-2', count=3)
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(Order.query.count(), 1)
+
+    def test_failed_request_can_be_retried(self):
+        res = self.post_order('key-3', meal_id=1000)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(IdempotencyKey.query.count(), 0)
+        res = self.post_order('key-3')
+        self.assertEqual(res.status_code, 201)
+
+    def test_expired_key_runs_request_again(self):
+        self.post_order('key-4')
+        record = IdempotencyKey.query.first()
+        record.expires_at = datetime.datetime.now() - datetime.timedelta(
+            seconds=1)
+        db.session.commit()
+        res = self.post_order('key-4')
+        self.assertEqual(res.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', res.headers)
+        self.assertEqual(Order.query.count(), 2)
+
+    def test_keys_are_scoped_to_customer(self):
+        self.post_order('key-5')
+        self.customer_token = self.login_test_user('other@test.com')[0]
+        res = self.post_order('key-5')
+        self.assertNotIn('Idempotent-Replayed', res.headers)
+        self.assertEqual(Order.query.count(), 2)
+
+    def test_order_modification_is_replayed(self):
+        order_id = self.get_response_data(self.post_order(None))['order']['id']
+        endpoint = self.orders_endpoint + '/{}'.format(order_id)
+        headers = {'Authorization': self.customer_token,
+                   'Content-Type': 'application/json',
+                   'Idempotency-Key': 'key-6'}
+        data = json.dumps({'meals': [self.meal_id], 'orderCount': 2})
+        first = self.client().put(endpoint, headers=headers, data=data)
+        second = self.client().put(endpoint, headers=headers, data=data)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.headers['Idempotent-Replayed'], 'true')
+
+    def test_purge_expired_keys(self):
+        self.post_order('key-7')
+        IdempotencyKey.query.update({'expires_at': datetime.datetime.now(
+        ) - datetime.timedelta(seconds=1)})
+        self.assertEqual(IdempotencyKey.purge_expired(), 1)
+
+
+class ConcurrentIdempotencyTestCase(ApiTestCase):
+    """
+    Tests concurrent requests with one key place a single order
+    """
+
+    def setUp(self):
+        if make_url(TestingConfig.SQLALCHEMY_DATABASE_URI).database in (
+                None, '', ':memory:'):
+            # threads would each get their own empty in-memory database
+            self.skipTest('concurrent requests need a shared database')
+        super(ConcurrentIdempotencyTestCase, self).setUp()
+
+    def test_concurrent_requests_coalesce(self):
+        menu_id = self.add_test_menu()
+        meal_id = Menu.query.get(menu_id).meals[0].id
+        token = self.login_test_user('idem@test.com')[0]
+        body = json.dumps({'meals': [meal_id], 'orderCount': 1,
+                           'menuId': menu_id})
+        responses = []
+
+        def post():
+            res = self.app.test_client().post(
+                self.orders_endpoint, data=body, headers={
+                    'Authorization': token,
+                    'Content-Type': 'application/json',
+                    'Idempotency-Key': 'rush'})
+            responses.append(res)
+
+        threads = [threading.Thread(target=post) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        db.session.remove()
+        self.assertEqual(Order.query.count(), 1)
+        order_ids = set(self.get_response_data(res)['order']['id']
+                        for res in responses if res.status_code == 201)
+        self.assertEqual(len(order_ids), 1)
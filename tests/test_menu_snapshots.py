@@ -0,0 +1,78 @@
+"""
+This module contains tests for the snapshot cache of today's menu.
+"""
+import datetime
+from flask import current_app
+from tests.base_test_case import ApiTestCase
+from app import cache_versions, db
+from app.models import Menu
+
+
+class MenuSnapshotTestCase(ApiTestCase):
+    """
+    Tests for serving today's menu from snapshots
+    """
+
+    def setUp(self):
+        super(MenuSnapshotTestCase, self).setUp()
+        self.admin_token, self.admin = self.login_admin('snap@admin.com')
+        self.meal = self.add_test_meal(self.admin)
+        self.today = datetime.datetime.now().date()
+        self.menu = Menu(title='today', description='lorem',
+                         menu_date=str(self.today), meals=[self.meal],
+                         catering=self.admin.catering)
+        self.menu.save()
+        self.counters = current_app.extensions['metrics']['menu_snapshot']
+
+    def get_menu(self):
+        res = self.client().get(self.menu_endpoint)
+        self.assertEqual(res.status_code, 200)
+        return res, self.get_response_data(res)
+
+    def test_repeated_reads_are_served_from_snapshot(self):
+        res, data = self.get_menu()
+        self.assertEqual(data['menus'][0]['id'], self.menu.id)
+        version = res.headers['X-Menu-Version']
+        res = self.get_menu()[0]
+        self.assertEqual(res.headers['X-Menu-Version'], version)
+        self.assertEqual(self.counters.get('misses'), 1)
+        self.assertEqual(self.counters.get('hits'), 1)
+
+    def test_meal_change_rebuilds_snapshot(self):
+        version = self.get_menu()[0].headers['X-Menu-Version']
+        self.meal.title = 'Fish and chips'
+        self.meal.save()
+        res, data = self.get_menu()
+        self.assertNotEqual(res.headers['X-Menu-Version'], version)
+        self.assertEqual(data['menus'][0]['meals'][0]['title'], 'Fish and chips')
+
+    def test_new_menu_for_today_rebuilds_snapshot(self):
+        self.get_menu()
+        menu = Menu(title='second', menu_date=str(self.today),
+                    catering=self.admin.catering)
+        menu.save()
+        data = self.get_menu()[1]
+        self.assertEqual(len(data['menus']), 2)
+
+    def test_menu_of_other_date_keeps_snapshot(self):
+        version = self.get_menu()[0].headers['X-Menu-Version']
+        menu = Menu(title='later', menu_date='2030-01-01',
+                    catering=self.admin.catering)
+        menu.save()
+        res = self.get_menu()[0]
+        self.assertEqual(res.headers['X-Menu-Version'], version)
+        self.assertEqual(self.counters.get('hits'), 1)
+
+    def test_commit_of_other_process_rebuilds_snapshot(self):
+        res = self.get_menu()[0]
+        etag = res.headers['ETag']
+        # another process renames the menu, this one only sees the counter
+        db.session.execute(Menu.__table__.update().where(
+            Menu.__table__.c.id == self.menu.id).values(title='renamed'))
+        cache_versions.bump([cache_versions.date_scope(self.today)])
+        db.session.commit()
+        res, data = self.get_menu()
+        self.assertNotEqual(res.headers['ETag'], etag)
+        self.assertEqual(data['menus'][0]['title'], 'renamed')
+        self.assertEqual(res.headers['ETag'],
+                         '"{}"'.format(res.headers['X-Menu-Version']))
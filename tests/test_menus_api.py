@@ -1,5 +1,6 @@
 import json
 from tests.base_test_case import ApiTestCase
+from app.models import Menu
 
 
 class TestMenusApiTestCase(ApiTestCase):
@@ -164,6 +165,19 @@ class TestMenusApiTestCase(ApiTestCase):
         self.assertEqual(res_data['message'],
                          'Requested menu with id 1000 does not exist')
 
+    def test_empty_meals_leave_menu_meals(self):
+        """
+        tests an empty list of meals does not change the meals of a menu
+        """
+        menu_id = self.add_test_menu()
+        endpoint = '/api/v1/menu/{0}'.format(menu_id)
+        res = self.modify_resource(endpoint, self.admin_token,
+                                   {'title': 'supper', 'meals': []})
+        self.assertEqual(res.status_code, 200)
+        menu = Menu.query.get(menu_id)
+        self.assertEqual(menu.title, 'supper')
+        self.assertTrue(menu.meals)
+
     def test_admin_cannot_modify_menu_without_fields(self):
         """
         tests an admin can edit their menu
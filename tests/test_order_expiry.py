@@ -0,0 +1,117 @@
+"""
+This module contains tests for order statuses and the expiry sweeper.
+"""
+import datetime
+from flask import current_app
+from tests.base_test_case import ApiTestCase
+from app import db
+from app.models import Menu, Order
+from app.order_expiry import OrderSweeper, lock_expired
+
+
+class OrderExpiryTestCase(ApiTestCase):
+    """
+    Tests for locking expired orders and cancelling pending ones
+    """
+
+    def setUp(self):
+        super(OrderExpiryTestCase, self).setUp()
+        self.menu_id = self.add_test_menu()
+        self.meal_id = Menu.query.get(self.menu_id).meals[0].id
+        self.customer_token = self.login_test_user('expiry@test.com')[0]
+
+    def place(self):
+        res = self.make_post_request(self.orders_endpoint, {
+            'meals': [self.meal_id], 'orderCount': 1, 'menuId': self.menu_id
+        }, headers={'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 201)
+        return self.get_response_data(res)['order']['id']
+
+    def expire(self, order_id):
+        Order.query.filter_by(id=order_id).update({
+            'expires_at': datetime.datetime.now() - datetime.timedelta(
+                minutes=current_app.config['ORDER_EXPIRES_IN'] + 1)})
+        db.session.commit()
+
+    def statuses(self):
+        db.session.expire_all()
+        return {order.id: order.status for order in Order.query}
+
+    def order_ids(self, status):
+        res = self.client().get('/api/v1/myorders?status={}'.format(status),
+                                headers={'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 200)
+        return [order['id'] for order in self.get_response_data(res)['orders']]
+
+    def cancel(self, order_id):
+        return self.client().delete(
+            self.orders_endpoint + '/{}'.format(order_id),
+            headers={'Authorization': self.customer_token})
+
+    def test_new_orders_are_pending(self):
+        order_id = self.place()
+        self.assertEqual(self.statuses(), {order_id: Order.PENDING})
+
+    def test_sweep_locks_expired_orders_in_batches(self):
+        expired = [self.place() for _ in range(5)]
+        fresh = self.place()
+        for order_id in expired:
+            self.expire(order_id)
+        with self.count_commits() as commits:
+            self.assertEqual(lock_expired(2), 5)
+        self.assertEqual(len(commits), 3)
+        statuses = self.statuses()
+        self.assertEqual(statuses.pop(fresh), Order.PENDING)
+        self.assertEqual(set(statuses.values()), {Order.LOCKED})
+        self.assertEqual(lock_expired(2), 0)
+
+    def test_sweep_leaves_cancelled_orders(self):
+        order_id = self.place()
+        self.assertEqual(self.cancel(order_id).status_code, 200)
+        self.expire(order_id)
+        self.assertEqual(lock_expired(10), 0)
+        self.assertEqual(self.statuses(), {order_id: Order.CANCELLED})
+
+    def test_locked_order_cannot_be_modified(self):
+        order_id = self.place()
+        self.expire(order_id)
+        lock_expired(10)
+        res = self.modify_resource(
+            self.orders_endpoint + '/{}'.format(order_id),
+            self.customer_token, {'meals': [self.meal_id], 'orderCount': 2})
+        self.assertEqual(res.status_code, 400)
+
+    def test_cancelled_order_cannot_be_cancelled_or_modified(self):
+        order_id = self.place()
+        res = self.cancel(order_id)
+        self.assertEqual(self.get_response_data(res)['order']['status'],
+                         Order.CANCELLED)
+        self.assertEqual(self.cancel(order_id).status_code, 400)
+        res = self.modify_resource(
+            self.orders_endpoint + '/{}'.format(order_id),
+            self.customer_token, {'meals': [self.meal_id], 'orderCount': 2})
+        self.assertEqual(res.status_code, 400)
+
+    def test_expired_order_cannot_be_cancelled(self):
+        order_id = self.place()
+        self.expire(order_id)
+        self.assertEqual(self.cancel(order_id).status_code, 400)
+
+    def test_orders_are_listed_by_status(self):
+        pending, expired, cancelled = self.place(), self.place(), self.place()
+        self.expire(expired)
+        self.cancel(cancelled)
+        # expired orders list as locked before the sweeper runs
+        self.assertEqual(self.order_ids('pending'), [pending])
+        self.assertEqual(self.order_ids('locked'), [expired])
+        lock_expired(10)
+        self.assertEqual(self.order_ids('locked'), [expired])
+        self.assertEqual(self.order_ids('cancelled'), [cancelled])
+        res = self.client().get('/api/v1/myorders?status=lost', headers={
+            'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 400)
+
+    def test_sweeper_counts_locked_orders(self):
+        self.expire(self.place())
+        sweeper = OrderSweeper(self.app, 60, 10)
+        self.assertEqual(sweeper.sweep(), 1)
@@ -0,0 +1,111 @@
+"""
+This module contains tests for the streaming export of orders.
+"""
+import csv
+import datetime
+import io
+import json
+from tests.base_test_case import ApiTestCase
+from app.models import Meal, Menu, Order
+from app.order_export import export_rows
+
+LUNCH_TIME = datetime.datetime(2018, 4, 26, 12)
+
+
+class OrderExportTestCase(ApiTestCase):
+    """
+    Tests for exporting a catering's orders as NDJSON and CSV
+    """
+
+    def setUp(self):
+        super(OrderExportTestCase, self).setUp()
+        self.admin_token, self.admin = self.login_admin('export@admin.com')
+        self.customer_token, self.customer = self.login_test_user(
+            'export@test.com')
+        catering = self.admin.catering
+        self.rice = Meal(title='Rice', price=1000, catering=catering)
+        self.beans = Meal(title='Beans', price=500, catering=catering)
+        self.lunch = Menu(title='lunch', menu_date='2018-04-26',
+                          meals=[self.rice, self.beans], catering=catering)
+        self.supper = Menu(title='supper', menu_date='2018-04-27',
+                           meals=[self.rice], catering=catering)
+        self.lunch.save()
+        self.supper.save()
+        self.export_endpoint = '/api/v1/orders/export'
+
+    def add_order(self, menu, meals, created_at=LUNCH_TIME):
+        order = Order(total_cost=sum(meal.price for meal in meals),
+                      meals=meals, customer=self.customer,
+                      catering=self.admin.catering, menu=menu,
+                      created_at=created_at)
+        order.save()
+        return order.id
+
+    def export(self, query=''):
+        res = self.client().get(self.export_endpoint + query, headers={
+            'Authorization': self.admin_token})
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.is_streamed)
+        return res
+
+    def test_ndjson_lists_orders_oldest_first(self):
+        second = self.add_order(self.lunch, [self.rice],
+                                created_at=datetime.datetime(2018, 4, 26, 13))
+        first = self.add_order(self.lunch, [self.rice, self.beans])
+        res = self.export()
+        self.assertEqual(res.mimetype, 'application/x-ndjson')
+        records = [json.loads(line) for line in
+                   res.get_data(as_text=True).splitlines()]
+        self.assertEqual([record['id'] for record in records], [first, second])
+        self.assertEqual(records[0]['meals'], [
+            {'id': self.rice.id, 'title': 'Rice'},
+            {'id': self.beans.id, 'title': 'Beans'}])
+        self.assertEqual(records[0]['customerEmail'], 'export@test.com')
+        self.assertEqual(records[0]['cost'], 1500.0)
+
+    def test_csv_has_header_and_meal_lists(self):
+        order_id = self.add_order(self.lunch, [self.rice, self.beans])
+        res = self.export('?format=csv')
+        self.assertEqual(res.mimetype, 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(res.get_data(as_text=True))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], str(order_id))
+        self.assertEqual(rows[0]['mealIds'], '{};{}'.format(
+            self.rice.id, self.beans.id))
+        self.assertEqual(rows[0]['meals'], 'Rice;Beans')
+
+    def test_export_filters_by_days_and_menu(self):
+        self.add_order(self.lunch, [self.rice],
+                       created_at=datetime.datetime(2018, 4, 25, 9))
+        lunch = self.add_order(self.lunch, [self.rice])
+        supper = self.add_order(self.supper, [self.rice],
+                                created_at=datetime.datetime(2018, 4, 27, 19))
+
+        def ids(query):
+            return [json.loads(line)['id'] for line in
+                    self.export(query).get_data(as_text=True).splitlines()]
+
+        self.assertEqual(ids('?from=2018-04-26&to=2018-04-27'),
+                         [lunch, supper])
+        self.assertEqual(ids('?from=2018-04-26&menuId={}'.format(
+            self.lunch.id)), [lunch])
+
+    def test_rows_are_read_in_batches(self):
+        order_ids = [self.add_order(self.lunch, [self.rice])
+                     for _ in range(5)]
+        catering_id = self.admin.catering.id
+        with self.assertMaxQueries(4):
+            records = list(export_rows(catering_id, batch_size=2))
+        self.assertEqual([record['id'] for record in records], order_ids)
+        self.assertTrue(all(record['meals'] for record in records))
+
+    def test_export_rejects_reversed_range(self):
+        res = self.client().get(
+            self.export_endpoint + '?from=2018-02-01&to=2018-01-01',
+            headers={'Authorization': self.admin_token})
+        self.assertEqual(res.status_code, 400)
+
+    def test_only_caterers_export(self):
+        res = self.client().get(self.export_endpoint, headers={
+            'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 403)
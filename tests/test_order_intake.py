@@ -0,0 +1,152 @@
+"""
+This module contains tests for the group commit order intake.
+"""
+import threading
+import time
+import unittest
+from sqlalchemy.engine.url import make_url
+from config import TestingConfig
+from app import db, order_intake
+from app.metrics import Counters
+from app.models import Menu, Order
+from app.order_intake import OrderIntake, OrderIntakeFull, PendingOrder
+from tests.base_test_case import ApiTestCase
+
+
+def pending(number):
+    return PendingOrder({'number': number}, [], None)
+
+
+class OrderIntakeTestCase(unittest.TestCase):
+    """
+    Tests for batching, backpressure and failure isolation of the intake
+    """
+
+    def setUp(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+        self.counters = Counters()
+
+    def save_batch(self, batch):
+        self.release.wait(5)
+        numbers = [item.values['number'] for item in batch]
+        if 'bad' in numbers:
+            raise ValueError('bad order')
+        self.batches.append(numbers)
+        return [number * 10 for number in numbers]
+
+    def make_intake(self, batch_size=10, max_wait_ms=50, queue_size=100,
+                    timeout=5):
+        intake = OrderIntake(self.save_batch, batch_size, max_wait_ms,
+                             queue_size, timeout=timeout,
+                             counters=self.counters)
+        self.addCleanup(intake.shutdown)
+        return intake
+
+    def test_orders_are_saved_in_batches(self):
+        self.release.clear()
+        intake = self.make_intake(batch_size=3)
+        # the writer holds the first batch while the rest queue up
+        futures = [intake.submit(pending(number)) for number in range(7)]
+        self.release.set()
+        self.assertEqual([future.result(5) for future in futures],
+                         [0, 10, 20, 30, 40, 50, 60])
+        self.assertEqual(sum(self.batches, []), list(range(7)))
+        self.assertTrue(all(len(batch) <= 3 for batch in self.batches))
+        self.assertEqual(self.counters.get('batches'), len(self.batches))
+        self.assertLess(len(self.batches), 7)
+        self.assertEqual(self.counters.get('batched_orders'), 7)
+        self.assertEqual(self.counters.get('queued'), 7)
+
+    def test_full_queue_is_rejected(self):
+        self.release.clear()
+        intake = self.make_intake(batch_size=1, queue_size=1)
+        intake.submit(pending(0))
+        # wait for the writer to take order 0 so the queue holds one order
+        while intake._queue.qsize():
+            time.sleep(0.001)
+        intake.submit(pending(1))
+        with self.assertRaises(OrderIntakeFull):
+            intake.submit(pending(2))
+        self.release.set()
+        self.assertEqual(self.counters.get('rejected'), 1)
+
+    def test_order_waiting_too_long_is_given_up(self):
+        self.release.clear()
+        intake = self.make_intake(batch_size=1, timeout=0.05)
+        intake.submit(pending(0))
+        with self.assertRaises(OrderIntakeFull):
+            intake.place(pending(1))
+        self.release.set()
+        intake.shutdown()
+        self.assertEqual(self.batches, [[0]])
+        self.assertEqual(self.counters.get('timed_out'), 1)
+        self.assertEqual(self.counters.get('abandoned'), 1)
+
+    def test_failed_order_does_not_fail_its_batch(self):
+        self.release.clear()
+        intake = self.make_intake(batch_size=3)
+        intake.submit(pending(0))
+        good = intake.submit(pending(1))
+        bad = intake.submit(pending('bad'))
+        self.release.set()
+        self.assertEqual(good.result(5), 10)
+        with self.assertRaises(ValueError):
+            bad.result(5)
+        self.assertEqual(self.counters.get('failed_orders'), 1)
+
+    def test_shutdown_saves_queued_orders(self):
+        intake = self.make_intake(max_wait_ms=1000)
+        future = intake.submit(pending(4))
+        intake.shutdown()
+        self.assertEqual(future.result(0), 40)
+
+
+class OrderIntakeApiTestCase(ApiTestCase):
+    """
+    Tests placing orders through the order intake
+    """
+
+    def setUp(self):
+        if make_url(TestingConfig.SQLALCHEMY_DATABASE_URI).database in (
+                None, '', ':memory:'):
+            # the writer thread would get its own empty in-memory database
+            self.skipTest('order intake needs a shared database')
+        super(OrderIntakeApiTestCase, self).setUp()
+        self.menu_id = self.add_test_menu()
+        self.meal_id = Menu.query.get(self.menu_id).meals[0].id
+        self.customer_token = self.login_test_user('intake@test.com')[0]
+        self.app.config['ORDER_INTAKE'] = True
+        order_intake.init_app(self.app)
+        self.intake = order_intake.get_intake()
+
+    def tearDown(self):
+        intake = order_intake.get_intake()
+        if intake is not None:
+            intake.shutdown()
+        super(OrderIntakeApiTestCase, self).tearDown()
+
+    def test_order_is_saved_by_intake(self):
+        with self.count_commits() as commits:
+            res = self.make_post_request(self.orders_endpoint, {
+                'meals': [self.meal_id], 'orderCount': 2,
+                'menuId': self.menu_id
+            }, headers={'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 201)
+        order = self.get_response_data(res)['order']
+        self.assertEqual(order['orderCount'], 2)
+        self.assertEqual(order['customer']['email'], 'intake@test.com')
+        # the batch commit of the writer, the request committed nothing
+        self.assertEqual(len(commits), 1)
+        db.session.remove()
+        self.assertEqual(Order.query.get(order['id']).meals[0].id,
+                         self.meal_id)
+        self.assertEqual(self.intake.counters.get('batched_orders'), 1)
+
+    def test_invalid_order_is_not_queued(self):
+        res = self.make_post_request(self.orders_endpoint, {
+            'meals': [1000], 'orderCount': 1, 'menuId': self.menu_id
+        }, headers={'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(self.intake.counters.get('queued'), 0)
@@ -58,12 +58,39 @@ class TestOrdersApiTestCase(ApiTestCase):
         """
         tests. authenicated user can order a meal
         """
+        menu_id = self.add_test_menu()
+        meal = Menu.query.get(menu_id).meals[0]
+
+        res = self.post_order({'meals': [meal.id], 'orderCount': 2,
+                               'menuId': menu_id})
+        self.assertEqual(res.status_code, 201)
+        order = self.get_response_data(res)['order']
+        self.assertEqual(order['cost'], meal.price * 2)
+        self.assertEqual(order['customer']['email'], 'testorders@test.com')
+
+    def test_user_cannot_order_from_non_existent_menu(self):
+        """
+        tests. orders must be placed on an existing menu
+        """
+        res = self.post_order({'meals': [1], 'orderCount': 1, 'menuId': 1000})
+        res_data = self.get_response_data(res)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual('Menu with id 1000 does not exist',
+                         res_data['errors']['menuId'])
+
+    def test_user_cannot_order_meal_of_another_catering(self):
+        """
+        tests. meals must belong to the catering of the menu
+        """
         meal = self.add_test_meal(self.admin)
         menu_id = self.add_test_menu()
 
         res = self.post_order({'meals': [meal.id], 'orderCount': 1,
                                'menuId': menu_id})
-        self.assertEqual(res.status_code, 201)
+        res_data = self.get_response_data(res)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual('No meal exists with id: {}'.format(meal.id),
+                         res_data['message'])
 
     def test_cannot_modify_non_existent_order(self):
         res = self.modify_resource(self.orders_endpoint + '/{}'.format(
@@ -71,9 +98,9 @@ class TestOrdersApiTestCase(ApiTestCase):
         self.assertEqual(res.status_code, 400)
 
     def test_user_can_modify_order(self):
-        meal = self.add_test_meal(self.admin)
-        meals = [meal]
         menu_id = self.add_test_menu()
+        meal = Menu.query.get(menu_id).meals[0]
+        meals = [meal]
 
         # create a test order to modify later
         order = Order(total_cost=1000, catering=self.admin.catering,
@@ -85,6 +112,20 @@ class TestOrdersApiTestCase(ApiTestCase):
         self.assertEqual(res.status_code, 200)
         self.assertEqual(order.id, res_data['order']['id'])
 
+    def test_user_cannot_modify_order_to_meal_off_its_menu(self):
+        menu_id = self.add_test_menu()
+        menu = Menu.query.get(menu_id)
+        other_meal = self.add_test_meal(menu.catering.admin)
+        order = Order(total_cost=1500, catering=menu.catering,
+                      customer=self.customer, meals=menu.meals,
+                      menu_id=menu_id)
+        order.save()
+        res = self.modify_order(order.id, {'meals': [other_meal.id],
+                                           'orderCount': 1})
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual('No meal exists with id: {}'.format(other_meal.id),
+                         self.get_response_data(res)['message'])
+
     def test_user_cannot_modify_expired_order(self):
         token, user = self.login_test_user('testorders5@test.com')
         admin = self.login_admin('ordersadmin5@test.com')[1]
@@ -111,7 +152,7 @@ class TestOrdersApiTestCase(ApiTestCase):
                                'menuId': menu_id})
         res_data = self.get_response_data(res)
         self.assertEqual(res.status_code, 400)
-        self.assertEqual('No meal exists with id: 100',
+        self.assertEqual('No meal exists with id: 100, 300',
                          res_data['message'])
 
     def test_user_cannot_make_order_without_meals(self):
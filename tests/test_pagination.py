@@ -0,0 +1,56 @@
+"""
+This module contains tests for keyset pagination of list endpoints.
+"""
+import datetime
+from tests.base_test_case import ApiTestCase
+from app.models import Meal
+
+
+class PaginationTestCase(ApiTestCase):
+    """
+    Tests for paginating list endpoints
+    """
+
+    def setUp(self):
+        super(PaginationTestCase, self).setUp()
+        self.admin_token, self.admin = self.login_admin('pages@admin.com')
+        started = datetime.datetime(2018, 5, 1, 12, 0, 0)
+        self.meals = []
+        for minute in range(5):
+            meal = Meal(title='meal {}'.format(minute), price=1000,
+                        catering=self.admin.catering,
+                        created_at=started + datetime.timedelta(minutes=minute))
+            meal.save()
+            self.meals.append(meal)
+
+    def get_meals(self, query):
+        res = self.client().get(self.meals_endpoint + query, headers={
+            'Authorization': self.admin_token})
+        return res, self.get_response_data(res)
+
+    def test_pages_follow_cursor_newest_first(self):
+        res, data = self.get_meals('?limit=2')
+        self.assertEqual(res.status_code, 200)
+        ids = [meal['id'] for meal in data['meals']]
+        cursor = data['pagination']['nextCursor']
+        while cursor:
+            data = self.get_meals('?limit=2&cursor=' + cursor)[1]
+            ids.extend(meal['id'] for meal in data['meals'])
+            cursor = data['pagination']['nextCursor']
+        self.assertEqual(ids, [meal.id for meal in reversed(self.meals)])
+        self.assertIsNone(data['pagination']['next'])
+
+    def test_next_link_carries_cursor(self):
+        data = self.get_meals('?limit=4')[1]
+        self.assertIn('cursor=', data['pagination']['next'])
+        self.assertNotIn('total', data['pagination'])
+
+    def test_total_count_is_optional(self):
+        data = self.get_meals('?limit=1&count=true')[1]
+        self.assertEqual(data['pagination']['total'], 5)
+        self.assertEqual(len(data['meals']), 1)
+
+    def test_invalid_cursor_is_rejected(self):
+        res, data = self.get_meals('?cursor=not-a-cursor')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(data['message'], 'Invalid pagination cursor')
@@ -0,0 +1,103 @@
+"""
+This module contains tests for the kitchen prep sheet.
+"""
+from tests.base_test_case import ApiTestCase
+from app import cache_versions, db
+from app.models import Meal, Menu, Order
+
+
+class PrepSheetTestCase(ApiTestCase):
+    """
+    Tests for summing portions and revenue of a menu's orders
+    """
+
+    def setUp(self):
+        super(PrepSheetTestCase, self).setUp()
+        self.admin_token, self.admin = self.login_admin('prep@admin.com')
+        self.customer_token, self.customer = self.login_test_user(
+            'prep@test.com')
+        catering = self.admin.catering
+        self.rice = Meal(title='Rice', price=1000, catering=catering)
+        self.beans = Meal(title='Beans', price=500, catering=catering)
+        self.menu = Menu(title='lunch', menu_date='2018-04-26',
+                         meals=[self.rice, self.beans], catering=catering)
+        self.menu.save()
+        self.prep_sheet_endpoint = '/api/v1/prep-sheet'
+        self.counters = self.app.extensions['metrics']['prep_sheet']
+
+    def add_order(self, meals, count):
+        Order(total_cost=sum(meal.price for meal in meals) * count,
+              meals=meals, customer=self.customer, catering=self.admin.catering,
+              menu=self.menu, order_count=count).save()
+
+    def get_sheet(self, query):
+        res = self.client().get(self.prep_sheet_endpoint + query, headers={
+            'Authorization': self.admin_token})
+        self.assertEqual(res.status_code, 200)
+        return self.get_response_data(res)['prepSheet']
+
+    def test_sheet_sums_portions_and_revenue(self):
+        self.add_order([self.rice, self.beans], 2)
+        self.add_order([self.rice], 1)
+        sheet = self.get_sheet('?menuId={}'.format(self.menu.id))
+        self.assertEqual(sheet['meals'], [
+            {'mealId': self.beans.id, 'title': 'Beans', 'orders': 1,
+             'portions': 2, 'revenue': 1000.0},
+            {'mealId': self.rice.id, 'title': 'Rice', 'orders': 2,
+             'portions': 3, 'revenue': 3000.0}
+        ])
+        self.assertEqual(sheet['totalPortions'], 5)
+        self.assertEqual(sheet['totalRevenue'], 4000.0)
+
+    def test_sheet_leaves_out_cancelled_orders(self):
+        self.add_order([self.rice], 1)
+        Order(total_cost=500, meals=[self.beans], customer=self.customer,
+              catering=self.admin.catering, menu=self.menu,
+              status=Order.CANCELLED).save()
+        sheet = self.get_sheet('?menuId={}'.format(self.menu.id))
+        self.assertEqual([meal['mealId'] for meal in sheet['meals']],
+                         [self.rice.id])
+
+    def test_sheet_of_a_date(self):
+        self.add_order([self.rice], 4)
+        sheet = self.get_sheet('?date=2018-04-26')
+        self.assertEqual(sheet['date'], '2018-04-26')
+        self.assertEqual(sheet['totalPortions'], 4)
+        self.assertEqual(self.get_sheet('?date=2018-04-27')['meals'], [])
+
+    def test_sheet_is_cached_until_next_order(self):
+        self.add_order([self.rice], 1)
+        query = '?menuId={}'.format(self.menu.id)
+        self.get_sheet(query)
+        # only the cache versions the sheet was built under are read
+        with self.assertMaxQueries(1):
+            self.get_sheet(query)
+        self.assertEqual(self.counters.get('hits'), 1)
+        res = self.make_post_request(self.orders_endpoint, {
+            'meals': [self.rice.id], 'orderCount': 2, 'menuId': self.menu.id
+        }, headers={'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(self.get_sheet(query)['totalPortions'], 3)
+
+    def test_order_of_other_process_rebuilds_sheet(self):
+        self.add_order([self.rice], 1)
+        query = '?menuId={}'.format(self.menu.id)
+        self.get_sheet(query)
+        # another process cancels the order, this one only sees the counter
+        db.session.execute(Order.__table__.update().values(
+            status=Order.CANCELLED))
+        cache_versions.bump([cache_versions.menu_scope(self.menu.id)])
+        db.session.commit()
+        self.assertEqual(self.get_sheet(query)['totalPortions'], 0)
+        self.assertEqual(self.counters.get('hits'), 0)
+
+    def test_sheet_needs_menu_or_date(self):
+        res = self.client().get(self.prep_sheet_endpoint, headers={
+            'Authorization': self.admin_token})
+        self.assertEqual(res.status_code, 400)
+
+    def test_only_caterers_get_sheets(self):
+        res = self.client().get(
+            self.prep_sheet_endpoint + '?menuId={}'.format(self.menu.id),
+            headers={'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 403)
@@ -0,0 +1,61 @@
+"""
+This module contains tests for the authenticated principal cache.
+"""
+from flask import current_app
+from tests.base_test_case import ApiTestCase
+from app import db
+from app.api.principal import token_digest
+
+
+class PrincipalCacheTestCase(ApiTestCase):
+    """
+    Tests for caching authenticated principals
+    """
+
+    def setUp(self):
+        super(PrincipalCacheTestCase, self).setUp()
+        self.admin_token, self.admin = self.login_admin('cache@admin.com')
+        self.cache = current_app.extensions['principal_cache']
+
+    def get_meals(self, token):
+        return self.client().get(self.meals_endpoint, headers={
+            'Authorization': token})
+
+    def test_repeated_requests_hit_cache(self):
+        self.get_meals(self.admin_token)
+        self.get_meals(self.admin_token)
+        res = self.get_meals(self.admin_token)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.cache.counters.get('misses'), 1)
+        self.assertEqual(self.cache.counters.get('hits'), 2)
+
+    def test_cached_principal_holds_catering(self):
+        self.get_meals(self.admin_token)
+        principal = self.cache.get(token_digest(self.admin_token))
+        self.assertEqual(principal.id, self.admin.id)
+        self.assertEqual(principal.catering_id, self.admin.catering.id)
+        self.assertTrue(principal.is_administrator())
+
+    def test_user_change_invalidates_cache(self):
+        self.get_meals(self.admin_token)
+        self.admin.name = 'renamed'
+        db.session.commit()
+        self.assertIsNone(self.cache.get(token_digest(self.admin_token)))
+
+    def test_deleted_user_is_not_authenticated(self):
+        self.get_meals(self.admin_token)
+        customer_token, customer = self.login_test_user('gone@test.com')
+        self.client().get(self.myorders_endpoint, headers={
+            'Authorization': customer_token})
+        customer.delete()
+        res = self.client().get(self.myorders_endpoint, headers={
+            'Authorization': customer_token})
+        self.assertEqual(res.status_code, 401)
+
+    def test_metrics_expose_cache_counters(self):
+        self.get_meals(self.admin_token)
+        res = self.client().get('/api/v1/metrics', headers={
+            'Authorization': self.admin_token})
+        self.assertEqual(res.status_code, 200)
+        data = self.get_response_data(res)
+        self.assertIn('misses', data['metrics']['principal_cache'])
@@ -0,0 +1,78 @@
+"""
+This module contains tests asserting hot queries are served by indexes.
+"""
+from app import db
+from app.models import User, Meal, Menu, Order
+from app.models.menu import menu_meals
+from app.models.order import order_meals
+from tests.base_test_case import ApiTestCase
+
+
+class QueryPlanTestCase(ApiTestCase):
+    """
+    Tests query plans of hot queries. Sequential scans are disabled so the
+    planner picks an index whenever a usable one exists, however small the
+    test tables are.
+    """
+
+    def explain(self, query):
+        """
+        returns the query plan of an ORM query as text
+        """
+        if db.engine.dialect.name != 'postgresql':
+            self.skipTest('query plans are only checked on postgresql')
+        db.session.execute('SET enable_seqscan = off')
+        statement = query.statement.compile(
+            db.engine, compile_kwargs={'literal_binds': True})
+        rows = db.session.execute('EXPLAIN ' + str(statement))
+        return '\n'.join(row[0] for row in rows)
+
+    def assertUsesIndex(self, query, index_name):
+        plan = self.explain(query)
+        self.assertIn(index_name, plan)
+        self.assertNotIn('Seq Scan', plan)
+
+    def test_email_lookup_uses_index(self):
+        query = User.query.filter(
+            db.func.lower(User.email) == 'solo@andela.com')
+        self.assertUsesIndex(query, 'ix_users_email_lower')
+
+    def test_catering_meals_page_uses_index(self):
+        query = Meal.query.filter_by(catering_id=1).order_by(
+            Meal.created_at.desc(), Meal.id.desc()).limit(51)
+        self.assertUsesIndex(query, 'ix_meals_catering_id_created_at')
+
+    def test_catering_menus_page_uses_index(self):
+        query = Menu.query.filter_by(catering_id=1).order_by(
+            Menu.created_at.desc(), Menu.id.desc()).limit(51)
+        self.assertUsesIndex(query, 'ix_menus_catering_id_created_at')
+
+    def test_menu_date_check_uses_index(self):
+        query = Menu.query.filter_by(catering_id=1).filter_by(
+            date='2018-04-26')
+        self.assertUsesIndex(query, 'ix_menus_catering_id_date')
+
+    def test_public_menu_uses_index(self):
+        query = Menu.query.filter_by(date='2018-04-26')
+        self.assertUsesIndex(query, 'ix_menus_date')
+
+    def test_customer_orders_page_uses_index(self):
+        query = Order.query.filter_by(customer_id=1).order_by(
+            Order.created_at.desc(), Order.id.desc()).limit(51)
+        self.assertUsesIndex(query, 'ix_orders_customer_id_created_at')
+
+    def test_catering_orders_page_uses_index(self):
+        query = Order.query.filter_by(catering_id=1).order_by(
+            Order.created_at.desc(), Order.id.desc()).limit(51)
+        self.assertUsesIndex(query, 'ix_orders_catering_id_created_at')
+
+    def test_menu_orders_use_index(self):
+        query = Order.query.filter_by(menu_id=1)
+        self.assertUsesIndex(query, 'ix_orders_menu_id')
+
+    def test_meal_links_use_index(self):
+        query = db.session.query(menu_meals).filter(menu_meals.c.meal_id == 1)
+        self.assertUsesIndex(query, 'ix_menu_meals_meal_id')
+        query = db.session.query(order_meals).filter(
+            order_meals.c.meal_id == 1)
+        self.assertUsesIndex(query, 'ix_order_meals_meal_id')
@@ -0,0 +1,109 @@
+"""
+This module contains tests for per request SQL statement counting.
+"""
+from tests.base_test_case import ApiTestCase
+from app import db
+from app.models import Menu, Order
+
+
+class QueryStatsTestCase(ApiTestCase):
+    """
+    Tests for counting statements per request
+    """
+
+    def setUp(self):
+        super(QueryStatsTestCase, self).setUp()
+        self.menu_id = self.add_test_menu()
+        self.meal_id = Menu.query.get(self.menu_id).meals[0].id
+        self.customer_token = self.login_test_user('stats@test.com')[0]
+
+    def post_order(self):
+        return self.make_post_request(self.orders_endpoint, {
+            'meals': [self.meal_id], 'orderCount': 1, 'menuId': self.menu_id
+        }, headers={'Authorization': self.customer_token})
+
+    def test_response_reports_query_count(self):
+        res = self.client().get(self.myorders_endpoint, headers={
+            'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 200)
+        self.assertGreater(int(res.headers['X-Query-Count']), 0)
+        self.assertIn('X-Query-Time-Ms', res.headers)
+
+    def test_headers_can_be_disabled(self):
+        self.app.config['SQL_STATS_HEADERS'] = False
+        res = self.client().get(self.menu_endpoint)
+        self.assertNotIn('X-Query-Count', res.headers)
+
+    def test_order_post_query_budget(self):
+        # warm the principal cache and create today's rollup rows, in one
+        # slot, so only the order pipeline counts
+        self.app.config['SALES_ROLLUP_SLOTS'] = 1
+        self.post_order()
+        # menu and meals, order insert, order_meals insert, daily and meal
+        # rollup updates, the cache version of the menu's orders and,
+        # without RETURNING, a select of the order's server defaults
+        budget = 6 if db.engine.dialect.implicit_returning else 7
+        with self.assertMaxQueries(budget) as stats:
+            res = self.post_order()
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(int(res.headers['X-Query-Count']), stats.count)
+
+    def test_assert_max_queries_fails_over_budget(self):
+        with self.assertRaises(AssertionError):
+            with self.assertMaxQueries(0):
+                self.post_order()
+
+
+class ListQueryCountTestCase(ApiTestCase):
+    """
+    Tests list endpoints run a fixed number of queries whatever the
+    number of rows they return
+    """
+
+    def setUp(self):
+        super(ListQueryCountTestCase, self).setUp()
+        self.admin_token, self.admin = self.login_admin('lists@admin.com')
+        self.customer_token, self.customer = self.login_test_user(
+            'lists@test.com')
+        self.meal = self.add_test_meal(self.admin)
+
+    def add_rows(self, count):
+        catering = self.admin.catering
+        for _ in range(count):
+            self.add_test_meal(self.admin)
+            menu = Menu(title='menu', menu_date='2018-04-26',
+                        meals=[self.meal], catering=catering)
+            menu.save()
+            Order(total_cost=1500, meals=[self.meal], customer=self.customer,
+                  catering=catering, menu=menu).save()
+
+    def count_queries(self, endpoint, token):
+        # warm the principal cache so only the endpoint's own queries count
+        self.client().get(endpoint, headers={'Authorization': token})
+        with self.assertMaxQueries(10) as stats:
+            res = self.client().get(endpoint, headers={'Authorization': token})
+        self.assertEqual(res.status_code, 200)
+        return stats.count
+
+    def assertConstantQueries(self, endpoint, token, maximum):
+        self.add_rows(1)
+        few = self.count_queries(endpoint, token)
+        self.add_rows(5)
+        many = self.count_queries(endpoint, token)
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, maximum)
+
+    def test_meals_list_query_count(self):
+        # the page and the cache versions of the catering
+        self.assertConstantQueries(self.meals_endpoint, self.admin_token, 2)
+
+    def test_menus_list_query_count(self):
+        self.assertConstantQueries(self.get_menus_endpoint,
+                                   self.admin_token, 3)
+
+    def test_catering_orders_list_query_count(self):
+        self.assertConstantQueries(self.orders_endpoint, self.admin_token, 3)
+
+    def test_my_orders_list_query_count(self):
+        self.assertConstantQueries(self.myorders_endpoint,
+                                   self.customer_token, 3)
@@ -0,0 +1,73 @@
+"""
+This module contains tests for the read only path of the list endpoints.
+"""
+import datetime
+from tests.base_test_case import ApiTestCase
+from app import db
+from app.api.read_models import (MenuRow, OrderRow, dump_menu_rows,
+                                 dump_order_rows, menu_statement,
+                                 order_statement)
+from app.models import Meal, Menu, Order
+from app.serializers import dump_menus, dump_orders
+
+
+class ReadModelTestCase(ApiTestCase):
+    """
+    Tests for listing rows without ORM instances
+    """
+
+    def setUp(self):
+        super(ReadModelTestCase, self).setUp()
+        self.admin_token, self.admin = self.login_admin('read@admin.com')
+        self.customer_token, self.customer = self.login_test_user(
+            'read@test.com')
+        catering = self.admin.catering
+        self.rice = Meal(title='Rice', price=1000, catering=catering)
+        self.beans = Meal(title='Beans', price=500, catering=catering)
+        self.menu = Menu(title='lunch', menu_date='2018-04-26',
+                         meals=[self.rice, self.beans], catering=catering)
+        self.menu.save()
+        for count in (1, 2, 3):
+            Order(total_cost=1500 * count, meals=[self.rice, self.beans],
+                  customer=self.customer, catering=catering, menu=self.menu,
+                  order_count=count, created_at=datetime.datetime(
+                      2018, 4, 26, 12, count)).save()
+
+    def test_order_rows_serialize_like_orders(self):
+        orders = Order.query.options(*Order.to_dict_options()).order_by(
+            Order.id).all()
+        rows = [OrderRow._make(row) for row in db.session.execute(
+            order_statement(Order.catering_id == self.admin.catering.id
+                            ).order_by(Order.id))]
+        self.assertEqual(dump_order_rows(rows), dump_orders(orders))
+
+    def test_menu_rows_serialize_like_menus(self):
+        rows = [MenuRow._make(row) for row in db.session.execute(
+            menu_statement(Menu.id == self.menu.id))]
+        self.assertEqual(dump_menu_rows(rows), dump_menus([self.menu]))
+
+    def test_list_endpoints_load_no_instances(self):
+        endpoints = [('/api/v1/orders', self.admin_token),
+                     ('/api/v1/menus', self.admin_token),
+                     ('/api/v1/meals', self.admin_token),
+                     ('/api/v1/myorders', self.customer_token)]
+        for endpoint, token in endpoints:
+            db.session.remove()
+            res = self.client().get(endpoint, headers={
+                'Authorization': token})
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(len(db.session.identity_map), 0, endpoint)
+
+    def test_pages_follow_cursor(self):
+        res = self.client().get('/api/v1/myorders?limit=2&count=true',
+                                headers={'Authorization': self.customer_token})
+        first = self.get_response_data(res)
+        self.assertEqual(first['pagination']['total'], 3)
+        self.assertEqual([order['orderCount'] for order in first['orders']],
+                         [3, 2])
+        res = self.client().get(first['pagination']['next'], headers={
+            'Authorization': self.customer_token})
+        second = self.get_response_data(res)
+        self.assertEqual([order['orderCount'] for order in second['orders']],
+                         [1])
+        self.assertIsNone(second['pagination']['next'])
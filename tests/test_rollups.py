@@ -0,0 +1,156 @@
+"""
+This module contains tests for the incremental sales rollups.
+"""
+import datetime
+import json
+from collections import defaultdict
+from tests.base_test_case import ApiTestCase
+from app import db, rollups
+from app.models import DailyMealSales, DailySales, Meal, Menu, Order
+
+
+class SalesRollupTestCase(ApiTestCase):
+    """
+    Tests for keeping sales rollups in step with orders
+    """
+
+    def setUp(self):
+        super(SalesRollupTestCase, self).setUp()
+        self.admin_token, self.admin = self.login_admin('rollup@admin.com')
+        self.customer_token, self.customer = self.login_test_user(
+            'rollup@test.com')
+        self.catering = self.admin.catering
+        self.rice = Meal(title='Rice', price=1000, catering=self.catering)
+        self.beans = Meal(title='Beans', price=500, catering=self.catering)
+        self.menu = Menu(title='lunch', menu_date='2018-04-26',
+                         meals=[self.rice, self.beans],
+                         catering=self.catering)
+        self.menu.save()
+        self.today = datetime.datetime.now().date()
+
+    def place_order(self, meals, count):
+        res = self.make_post_request(self.orders_endpoint, {
+            'meals': [meal.id for meal in meals], 'orderCount': count,
+            'menuId': self.menu.id
+        }, headers={'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 201)
+        return Order.query.get(self.get_response_data(res)['order']['id'])
+
+    def daily(self):
+        slots = DailySales.query.filter_by(catering_id=self.catering.id,
+                                           day=self.today).all()
+        return (sum(sales.orders for sales in slots),
+                sum(sales.revenue for sales in slots))
+
+    def portions(self):
+        totals = {}
+        for sales in DailyMealSales.query.filter_by(
+                catering_id=self.catering.id, day=self.today):
+            orders, portions = totals.get(sales.meal_id, (0, 0))
+            totals[sales.meal_id] = (orders + sales.orders,
+                                     portions + sales.portions)
+        return totals
+
+    def snapshot(self):
+        # the slots of a key are summed, rebuild puts them all in slot 0
+        days, meals = defaultdict(int), defaultdict(int)
+        for sales in DailySales.query:
+            key = (sales.catering_id, str(sales.day))
+            days[key + ('orders',)] += sales.orders
+            days[key + ('revenue',)] += sales.revenue
+        for sales in DailyMealSales.query:
+            key = (sales.catering_id, str(sales.day), sales.meal_id)
+            meals[key + ('orders',)] += sales.orders
+            meals[key + ('portions',)] += sales.portions
+        return (sorted(days.items()),
+                sorted(item for item in meals.items() if item[1]))
+
+    def test_new_orders_are_added(self):
+        self.place_order([self.rice, self.beans], 2)
+        self.place_order([self.rice], 1)
+        self.assertEqual(self.daily(), (2, 4000.0))
+        self.assertEqual(self.portions(), {self.rice.id: (2, 3),
+                                           self.beans.id: (1, 2)})
+
+    def test_modified_order_replaces_its_contribution(self):
+        order = self.place_order([self.rice, self.beans], 2)
+        res = self.modify_resource(
+            self.orders_endpoint + '/{}'.format(order.id),
+            self.customer_token, {'meals': [self.beans.id], 'orderCount': 3})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.daily(), (1, 1500.0))
+        self.assertEqual(self.portions(), {self.rice.id: (0, 0),
+                                           self.beans.id: (1, 3)})
+
+    def test_deleted_order_is_removed(self):
+        self.place_order([self.rice], 1)
+        order = self.place_order([self.beans], 4)
+        order.delete()
+        self.assertEqual(self.daily(), (1, 1000.0))
+        self.assertEqual(self.portions()[self.beans.id], (0, 0))
+
+    def test_cancelled_order_is_removed(self):
+        self.place_order([self.rice], 1)
+        order = self.place_order([self.beans], 4)
+        res = self.client().delete(
+            self.orders_endpoint + '/{}'.format(order.id),
+            headers={'Authorization': self.customer_token})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.daily(), (1, 1000.0))
+        self.assertEqual(self.portions()[self.beans.id], (0, 0))
+        incremental = self.snapshot()
+        rollups.rebuild()
+        db.session.expire_all()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self.place_order([self.rice, self.beans], 2)
+        order = self.place_order([self.rice], 1)
+        order.order_count = 5
+        order.total_cost = 5000
+        order.save()
+        incremental = self.snapshot()
+        rollups.rebuild()
+        db.session.expire_all()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_orders_are_spread_over_slots(self):
+        for _ in range(12):
+            self.place_order([self.rice], 1)
+        slots = DailySales.query.filter_by(catering_id=self.catering.id,
+                                           day=self.today).all()
+        self.assertLessEqual(len(slots), self.app.config['SALES_ROLLUP_SLOTS'])
+        self.assertEqual(self.daily(), (12, 12000.0))
+        self.assertEqual(self.portions(), {self.rice.id: (12, 12)})
+
+    def test_sales_report(self):
+        self.place_order([self.rice, self.beans], 2)
+        self.place_order([self.rice], 1)
+        res = self.client().get(
+            '/api/v1/reports/sales?from={0}&to={0}&top=1'.format(self.today),
+            headers={'Authorization': self.admin_token})
+        self.assertEqual(res.status_code, 200)
+        report = json.loads(res.get_data(as_text=True))['report']
+        self.assertEqual(report['days'], [{
+            'date': str(self.today), 'orders': 2, 'revenue': 4000.0}])
+        self.assertEqual(report['totalRevenue'], 4000.0)
+        self.assertEqual(report['topMeals'], [{
+            'mealId': self.rice.id, 'title': 'Rice', 'orders': 2,
+            'portions': 3}])
+
+    def test_sales_report_reads_only_rollups(self):
+        self.place_order([self.rice], 1)
+        query = '/api/v1/reports/sales?from=2018-01-01&to={}'.format(
+            self.today)
+        self.client().get(query, headers={'Authorization': self.admin_token})
+        with self.assertMaxQueries(2) as stats:
+            self.client().get(query, headers={
+                'Authorization': self.admin_token})
+        self.assertFalse([statement for statement in stats.statements
+                          if 'FROM orders' in statement])
+
+    def test_sales_report_rejects_reversed_range(self):
+        res = self.client().get(
+            '/api/v1/reports/sales?from=2018-02-01&to=2018-01-01',
+            headers={'Authorization': self.admin_token})
+        self.assertEqual(res.status_code, 400)
@@ -0,0 +1,71 @@
+"""
+This module contains tests for the compiled request body schemas.
+"""
+import datetime
+from werkzeug.exceptions import HTTPException
+from tests.base_test_case import ApiTestCase
+from app.api.menus import MENU_SCHEMA
+from app.api.meals import EDIT_MEAL_SCHEMA, MEAL_SCHEMA
+from app.api.auth import SIGNUP_BUSINESS_SCHEMA
+
+
+class SchemaTestCase(ApiTestCase):
+    """
+    Tests for validating request bodies in one pass
+    """
+
+    def assertInvalid(self, schema, data):
+        with self.app.test_request_context():
+            with self.assertRaises(HTTPException) as ctx:
+                schema.validate(data)
+        self.assertEqual(ctx.exception.code, 400)
+        return ctx.exception.data['errors']
+
+    def test_returns_typed_values(self):
+        args = MENU_SCHEMA.validate({
+            'title': 'lunch', 'menu_date': '2018-04-26', 'meals': [2, 1]})
+        self.assertEqual(args, {
+            'title': 'lunch', 'description': None, 'meals': [2, 1],
+            'menu_date': datetime.date(2018, 4, 26)})
+
+    def test_reports_every_invalid_field(self):
+        errors = self.assertInvalid(MENU_SCHEMA, {
+            'title': ' ', 'menu_date': '26-04-2018', 'meals': ['1']})
+        self.assertEqual(sorted(errors), ['meals', 'menu_date', 'title'])
+        errors = self.assertInvalid(MEAL_SCHEMA, {'title': 'x' * 65})
+        self.assertEqual(sorted(errors), ['price', 'title'])
+
+    def test_checks_bounds(self):
+        self.assertIn('price', self.assertInvalid(
+            MEAL_SCHEMA, {'title': 'rice', 'price': 99}))
+        self.assertIn('price', self.assertInvalid(
+            MEAL_SCHEMA, {'title': 'rice', 'price': True}))
+        errors = self.assertInvalid(SIGNUP_BUSINESS_SCHEMA, {
+            'name': 'biz', 'email': 'biz@andela.com', 'password': 'short'})
+        self.assertTrue(errors['password'].startswith(
+            'Password field is required'))
+
+    def test_optional_fields_may_be_omitted(self):
+        self.assertEqual(EDIT_MEAL_SCHEMA.validate({'price': 200}), {
+            'title': None, 'price': 200, 'description': None})
+
+    def test_rejects_bodies_that_are_not_objects(self):
+        res = self.client().post(
+            '/api/v1/auth/login', data='[]', content_type='application/json')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('body', self.get_response_data(res)['errors'])
+
+    def test_menu_date_is_unique_per_catering(self):
+        token = self.login_admin('schema@admin.com')[0]
+        meal = self.make_post_request(self.meals_endpoint, {
+            'title': 'rice', 'price': 1000}, {'Authorization': token})
+        menu = {'title': 'lunch', 'menu_date': '2018-04-26',
+                'meals': [self.get_response_data(meal)['id']]}
+        res = self.make_post_request(self.menu_endpoint, menu,
+                                     {'Authorization': token})
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(self.get_response_data(res)['menuDate'], '2018-04-26')
+        res = self.make_post_request(self.menu_endpoint, menu,
+                                     {'Authorization': token})
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('menu_date', self.get_response_data(res)['errors'])
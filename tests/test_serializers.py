@@ -0,0 +1,105 @@
+"""
+This module contains tests for the compiled serializers and JSON backends.
+"""
+import datetime
+import decimal
+import json
+import sys
+from tests.base_test_case import ApiTestCase
+from app import serializers
+from app.models import Meal, Menu, Order
+from app.serializers import (MEAL, ORDER, Serializer, dump_menus,
+                             dump_orders, dumps, use_backend)
+
+
+class SerializerTestCase(ApiTestCase):
+    """
+    Tests for serializing models and rows
+    """
+
+    def setUp(self):
+        super(SerializerTestCase, self).setUp()
+        self.admin = self.login_admin('serial@admin.com')[1]
+        self.customer = self.login_test_user('serial@test.com')[1]
+        catering = self.admin.catering
+        self.rice = Meal(title='Rice', price=1000, catering=catering)
+        self.menu = Menu(title='lunch', menu_date='2018-04-26',
+                         meals=[self.rice], catering=catering)
+        self.menu.save()
+
+    def add_order(self, count):
+        order = Order(total_cost=1000 * count, meals=[self.rice],
+                      customer=self.customer, catering=self.admin.catering,
+                      menu=self.menu, order_count=count)
+        order.save()
+        return order
+
+    def test_rows_and_objects_give_same_dict(self):
+        row = self.rice.id, 'Rice', None, 1000.0
+        self.assertEqual(MEAL.from_row(row), MEAL.dump(self.rice))
+        self.assertEqual(MEAL.from_row(row), {
+            'id': self.rice.id, 'title': 'Rice', 'description': None,
+            'price': 1000.0})
+
+    def test_converters_skip_nulls(self):
+        serializer = Serializer((('day', 'day', str),))
+        self.assertEqual(serializer.from_row((datetime.date(2018, 4, 26),)),
+                         {'day': '2018-04-26'})
+        self.assertEqual(serializer.from_row((None,)), {'day': None})
+
+    def test_columns_follow_fields(self):
+        self.assertEqual([column.key for column in ORDER.columns(Order)], [
+            'id', 'total_cost', 'expires_at', 'status', 'created_at',
+            'order_count', 'menu_id'])
+
+    def test_order_dict(self):
+        order = self.add_order(2)
+        data = order.to_dict()
+        self.assertEqual(data['totalCost'], 1000)
+        self.assertEqual(data['cost'], 2000)
+        self.assertEqual(data['createdAt'], str(order.created_at))
+        self.assertEqual(data['meals'], [MEAL.dump(self.rice)])
+        self.assertEqual(data['customer']['email'], 'serial@test.com')
+
+    def test_lists_share_nested_dicts(self):
+        orders = dump_orders([self.add_order(1), self.add_order(3)])
+        self.assertIs(orders[0]['meals'][0], orders[1]['meals'][0])
+        self.assertIs(orders[0]['customer'], orders[1]['customer'])
+
+    def test_menu_lists_its_catering(self):
+        catering = dump_menus([self.menu])[0]['catering']
+        self.assertEqual(catering['id'], self.admin.catering.id)
+
+
+class JsonBackendTestCase(ApiTestCase):
+    """
+    Tests for picking the JSON backend
+    """
+
+    def tearDown(self):
+        use_backend(self.app.config['JSON_BACKEND'])
+        super(JsonBackendTestCase, self).tearDown()
+
+    def test_missing_backend_falls_back_to_stdlib(self):
+        sys.modules['ujson'] = None
+        try:
+            self.assertEqual(use_backend('ujson'), 'json')
+        finally:
+            del sys.modules['ujson']
+        self.assertEqual(dumps({'a': [1, 2]}), '{"a":[1,2]}')
+
+    def test_unknown_backend_is_refused(self):
+        with self.assertRaises(ValueError):
+            use_backend('yaml')
+
+    def test_every_installed_backend_round_trips(self):
+        data = {'id': 1, 'title': 'Ugali & sukuma', 'price': 1000.5,
+                'meals': [{'id': 2}], 'remaining': {3: 4}}
+        for name in serializers.JSON_BACKENDS:
+            use_backend(name)
+            self.assertEqual(json.loads(dumps(data)), json.loads(
+                json.dumps(data)))
+
+    def test_unsupported_values_use_stdlib(self):
+        self.assertEqual(dumps({'cost': decimal.Decimal('1.5')}),
+                         '{"cost":"1.5"}')
@@ -0,0 +1,82 @@
+"""
+This module contains tests for the request scoped unit of work.
+"""
+from tests.base_test_case import ApiTestCase
+from app.models import User
+
+
+class UnitOfWorkTestCase(ApiTestCase):
+    """
+    Tests each request commits at most once
+    """
+
+    def setUp(self):
+        super(UnitOfWorkTestCase, self).setUp()
+        self.admin_token, self.admin = self.login_admin('uow@admin.com')
+        self.headers = {
+            'Authorization': self.admin_token,
+            'Content-Type': 'application/json'
+        }
+
+    def test_business_signup_commits_once(self):
+        with self.count_commits() as commits:
+            res = self.make_post_request('/api/v1/auth/business/signup', {
+                'email': 'uowbiz@gmail.com',
+                'name': 'your biz',
+                'password': 'AwesomeBiz',
+                'businessAddress': 'Kampala',
+                'businessName': 'Cater1'
+            })
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(len(commits), 1)
+        data = self.get_response_data(res)
+        self.assertIsNotNone(data['business']['id'])
+
+    def test_menu_post_commits_once(self):
+        meal = self.add_test_meal(self.admin)
+        with self.count_commits() as commits:
+            res = self.make_post_request(self.menu_endpoint, {
+                'menu_date': '2018-04-27',
+                'title': 'Buffet',
+                'description': 'lorem',
+                'meals': [meal.id]
+            }, headers=self.headers)
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(len(commits), 1)
+
+    def test_order_post_commits_once(self):
+        menu_id = self.add_test_menu()
+        token = self.login_test_user('uow@customer.com')[0]
+        meal_id = self.get_response_data(self.client().get(
+            '/api/v1/menu/{}'.format(menu_id),
+            headers={'Authorization': token}))['menu']['meals'][0]['id']
+        with self.count_commits() as commits:
+            res = self.make_post_request(self.orders_endpoint, {
+                'meals': [meal_id], 'orderCount': 1, 'menuId': menu_id
+            }, headers={'Authorization': token,
+                        'Content-Type': 'application/json'})
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(len(commits), 1)
+
+    def test_failed_request_rolls_back(self):
+        with self.count_commits() as commits:
+            res = self.make_post_request(self.menu_endpoint, {
+                'menu_date': '2018-04-27',
+                'title': 'Buffet',
+                'meals': [1000]
+            }, headers=self.headers)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(len(commits), 0)
+
+    def test_read_requests_do_not_commit(self):
+        with self.count_commits() as commits:
+            res = self.client().get(self.meals_endpoint, headers=self.headers)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(commits), 0)
+
+    def test_save_without_commit_flushes(self):
+        user = User(name='flushed', email='flushed@test.com', password='x')
+        with self.count_commits() as commits:
+            user.save(commit=False)
+        self.assertIsNotNone(user.id)
+        self.assertEqual(len(commits), 0)
@@ -1,8 +1,9 @@
 """
 Module for testing util functions
 """
+from werkzeug.exceptions import BadRequest
 from app.api.common import validate_date, validate_email_type, \
-    str_type, menu_date_type, type_menu_id
+    str_type, type_menu_id, resolve_meals
 from tests.base_test_case import ApiTestCase
 
 
@@ -46,17 +47,6 @@ class UtilsTestCase(ApiTestCase):
             str_type('  ')
         self.assertEqual("This field is required", str(ctx.exception))
 
-    def test_menu_date_type(self):
-        """
-        tests a menu date
-        """
-        self.add_test_menu()
-        with self.assertRaises(ValueError) as ctx:
-            menu_date = "2018-04-26"
-            menu_date_type(menu_date)
-        self.assertEqual(
-            'Menu for the specific date {} is already set'.format(menu_date), str(ctx.exception))
-
     def test_type_menu_id(self):
         with self.assertRaises(ValueError) as ctx:
             type_menu_id("1")
@@ -67,3 +57,18 @@ class UtilsTestCase(ApiTestCase):
             type_menu_id(1000)
         self.assertEqual('Menu with id 1000 does not exist',
                          str(ctx.exception))
+
+    def test_resolve_meals(self):
+        """
+        tests meals are resolved in request order for their catering only
+        """
+        admin = self.login_admin('resolve@admin.com')[1]
+        first, second = self.add_test_meal(admin), self.add_test_meal(admin)
+        other = self.add_test_meal()
+        meals = resolve_meals([second.id, str(first.id), second.id],
+                              admin.catering.id)
+        self.assertEqual(meals, [second, first])
+        with self.assertRaises(BadRequest) as ctx:
+            resolve_meals([first.id, other.id, 1000], admin.catering.id)
+        self.assertEqual(ctx.exception.data['message'],
+                         'No meal exists with id: {}, 1000'.format(other.id))